@@ -0,0 +1,187 @@
+import json
+from typing import Dict, List, Sequence, Union
+
+from .MCP2221 import MCP2221, VRM, _GET_STATUS
+
+# reference voltage of fixed references
+VOLTS = {
+    VRM.REF_1_024V: 1.024,
+    VRM.REF_2_048V: 2.048,
+    VRM.REF_4_096V: 4.096,
+}
+
+RESOLUTION = 1024  # 10-bit ADC
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy is required, install mcp2221[numpy]")
+
+    return numpy
+
+
+class Calibration:
+    """ Per-channel gain & offset, volts = raw volts * gain + offset """
+
+    def __init__(self, gain: Sequence[float] = (1.0, 1.0, 1.0),
+                 offset: Sequence[float] = (0.0, 0.0, 0.0)):
+        if len(gain) != 3 or len(offset) != 3:
+            raise ValueError("Calibration needs 3 channels")
+
+        self.gain = [float(value) for value in gain]
+        self.offset = [float(value) for value in offset]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Calibration):
+            return NotImplemented
+
+        return self.gain == other.gain and self.offset == other.offset
+
+    def __repr__(self) -> str:
+        return f"Calibration(gain={self.gain!r}, offset={self.offset!r})"
+
+    def Fit(self, channel: int, measured: Sequence[float],
+            actual: Sequence[float]):
+        """ Least squares gain & offset of channel from uncalibrated
+        readings of known voltages, at least 2 points """
+
+        if not 0 <= channel <= 2:
+            raise ValueError("Invalid channel")
+
+        if len(measured) != len(actual) or len(measured) < 2:
+            raise ValueError("Need at least 2 pairs of points")
+
+        np = _numpy()
+        gain, offset = np.polyfit(np.asarray(measured, dtype=np.float64),
+                                  np.asarray(actual, dtype=np.float64), 1)
+
+        self.gain[channel] = float(gain)
+        self.offset[channel] = float(offset)
+
+    def ToDict(self) -> Dict[str, List[float]]:
+        return {"gain": list(self.gain), "offset": list(self.offset)}
+
+
+class CalibrationTable:
+    """ Calibrations by device serial number, saved as JSON """
+
+    def __init__(self, calibrations: Union[Dict[str, Calibration],
+                                           None] = None):
+        self.calibrations = dict(calibrations or {})
+
+    def Get(self, serial: Union[str, None]) -> Calibration:
+        """ Calibration of device, identity if not calibrated """
+
+        return self.calibrations.get(serial) or Calibration()
+
+    def Set(self, serial: str, calibration: Calibration):
+        self.calibrations[serial] = calibration
+
+    def Save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({serial: calibration.ToDict() for serial, calibration
+                       in sorted(self.calibrations.items())}, f, indent=4)
+
+    @classmethod
+    def Load(cls, path: str) -> "CalibrationTable":
+        with open(path) as f:
+            data = json.load(f)
+
+        return cls({serial: Calibration(**value)
+                    for serial, value in data.items()})
+
+
+class ADCConverter:
+    """ Convert raw ADC counts of a device to volts, following its ADC
+    reference. vdd is the supply voltage, used with VRM.VDD """
+
+    def __init__(self, mcp2221: MCP2221, vdd: float = 3.3,
+                 calibration: Union[Calibration, CalibrationTable,
+                                    None] = None):
+        if vdd <= 0:
+            raise ValueError("Invalid VDD")
+
+        if isinstance(calibration, CalibrationTable):
+            serial = mcp2221.GetDeviceInfo()["serial"]
+            calibration = calibration.Get(serial)
+
+        self.mcp2221 = mcp2221
+        self.vdd = vdd
+        self.calibration = calibration or Calibration()
+
+    @property
+    def reference(self) -> float:
+        """ Active ADC reference in volts """
+
+        ref = self.mcp2221.GetADCVoltageReference()
+
+        if ref is None:
+            raise IOError("Failed to read ADC voltage reference")
+
+        return VOLTS.get(ref, self.vdd)
+
+    def Volts(self, counts, channel: Union[int, None] = None):
+        """ Convert counts shaped (..., 3), or of one channel, to volts as
+        float64 NumPy array """
+
+        np = _numpy()
+        counts = np.asarray(counts, dtype=np.float64)
+        scale = self.reference / RESOLUTION
+
+        if channel is None:
+            if counts.shape[-1:] != (3,):
+                raise ValueError("Counts must have 3 channels as last axis")
+
+            gain = np.asarray(self.calibration.gain) * scale
+            offset = np.asarray(self.calibration.offset)
+        else:
+            if not 0 <= channel <= 2:
+                raise ValueError("Invalid channel")
+
+            gain = self.calibration.gain[channel] * scale
+            offset = self.calibration.offset[channel]
+
+        return counts * gain + offset
+
+    @staticmethod
+    def Oversample(counts, factor: int):
+        """ Average each factor consecutive samples shaped (n, ...),
+        trailing partial block is dropped. Result is float counts with
+        up to log4(factor) extra bits for noisy input """
+
+        if factor < 1:
+            raise ValueError("Invalid factor")
+
+        np = _numpy()
+        counts = np.asarray(counts, dtype=np.float64)
+        blocks = counts.shape[0] // factor
+
+        return counts[:blocks * factor].reshape(
+            (blocks, factor) + counts.shape[1:]).mean(axis=1)
+
+    def Read(self, oversample: int = 1, window: int = 16):
+        """ Read all channels in volts, averaging oversample readings sent
+        with window of them in flight """
+
+        if oversample < 1:
+            raise ValueError("Invalid oversample")
+
+        np = _numpy()
+
+        with self.mcp2221._lock:
+            responses = self.mcp2221._transferMany(
+                [_GET_STATUS] * oversample, window)
+
+        counts = np.empty((oversample, 3), dtype=np.uint16)
+
+        for index, buf in enumerate(responses):
+            if buf[0] != 0x10 or buf[1] != 0x00:
+                raise IOError("Failed to read ADC")
+
+            counts[index] = (buf[50] | (buf[51] << 8),
+                             buf[52] | (buf[53] << 8),
+                             buf[54] | (buf[55] << 8))
+
+        return self.Volts(counts.mean(axis=0))
@@ -0,0 +1,203 @@
+import threading
+from array import array
+from time import monotonic
+from typing import Dict, Iterator, Tuple, Union
+
+from .MCP2221 import MCP2221
+
+
+class ADCSampler:
+    """ Sample all 3 ADC channels at fixed rate into a ring buffer """
+
+    def __init__(self, mcp2221: MCP2221, rate: float, capacity: int = 4096):
+        if rate <= 0:
+            raise ValueError("Invalid rate")
+
+        if capacity <= 0:
+            raise ValueError("Invalid capacity")
+
+        self.mcp2221 = mcp2221
+        self.rate = rate
+        self.capacity = capacity
+
+        # ring buffer, 3 channels per sample
+        self._values = array("H", bytes(2 * 3 * capacity))
+        self._times = array("d", bytes(8 * capacity))
+        self._head = 0  # samples written
+        self._tail = 0  # samples consumed
+        self._cond = threading.Condition()
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._first = None
+        self._last = None
+
+        self.overruns = 0  # samples dropped, consumer too slow
+        self.late = 0  # sampling periods missed
+        self.errors = 0  # failed reads
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    def Start(self):
+        """ Start sampling thread """
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def Stop(self):
+        """ Stop sampling thread, samples stay available """
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self):
+        period = 1 / self.rate
+        sample = [0, 0, 0]
+        values = self._values
+        times = self._times
+        start = monotonic()
+        tick = 0
+
+        while not self._stop.is_set():
+            # scheduled from start, so errors do not accumulate
+            delay = start + tick * period - monotonic()
+
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            elif delay < -period:
+                missed = int(-delay / period)
+                self.late += missed
+                tick += missed
+
+            tick += 1
+            now = monotonic()
+
+            try:
+                ok = self.mcp2221.ReadAllADC(sample) is not None
+            except IOError:
+                ok = False
+
+            if not ok:
+                self.errors += 1
+                continue
+
+            with self._cond:
+                if self._head - self._tail >= self.capacity:
+                    self._tail += 1
+                    self.overruns += 1
+
+                index = self._head % self.capacity
+                values[index * 3] = sample[0]
+                values[index * 3 + 1] = sample[1]
+                values[index * 3 + 2] = sample[2]
+                times[index] = now
+                self._head += 1
+
+                if self._first is None:
+                    self._first = now
+
+                self._last = now
+                self._cond.notify_all()
+
+    @property
+    def available(self) -> int:
+        """ Number of samples waiting to be read """
+
+        return self._head - self._tail
+
+    @property
+    def achieved_rate(self) -> float:
+        """ Measured sampling rate in Hz """
+
+        if self._first is None or self._last == self._first:
+            return 0.0
+
+        return (self._head - 1) / (self._last - self._first)
+
+    def Stats(self) -> Dict[str, Union[int, float]]:
+        """ Get sampling statistics """
+
+        return {
+            "rate": self.rate,
+            "achieved_rate": self.achieved_rate,
+            "samples": self._head,
+            "overruns": self.overruns,
+            "late": self.late,
+            "errors": self.errors,
+        }
+
+    def Read(self, count: int, timeout: Union[float, None] = None,
+             numpy: bool = True) -> Tuple:
+        """ Wait for & take count samples, fewer on timeout or stop.
+        Returns (timestamps, values) as NumPy arrays shaped (n,) and (n, 3),
+        or as flat array.array when numpy is False """
+
+        if not 0 < count <= self.capacity:
+            raise ValueError("Invalid count")
+
+        deadline = None if timeout is None else monotonic() + timeout
+
+        with self._cond:
+            while self._head - self._tail < count and \
+                    self._thread is not None:
+                remaining = None
+
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+
+                    if remaining <= 0:
+                        break
+
+                self._cond.wait(remaining)
+
+            count = min(count, self._head - self._tail)
+            start = self._tail % self.capacity
+            end = start + count
+            first = min(end, self.capacity)
+            wrap = end - first
+
+            times = self._times[start:first] + self._times[:wrap]
+            values = self._values[start * 3:first * 3] + \
+                self._values[:wrap * 3]
+
+            self._tail += count
+
+        if not numpy:
+            return times, values
+
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("NumPy is required, install mcp2221[numpy]")
+
+        return (np.frombuffer(times, dtype=np.float64),
+                np.frombuffer(values, dtype=np.uint16).reshape(count, 3))
+
+    def Blocks(self, count: int, numpy: bool = True) -> Iterator[Tuple]:
+        """ Generate blocks of count samples until stopped """
+
+        while True:
+            block = self.Read(count, numpy=numpy)
+
+            if len(block[0]):
+                yield block
+
+            if len(block[0]) < count and self._thread is None:
+                return
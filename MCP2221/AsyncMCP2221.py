@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from .MCP2221 import MCP2221
+
+# blocking methods mirrored as coroutines
+METHODS = [
+    "InvalidateCache",
+    "SetClockOutput",
+    "SetDACVoltageReference",
+    "WriteDAC",
+    "SetADCVoltageReference",
+    "SetInterruptDetection",
+    "GetInterruptFlag",
+    "ClearInterruptFlag",
+    "WaitForInterrupt",
+    "GetSRAMSettings",
+    "GetADCVoltageReference",
+    "InitGP",
+    "GetGPType",
+    "ReadAllGP",
+    "GetGPIOState",
+    "ReadGP",
+    "WriteAllGP",
+    "WriteGP",
+    "ReadAllADC",
+    "GetStatus",
+    "ReadADC",
+    "GetDeviceInfo",
+    "ReadFlash",
+    "ReadAllFlash",
+    "WriteFlash",
+    "I2CSetSpeed",
+    "I2CCancel",
+    "I2CWrite",
+    "I2CRead",
+    "I2CWriteRead",
+    "Reset",
+]
+
+
+class AsyncMCP2221:
+    """ Asyncio client, HID I/O of the device runs on its own thread
+    so requests stay in order and never block the event loop """
+
+    def __init__(self, mcp2221: MCP2221):
+        self.mcp2221 = mcp2221
+
+        # single worker keeps requests strictly ordered
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mcp2221")
+
+    @classmethod
+    async def Open(cls, *args, **kwargs) -> "AsyncMCP2221":
+        """ Open device, takes same arguments as MCP2221 """
+
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mcp2221")
+        loop = asyncio.get_running_loop()
+
+        try:
+            mcp2221 = await loop.run_in_executor(
+                executor, partial(MCP2221, *args, **kwargs))
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+
+        self = cls.__new__(cls)
+        self.mcp2221 = mcp2221
+        self._executor = executor
+
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.Close()
+
+    async def Run(self, fn: Callable[[MCP2221], Any]) -> Any:
+        """ Run fn(mcp2221) on device thread, e.g. to use a Transaction """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(fn, self.mcp2221))
+
+    async def Close(self):
+        """ Finish pending requests & close device """
+
+        await self.Run(lambda mcp2221: mcp2221.mcp2221.close())
+        self._executor.shutdown(wait=False)
+
+
+def _coroutine(name: str):
+    method = getattr(MCP2221, name)
+
+    async def call(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(method, self.mcp2221, *args, **kwargs))
+
+    call.__name__ = name
+    call.__qualname__ = f"AsyncMCP2221.{name}"
+    call.__doc__ = method.__doc__
+
+    return call
+
+
+for _name in METHODS:
+    setattr(AsyncMCP2221, _name, _coroutine(_name))
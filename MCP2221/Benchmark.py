@@ -0,0 +1,262 @@
+"""
+Count HID transactions and measure latency of MCP2221 API calls
+
+    python -m MCP2221.Benchmark --target simulator --budget budget.json
+
+Calls are measured on the configuration made by _configure, the SRAM
+settings of the device are restored afterwards
+"""
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from statistics import mean, median
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple, Union
+
+from . import MCP2221 as driver
+from .BitBang import SPI
+from .Profile import Profile
+from .Simulator import Simulator
+
+
+class CountingDevice:
+    """ Wrap an opened hid.device and count writes/reads """
+
+    def __init__(self, device):
+        self.device = device
+        self.writes = 0
+        self.reads = 0
+
+    def write(self, buff):
+        self.writes += 1
+        return self.device.write(buff)
+
+    def read(self, *args, **kwargs):
+        self.reads += 1
+        return self.device.read(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+
+@contextmanager
+def Preserved(mcp2221: driver.MCP2221):
+    """ Restore SRAM settings (GP functions & outputs, clock, DAC & ADC)
+    changed inside, even on error """
+
+    profile = Profile.Read(mcp2221)
+
+    try:
+        yield profile
+    finally:
+        profile.Apply(mcp2221)
+
+
+def _configure(mcp2221: driver.MCP2221):
+    """ GP0 output, GP1 input, GP2 DAC, GP3 ADC """
+
+    mcp2221.InitGP(0, driver.TYPE.OUTPUT)
+    mcp2221.InitGP(1, driver.TYPE.INPUT)
+    mcp2221.InitGP(2, driver.TYPE.DAC)
+    mcp2221.InitGP(3, driver.TYPE.ADC)
+
+
+# name: call, all leave the configuration made by _configure unchanged
+CALLS: Dict[str, Callable[[driver.MCP2221], object]] = {
+    "SetClockOutput": lambda m: m.SetClockOutput(
+        driver.DUTY.CYCLE_50, driver.CLOCK.DIV_12MHZ),
+    "SetDACVoltageReference": lambda m: m.SetDACVoltageReference(
+        driver.VRM.VDD),
+    "WriteDAC": lambda m: m.WriteDAC(16),
+    "SetADCVoltageReference": lambda m: m.SetADCVoltageReference(
+        driver.VRM.VDD),
+    "InitGP": lambda m: m.InitGP(0, driver.TYPE.OUTPUT),
+    "GetGPType": lambda m: m.GetGPType(0),
+    "ReadAllGP": lambda m: m.ReadAllGP(),
+    "ReadGP": lambda m: m.ReadGP(1),
+    "WriteAllGP": lambda m: m.WriteAllGP(1, None, None, None),
+    "WriteGP": lambda m: m.WriteGP(0, 0),
+    "ReadAllADC": lambda m: m.ReadAllADC(),
+    "ReadADC": lambda m: m.ReadADC(3),
+    "GetDeviceInfo": lambda m: m.GetDeviceInfo(),
+    "ReadFlash": lambda m: m.ReadFlash(driver.FLASH.GP_SETTING),
+}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def Measure(mcp2221: driver.MCP2221, call: Callable, iterations: int = 100
+            ) -> Dict[str, Union[float, Dict[str, float]]]:
+    """ Run call repeatedly, return transactions & latency (in us) """
+
+    device = CountingDevice(mcp2221.mcp2221)
+    mcp2221.mcp2221 = device
+    sends = 0
+    send = mcp2221._send
+    overridden = "_send" in vars(mcp2221)
+
+    def counting_send(*args, **kwargs):
+        nonlocal sends
+        sends += 1
+        return send(*args, **kwargs)
+
+    mcp2221._send = counting_send
+    latency = []
+
+    try:
+        for _ in range(iterations):
+            start = perf_counter()
+            call(mcp2221)
+            latency.append((perf_counter() - start) * 1e6)
+    finally:
+        mcp2221.mcp2221 = device.device
+
+        if overridden:
+            mcp2221._send = send
+        else:
+            del mcp2221._send
+
+    return {
+        "send": sends / iterations,
+        "write": device.writes / iterations,
+        "read": device.reads / iterations,
+        "latency_us": {
+            "min": min(latency),
+            "mean": mean(latency),
+            "median": median(latency),
+            "p90": _percentile(latency, 0.9),
+            "p99": _percentile(latency, 0.99),
+            "max": max(latency),
+        },
+    }
+
+
+def Run(mcp2221: driver.MCP2221, iterations: int = 100,
+        calls: Union[List[str], None] = None) -> Dict[str, Dict]:
+    """ Measure every public call (or the selected ones), SRAM settings
+    are restored afterwards """
+
+    results = dict()
+
+    with Preserved(mcp2221):
+        _configure(mcp2221)
+
+        for name in calls or CALLS:
+            results[name] = Measure(mcp2221, CALLS[name], iterations)
+
+    return results
+
+
+def BitBang(mcp2221: driver.MCP2221, count: int = 32,
+            windows: Tuple[int, ...] = (1, 16)) -> Dict[str, Dict[str, float]]:
+    """ Throughput of SPI transfer of count bytes bit-banged on GP0 (SCK),
+    GP1 (MOSI), GP2 (MISO) & GP3 (CS), per window of reports in flight.
+    SRAM settings are restored afterwards """
+
+    spi = SPI(sck=0, mosi=1, miso=2, cs=3)
+    sequence = spi.Compile(bytes(count))
+    results = dict()
+
+    with Preserved(mcp2221):
+        spi.Setup(mcp2221)
+
+        for window in windows:
+            start = perf_counter()
+            sequence.Run(mcp2221, window)
+            elapsed = perf_counter() - start
+
+            results[f"window_{window}"] = {
+                "bits": count * 8,
+                "reports": len(sequence),
+                "seconds": elapsed,
+                "bits_per_second": count * 8 / elapsed,
+                "reports_per_second": len(sequence) / elapsed,
+            }
+
+    return results
+
+
+def Check(results: Dict[str, Dict], budget: Dict[str, float]) -> List[str]:
+    """ List calls doing more HID writes than budgeted """
+
+    failed = []
+
+    for name, allowed in budget.items():
+        if name in results and results[name]["write"] > allowed:
+            failed.append(
+                f"{name}: {results[name]['write']:g} transactions, "
+                f"budget {allowed:g}")
+
+    return failed
+
+
+def _targets(args) -> Dict[str, Callable[[], driver.MCP2221]]:
+    targets = dict()
+
+    if args.target in ("simulator", "all"):
+        targets["simulator"] = lambda: driver.MCP2221(
+            device=Simulator(latency=args.latency), cache=args.cache)
+
+    if args.target in ("hardware", "all"):
+        targets["hardware"] = lambda: driver.MCP2221(
+            args.vid, args.pid, args.dev, cache=args.cache)
+
+    return targets
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m MCP2221.Benchmark", description=__doc__.strip())
+    parser.add_argument("--target", default="simulator",
+                        choices=["simulator", "hardware", "all"],
+                        help="hardware reconfigures the device while "
+                        "measuring, its SRAM settings are restored after")
+    parser.add_argument("--latency", type=float, default=0.001,
+                        help="simulated latency per transaction [s]")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--cache", action="store_true",
+                        help="enable SRAM shadow cache")
+    parser.add_argument("--call", action="append", choices=list(CALLS),
+                        help="measure only this call, can be repeated")
+    parser.add_argument("--budget",
+                        help="JSON file of max transactions per call")
+    parser.add_argument("--bitbang", type=int, default=0, metavar="BYTES",
+                        help="also measure SPI bit-bang throughput")
+    parser.add_argument("--vid", type=lambda x: int(x, 0), default=0x04D8)
+    parser.add_argument("--pid", type=lambda x: int(x, 0), default=0x00DD)
+    parser.add_argument("--dev", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    budget = dict()
+
+    if args.budget:
+        with open(args.budget, "r", encoding="utf-8") as fh:
+            budget = json.load(fh)
+
+    output = dict()
+    failed = []
+
+    for target, open_device in _targets(args).items():
+        mcp2221 = open_device()
+        output[target] = Run(mcp2221, args.iterations, args.call)
+
+        if args.bitbang:
+            output[target]["BitBang"] = BitBang(mcp2221, args.bitbang)
+
+        failed += [f"{target} {msg}" for msg in Check(output[target], budget)]
+
+    json.dump(output, sys.stdout, indent=2)
+    print()
+
+    for msg in failed:
+        print(msg, file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
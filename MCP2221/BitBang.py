@@ -0,0 +1,232 @@
+from typing import Dict, Iterable, List, Sequence as _Sequence, Union
+
+from .MCP2221 import MCP2221, TYPE
+
+
+class Sequence:
+    """ GPIO waveform compiled into Set GPIO Values (0x50) reports, with
+    Get GPIO Values (0x51) requests where inputs are sampled """
+
+    def __init__(self, levels: Union[_Sequence[Union[int, None]],
+                                     None] = None):
+        self.reports: List[bytes] = []
+        self.samples: List[tuple] = []  # (report index, pin)
+
+        # output levels before the first report, None if unknown
+        self._levels = list(levels or [None, None, None, None])
+
+    def __len__(self) -> int:
+        return len(self.reports)
+
+    def Set(self, levels: Dict[int, int]) -> "Sequence":
+        """ Drive output pins, one report unless nothing changes """
+
+        buf = bytearray(65)
+        buf[1] = 0x50  # Set GPIO Values
+        changed = False
+
+        for pin, value in levels.items():
+            if not 0 <= pin <= 3:
+                raise ValueError("Invalid pin number")
+
+            value &= 1
+
+            if self._levels[pin] != value:
+                self._levels[pin] = value
+                buf[2 + pin * 4 + 1] = 1  # Alter GPIO output
+                buf[3 + pin * 4 + 1] = value  # output value
+                changed = True
+
+        if changed:
+            self.reports.append(bytes(buf))
+
+        return self
+
+    def Sample(self, pin: int) -> int:
+        """ Read input pin at this point, returns sample index """
+
+        if not 0 <= pin <= 3:
+            raise ValueError("Invalid pin number")
+
+        self.samples.append((len(self.reports), pin))
+        self.reports.append(bytes([0, 0x51]) + bytes(63))
+
+        return len(self.samples) - 1
+
+    def Extend(self, other: "Sequence") -> "Sequence":
+        """ Append other sequence, its output levels are assumed """
+
+        offset = len(self.reports)
+        self.reports += other.reports
+        self.samples += [(index + offset, pin)
+                         for index, pin in other.samples]
+        self._levels = list(other._levels)
+
+        return self
+
+    def Run(self, mcp2221: MCP2221, window: int = 16) -> List[int]:
+        """ Send all reports, keeping window of them in flight. Returns
+        sampled input levels """
+
+        if window < 1:
+            raise ValueError("Invalid window")
+
+        with mcp2221._lock:
+            responses = mcp2221._transferMany(self.reports, window)
+
+        for index, response in enumerate(responses):
+            if response[1] != 0x00:
+                raise IOError(f"Command 0x{response[0]:02X} failed at "
+                              f"report {index}")
+
+            request = self.reports[index]
+
+            for pin in range(4) if request[1] == 0x50 else ():
+                if request[2 + pin * 4 + 1] and \
+                        response[3 + pin * 4] == 0xEE:
+                    raise IOError(f"GP{pin} is not GPIO")
+
+        values = []
+
+        for index, pin in self.samples:
+            value = responses[index][2 + pin * 2]
+
+            if value > 1:
+                raise IOError(f"GP{pin} is not GPIO")
+
+            values.append(value)
+
+        return values
+
+
+class SPI:
+    """ SPI master on GP pins, MSB first. cs is held at its active level
+    during each transfer, e.g. to latch a shift register on release """
+
+    def __init__(self, sck: int, mosi: Union[int, None] = None,
+                 miso: Union[int, None] = None, cs: Union[int, None] = None,
+                 mode: int = 0, cs_active: int = 0):
+        pins = [pin for pin in (sck, mosi, miso, cs) if pin is not None]
+
+        if not all(0 <= pin <= 3 for pin in pins):
+            raise ValueError("Invalid pin number")
+
+        if len(set(pins)) != len(pins):
+            raise ValueError("Pins must differ")
+
+        if not 0 <= mode <= 3:
+            raise ValueError("Invalid mode")
+
+        self.sck = sck
+        self.mosi = mosi
+        self.miso = miso
+        self.cs = cs
+        self.cpol = mode >> 1
+        self.cpha = mode & 1
+        self.cs_active = cs_active & 1
+
+    def Setup(self, mcp2221: MCP2221):
+        """ Configure pins as GPIO & set idle levels """
+
+        with mcp2221.Transaction():
+            for pin in (self.sck, self.mosi, self.cs):
+                if pin is not None:
+                    mcp2221.InitGP(pin, TYPE.OUTPUT)
+
+            if self.miso is not None:
+                mcp2221.InitGP(self.miso, TYPE.INPUT)
+
+        mcp2221.WriteAllGP(*self._idle())
+
+    def _idle(self) -> List[Union[int, None]]:
+        levels = [None, None, None, None]
+        levels[self.sck] = self.cpol
+
+        if self.cs is not None:
+            levels[self.cs] = 1 - self.cs_active
+
+        return levels
+
+    def Compile(self, data: _Sequence[int], read: bool = True
+                ) -> Sequence:
+        """ Waveform of transferring data from idle levels, 2 reports per
+        bit plus one to sample MISO when read """
+
+        idle = self.cpol
+        active = 1 - idle
+        sample = read and self.miso is not None
+        bits = [(byte >> bit) & 1 for byte in data for bit in range(7, -1, -1)]
+
+        sequence = Sequence(self._idle())  # as left by Setup
+        start = dict()
+
+        if self.cs is not None:
+            start[self.cs] = self.cs_active
+
+        if self.cpha == 0 and self.mosi is not None and bits:
+            start[self.mosi] = bits[0]  # set up before first edge
+
+        sequence.Set(start)
+
+        for index, bit in enumerate(bits):
+            if self.cpha == 0:
+                # sampled on leading edge, next bit shifted on trailing
+                sequence.Set({self.sck: active})
+
+                if sample:
+                    sequence.Sample(self.miso)
+
+                trailing = {self.sck: idle}
+
+                if self.mosi is not None and index + 1 < len(bits):
+                    trailing[self.mosi] = bits[index + 1]
+
+                sequence.Set(trailing)
+            else:
+                # shifted on leading edge, sampled on trailing
+                leading = {self.sck: active}
+
+                if self.mosi is not None:
+                    leading[self.mosi] = bit
+
+                sequence.Set(leading)
+                sequence.Set({self.sck: idle})
+
+                if sample:
+                    sequence.Sample(self.miso)
+
+        if self.cs is not None:
+            sequence.Set({self.cs: 1 - self.cs_active})
+
+        return sequence
+
+    def Transfer(self, mcp2221: MCP2221, data: _Sequence[int],
+                 window: int = 16) -> bytes:
+        """ Write data & return bytes read at the same time """
+
+        if self.miso is None:
+            raise ValueError("No MISO pin")
+
+        return bytes(_pack(self.Compile(data).Run(mcp2221, window)))
+
+    def Write(self, mcp2221: MCP2221, data: _Sequence[int],
+              window: int = 16):
+        """ Write data ignoring MISO """
+
+        self.Compile(data, read=False).Run(mcp2221, window)
+
+
+def _pack(bits: Iterable[int]) -> List[int]:
+    """ Bits MSB first to bytes """
+
+    output = []
+    byte = 0
+
+    for index, bit in enumerate(bits, 1):
+        byte = (byte << 1) | bit
+
+        if index % 8 == 0:
+            output.append(byte)
+            byte = 0
+
+    return output
@@ -0,0 +1,244 @@
+"""
+Command line tool for MCP2221/A, prints one JSON object per line
+
+    mcp2221 list
+    mcp2221 monitor --rate 10 --count 100
+    mcp2221 dump --output image.json
+    mcp2221 restore image.json
+    mcp2221 bench --simulator
+"""
+import argparse
+import json
+import sys
+from time import monotonic, sleep, time
+from typing import List, TextIO, Union
+
+from . import MCP2221 as driver
+from . import Benchmark
+from .FlashImage import FlashImage
+from .Simulator import Simulator
+
+
+def _emit(output: TextIO, record: dict):
+    output.write(json.dumps(record) + "\n")
+    output.flush()
+
+
+def _open(args) -> driver.MCP2221:
+    if args.simulator:
+        return driver.MCP2221(device=Simulator(latency=args.latency),
+                              cache=args.cache)
+
+    path = args.path.encode() if args.path else None  # as enumerated
+
+    return driver.MCP2221(args.vid, args.pid, args.dev, cache=args.cache,
+                          path=path, serial=args.serial,
+                          transport=args.transport, timeout=args.timeout)
+
+
+def ListDevices(args, output: TextIO) -> int:
+    """ One line per connected device """
+
+    for info in driver.Enumerate(args.vid, args.pid, refresh=True):
+        path = info.get("path")
+
+        if isinstance(path, bytes):
+            path = path.decode(errors="replace")
+
+        _emit(output, {
+            "path": path,
+            "serial": info.get("serial_number"),
+            "manufacturer": info.get("manufacturer_string"),
+            "product": info.get("product_string"),
+            "vid": info.get("vendor_id"),
+            "pid": info.get("product_id"),
+        })
+
+    return 0
+
+
+def Monitor(args, output: TextIO) -> int:
+    """ Sample GPIO & ADC at fixed rate, one line per sample """
+
+    mcp2221 = _open(args)
+    gpio = [0, 0, 0, 0]
+    adc = [0, 0, 0]
+    period = 1 / args.rate
+    start = monotonic()
+    tick = 0
+
+    while args.count == 0 or tick < args.count:
+        delay = start + tick * period - monotonic()
+
+        if delay > 0:
+            sleep(delay)
+        elif delay < -period:  # too slow, skip missed samples
+            tick += int(-delay / period)
+
+        tick += 1
+        record = {"time": time()}
+
+        if not args.no_gpio:
+            record["gpio"] = mcp2221.ReadAllGP(gpio)
+
+        if not args.no_adc:
+            record["adc"] = mcp2221.ReadAllADC(adc)
+
+        _emit(output, record)
+
+    return 0
+
+
+def Dump(args, output: TextIO) -> int:
+    """ Read all flash sections to file or stdout """
+
+    image = FlashImage.Read(_open(args))
+
+    if args.output:
+        image.Save(args.output, serial=args.serial_number)
+    else:
+        data = image.ToDict()
+
+        if not args.serial_number:
+            data.pop(driver.FLASH.CHIP_SERIAL_NUMBER.name, None)
+
+        _emit(output, data)
+
+    return 0
+
+
+def Restore(args, output: TextIO) -> int:
+    """ Write flash sections that differ from image file """
+
+    image = FlashImage.Load(args.image)
+    mcp2221 = _open(args)
+
+    if args.dry_run:
+        changed = image.Diff(FlashImage.Read(mcp2221))
+    else:
+        changed = image.Write(mcp2221)
+
+    _emit(output, {"changed": [address.name for address in changed],
+                   "written": not args.dry_run})
+
+    return 0
+
+
+def Bench(args, output: TextIO) -> int:
+    """ Measure transactions & latency, one line per call. The device is
+    configured once for all calls & its SRAM settings restored after """
+
+    mcp2221 = _open(args)
+    budget = dict()
+    failed = False
+
+    if args.budget:
+        with open(args.budget, "r", encoding="utf-8") as fh:
+            budget = json.load(fh)
+
+    results = Benchmark.Run(mcp2221, args.iterations, args.call)
+
+    for name, result in results.items():
+        errors = Benchmark.Check({name: result}, budget)
+        failed = failed or bool(errors)
+        _emit(output, {"call": name, **result, "over_budget": bool(errors)})
+
+    return 1 if failed else 0
+
+
+def _rate(value: str) -> float:
+    rate = float(value)
+
+    if rate <= 0:
+        raise argparse.ArgumentTypeError("must be positive")
+
+    return rate
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mcp2221", description=__doc__.strip().splitlines()[0])
+
+    device = argparse.ArgumentParser(add_help=False)
+    device.add_argument("--vid", type=lambda x: int(x, 0), default=0x04D8)
+    device.add_argument("--pid", type=lambda x: int(x, 0), default=0x00DD)
+    device.add_argument("--dev", type=int, default=0,
+                        help="index of device to open")
+    device.add_argument("--serial", help="open device by serial number")
+    device.add_argument("--path", help="open device by path")
+    device.add_argument("--transport", choices=["auto", "hidapi", "hidraw"])
+    device.add_argument("--timeout", type=float,
+                        help="response timeout [s]")
+    device.add_argument("--cache", action="store_true",
+                        help="enable SRAM shadow cache")
+    device.add_argument("--simulator", action="store_true",
+                        help="use simulator instead of a device")
+    device.add_argument("--latency", type=float, default=0.001,
+                        help="simulated latency per transaction [s]")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("list", help="list connected devices")
+    cmd.add_argument("--vid", type=lambda x: int(x, 0), default=0x04D8)
+    cmd.add_argument("--pid", type=lambda x: int(x, 0), default=0x00DD)
+    cmd.set_defaults(run=ListDevices)
+
+    cmd = commands.add_parser("monitor", parents=[device],
+                              help="sample GPIO & ADC")
+    cmd.add_argument("--rate", type=_rate, default=10,
+                     help="samples per second")
+    cmd.add_argument("--count", type=int, default=0,
+                     help="number of samples, 0 runs until interrupted")
+    cmd.add_argument("--no-gpio", action="store_true")
+    cmd.add_argument("--no-adc", action="store_true")
+    cmd.set_defaults(run=Monitor)
+
+    cmd = commands.add_parser("dump", parents=[device],
+                              help="read flash image")
+    cmd.add_argument("--output", help="JSON file, stdout if not given")
+    cmd.add_argument("--serial-number", action="store_true",
+                     help="include chip serial number")
+    cmd.set_defaults(run=Dump)
+
+    cmd = commands.add_parser("restore", parents=[device],
+                              help="write flash image")
+    cmd.add_argument("image", help="JSON file made by dump")
+    cmd.add_argument("--dry-run", action="store_true",
+                     help="only list sections that differ")
+    cmd.set_defaults(run=Restore)
+
+    cmd = commands.add_parser(
+        "bench", parents=[device], help="measure transactions & latency",
+        description="Measure transactions & latency. Reconfigures GPIO, "
+        "DAC, clock output & references of the device while measuring, "
+        "disconnect anything they drive. SRAM settings are restored "
+        "afterwards.")
+    cmd.add_argument("--iterations", type=int, default=100)
+    cmd.add_argument("--call", action="append",
+                     choices=list(Benchmark.CALLS),
+                     help="measure only this call, can be repeated")
+    cmd.add_argument("--budget",
+                     help="JSON file of max transactions per call")
+    cmd.set_defaults(run=Bench)
+
+    return parser
+
+
+def main(argv: Union[List[str], None] = None,
+         output: Union[TextIO, None] = None) -> int:
+    args = _parser().parse_args(argv)
+    output = output or sys.stdout
+
+    try:
+        return args.run(args, output)
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:  # reader went away, e.g. piped to head
+        return 0
+    except (IOError, OSError, ValueError, IndexError) as err:
+        print(f"mcp2221: {err}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from . import MCP2221 as driver
+
+
+class DevicePool:
+    """ All matching devices keyed by USB serial, operations run on every
+    device in parallel. Devices without unique serial are keyed by path """
+
+    def __init__(self, VID=0x04D8, PID=0x00DD, **kwargs):
+        self.devices: Dict[str, driver.MCP2221] = dict()
+        found = driver.Enumerate(VID, PID, refresh=True)
+        serials = [info.get("serial_number") for info in found]
+
+        try:
+            for info, serial in zip(found, serials):
+                if not serial or serials.count(serial) > 1:
+                    serial = info["path"]
+
+                    if isinstance(serial, bytes):
+                        serial = serial.decode()
+
+                self.devices[serial] = driver.MCP2221(
+                    VID, PID, path=info["path"], **kwargs)
+        except BaseException:
+            self.Close()
+            raise
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.devices)),
+            thread_name_prefix="mcp2221-pool")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __getitem__(self, serial: str) -> driver.MCP2221:
+        return self.devices[serial]
+
+    def __getattr__(self, name: str) -> Callable[..., Dict[str, Any]]:
+        """ pool.ReadAllADC() calls ReadAllADC() of every device """
+
+        if name.startswith("_") or \
+                not callable(getattr(driver.MCP2221, name, None)):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs) -> Dict[str, Any]:
+            return self.Map(
+                lambda device: getattr(device, name)(*args, **kwargs))
+
+        return call
+
+    def Map(self, fn: Callable[[driver.MCP2221], Any],
+            return_exceptions: bool = False) -> Dict[str, Any]:
+        """ Run fn(device) on all devices in parallel, results by serial.
+        Exceptions are raised, or returned in place of result """
+
+        futures = {serial: self._executor.submit(fn, device)
+                   for serial, device in self.devices.items()}
+        results = dict()
+
+        for serial, future in futures.items():
+            error = future.exception()
+
+            if error is None:
+                results[serial] = future.result()
+            elif return_exceptions:
+                results[serial] = error
+            else:
+                raise error
+
+        return results
+
+    def Close(self):
+        """ Close all devices """
+
+        for device in self.devices.values():
+            device.mcp2221.close()
+
+        self.devices = dict()
+
+        if hasattr(self, "_executor"):
+            self._executor.shutdown()
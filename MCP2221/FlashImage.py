@@ -0,0 +1,149 @@
+import json
+from typing import Dict, List, Union
+
+from .MCP2221 import MCP2221, FLASH
+
+# sections holding UTF-16LE strings
+STRINGS = (FLASH.USB_MANUFACTURER, FLASH.USB_PRODUCT_DESCRIPTOR,
+           FLASH.USB_SERIAL_NUMBER)
+
+# read-only, never written
+READ_ONLY = (FLASH.CHIP_SERIAL_NUMBER,)
+
+
+class FlashImage:
+    """ Contents of flash sections, used to write only what differs """
+
+    def __init__(self, sections: Union[Dict[FLASH, List[int]], None] = None):
+        self.sections = dict()
+
+        for address, data in (sections or {}).items():
+            self[address] = data
+
+    def __getitem__(self, address: FLASH) -> List[int]:
+        return self.sections[address]
+
+    def __setitem__(self, address: FLASH, data: List[int]):
+        if not isinstance(address, FLASH):
+            raise TypeError("Invalid flash address")
+
+        self.sections[address] = list(data)
+
+    def __contains__(self, address: FLASH) -> bool:
+        return address in self.sections
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FlashImage):
+            return NotImplemented
+
+        return self.sections == other.sections
+
+    def __repr__(self) -> str:
+        return f"FlashImage({self.ToDict()!r})"
+
+    def GetString(self, address: FLASH) -> str:
+        """ Decode USB string section """
+
+        if address not in STRINGS:
+            raise TypeError("Not a string section")
+
+        return bytes(self[address]).decode("utf-16-le")
+
+    def SetString(self, address: FLASH, text: str):
+        """ Encode USB string section """
+
+        if address not in STRINGS:
+            raise TypeError("Not a string section")
+
+        self[address] = list(text.encode("utf-16-le"))
+
+    @classmethod
+    def Read(cls, mcp2221: MCP2221) -> "FlashImage":
+        """ Read all sections from device in one pass """
+
+        return cls(mcp2221.ReadAllFlash())
+
+    def Diff(self, current: "FlashImage") -> List[FLASH]:
+        """ Writable sections of this image that differ from current """
+
+        return [address for address in FLASH
+                if address in self and address not in READ_ONLY
+                and (address not in current
+                     or current[address] != self[address])]
+
+    def Write(self, mcp2221: MCP2221,
+              current: Union["FlashImage", None] = None) -> List[FLASH]:
+        """ Write sections differing from current image (read from device
+        if not given) & update current. Returns written sections """
+
+        if current is None:
+            current = FlashImage.Read(mcp2221)
+
+        changed = self.Diff(current)
+
+        with mcp2221.Pipeline():
+            for address in changed:
+                data = self[address]
+
+                if address in STRINGS:
+                    data = [len(data) + 2, 0x03, *data]
+
+                mcp2221.WriteFlash(address, data)
+
+        for address in changed:
+            current[address] = self[address]
+
+        return changed
+
+    def ToDict(self) -> Dict[str, Union[str, List[int]]]:
+        """ Serializable form, strings as text & settings as hex """
+
+        output = dict()
+
+        for address in FLASH:
+            if address not in self:
+                continue
+            elif address in STRINGS:
+                output[address.name] = self.GetString(address)
+            else:
+                output[address.name] = bytes(self[address]).hex()
+
+        return output
+
+    @classmethod
+    def FromDict(cls, data: Dict[str, str]) -> "FlashImage":
+        """ Inverse of ToDict """
+
+        image = cls()
+
+        for name, value in data.items():
+            try:
+                address = FLASH[name]
+            except KeyError:
+                raise ValueError(f"Unknown flash section {name}")
+
+            if address in STRINGS:
+                image.SetString(address, value)
+            else:
+                image[address] = list(bytes.fromhex(value))
+
+        return image
+
+    def Save(self, path: str, serial: bool = False):
+        """ Save image to JSON file, without chip serial number unless
+        serial is True """
+
+        data = self.ToDict()
+
+        if not serial:
+            data.pop(FLASH.CHIP_SERIAL_NUMBER.name, None)
+
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    @classmethod
+    def Load(cls, path: str) -> "FlashImage":
+        """ Load image saved by Save """
+
+        with open(path) as f:
+            return cls.FromDict(json.load(f))
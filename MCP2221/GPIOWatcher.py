@@ -0,0 +1,152 @@
+import queue
+import threading
+from collections import namedtuple
+from time import monotonic
+from typing import Callable, Iterable, Union
+
+from .MCP2221 import MCP2221
+
+GPIOEvent = namedtuple("GPIOEvent", ["time", "pin", "value"])
+
+
+class GPIOWatcher:
+    """ Poll GPIO in background & report debounced changes. Polling runs
+    at min_interval after activity and backs off to max_interval when idle
+    """
+
+    def __init__(self, mcp2221: MCP2221,
+                 callback: Union[Callable[[GPIOEvent], None], None] = None,
+                 pins: Iterable[int] = (0, 1, 2, 3), debounce: float = 0.01,
+                 min_interval: float = 0.002, max_interval: float = 0.1,
+                 backoff: float = 1.5):
+        pins = tuple(pins)
+
+        if not all(0 <= pin <= 3 for pin in pins):
+            raise ValueError("Invalid pin number")
+
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Invalid interval")
+
+        if debounce < 0 or backoff < 1:
+            raise ValueError("Invalid debounce or backoff")
+
+        self.mcp2221 = mcp2221
+        self.callback = callback
+        self.pins = pins
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        # events when no callback is given
+        self.events = queue.Queue()
+
+        self.interval = min_interval  # current polling interval
+        self.polls = 0
+        self.errors = 0  # failed reads
+        self.callback_errors = 0  # exceptions raised by callback
+        self.error = None  # last unexpected exception, watching goes on
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    def Start(self):
+        """ Start watching """
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def Stop(self):
+        """ Stop watching """
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def Get(self, timeout: Union[float, None] = None
+            ) -> Union[GPIOEvent, None]:
+        """ Take next queued event, None on timeout """
+
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _emit(self, event: GPIOEvent):
+        if self.callback is None:
+            self.events.put(event)
+            return
+
+        try:
+            self.callback(event)
+        except Exception as err:
+            self.callback_errors += 1
+            self.error = err
+
+    def _run(self):
+        current = [0, 0, 0, 0]
+        stable = [None, None, None, None]
+        candidate = [None, None, None, None]
+        since = [0.0, 0.0, 0.0, 0.0]
+        self.interval = self.min_interval
+
+        while True:
+            try:
+                ok = self.mcp2221.ReadAllGP(current) is not None
+            except IOError:
+                ok = False
+            except Exception as err:
+                ok = False
+                self.error = err
+
+            now = monotonic()
+            self.polls += 1
+            activity = False
+
+            if not ok:
+                self.errors += 1
+
+            for pin in self.pins if ok else ():
+                value = current[pin]
+
+                if value > 1:  # not GPIO
+                    continue
+
+                if stable[pin] is None:
+                    stable[pin] = value
+                elif value == stable[pin]:
+                    candidate[pin] = None  # bounced back
+                else:
+                    activity = True
+
+                    if candidate[pin] != value:
+                        candidate[pin] = value
+                        since[pin] = now
+
+                    if now - since[pin] >= self.debounce:
+                        stable[pin] = value
+                        candidate[pin] = None
+                        self._emit(GPIOEvent(now, pin, value))
+
+            if activity:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval,
+                                    self.interval * self.backoff)
+
+            if self._stop.wait(self.interval):
+                return
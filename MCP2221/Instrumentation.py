@@ -0,0 +1,211 @@
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter
+from typing import Callable, Dict, List, Union
+
+from .MCP2221 import MCP2221
+
+# latency histogram bucket upper bounds in seconds, last bucket is open
+BUCKETS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005,
+           0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+# pre(opcode, request)
+PreHook = Callable[[int, bytes], None]
+
+# post(opcode, request, response, latency)
+PostHook = Callable[[int, bytes, List[int], float], None]
+
+
+class CommandStats:
+    """ Counters of one command opcode """
+
+    __slots__ = ("count", "errors", "no_response", "bytes_out", "bytes_in",
+                 "write_time", "total", "min", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0  # responses received
+        self.errors = 0  # missing, unexpected or nonzero status
+        self.no_response = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.write_time = 0.0  # spent in hidapi write
+        self.total = 0.0  # request write to response read
+        self.min = None
+        self.max = None
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    @property
+    def mean(self) -> Union[float, None]:
+        return self.total / self.count if self.count else None
+
+    def ToDict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "no_response": self.no_response,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "write_time": self.write_time,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "histogram": list(self.histogram),
+        }
+
+
+class _InstrumentedDevice:
+    """ Wrap an opened hid.device, pairing responses with requests in
+    order so pipelined commands are timed as well """
+
+    def __init__(self, device, instrumentation: "Instrumentation"):
+        self.device = device
+        self.instrumentation = instrumentation
+        self._requests = deque()
+
+    def write(self, buff):
+        request = bytes(buff)
+        opcode = request[1]
+        instrumentation = self.instrumentation
+
+        if instrumentation.pre is not None:
+            instrumentation.pre(opcode, request)
+
+        start = perf_counter()
+        result = self.device.write(buff)
+        end = perf_counter()
+
+        instrumentation._written(opcode, len(request), end - start)
+
+        if opcode != 0x70:  # reset is not answered
+            self._requests.append((opcode, request, start))
+
+        return result
+
+    def read(self, *args, **kwargs):
+        response = self.device.read(*args, **kwargs)
+
+        if not self._requests:
+            return response
+
+        opcode, request, start = self._requests[0]
+
+        # stale response, the request waits for its own one
+        if response and response[0] != opcode:
+            self.instrumentation._unexpected(opcode)
+            return response
+
+        self._requests.popleft()
+        latency = perf_counter() - start
+        instrumentation = self.instrumentation
+        instrumentation._received(opcode, response, latency)
+
+        if instrumentation.post is not None:
+            instrumentation.post(opcode, request, response, latency)
+
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+
+class Instrumentation:
+    """ Per-opcode counters, latency histograms & tracing hooks for all
+    HID traffic of a device. Costs nothing until started """
+
+    def __init__(self, mcp2221: MCP2221,
+                 pre: Union[PreHook, None] = None,
+                 post: Union[PostHook, None] = None):
+        self.mcp2221 = mcp2221
+        self.pre = pre
+        self.post = post
+
+        self._stats = dict()
+        self._lock = threading.Lock()
+        self._device = None
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    @property
+    def running(self) -> bool:
+        return self._device is not None
+
+    def Start(self):
+        """ Start collecting """
+
+        with self.mcp2221._lock:
+            if self._device is not None:
+                return
+
+            self._device = _InstrumentedDevice(self.mcp2221.mcp2221, self)
+            self.mcp2221.mcp2221 = self._device
+
+    def Stop(self):
+        """ Stop collecting, statistics stay available """
+
+        with self.mcp2221._lock:
+            if self._device is None:
+                return
+
+            self.mcp2221._unwrap(self._device)
+
+            self._device = None
+
+    def _get(self, opcode: int) -> CommandStats:
+        stats = self._stats.get(opcode)
+
+        if stats is None:
+            stats = self._stats[opcode] = CommandStats()
+
+        return stats
+
+    def _written(self, opcode: int, length: int, duration: float):
+        with self._lock:
+            stats = self._get(opcode)
+            stats.bytes_out += length
+            stats.write_time += duration
+
+    def _unexpected(self, opcode: int):
+        with self._lock:
+            self._get(opcode).errors += 1
+
+    def _received(self, opcode: int, response: List[int], latency: float):
+        with self._lock:
+            stats = self._get(opcode)
+
+            if not response:
+                stats.no_response += 1
+                stats.errors += 1
+                return
+
+            stats.count += 1
+            stats.bytes_in += len(response)
+            stats.total += latency
+            stats.histogram[bisect_left(BUCKETS, latency)] += 1
+
+            if stats.min is None or latency < stats.min:
+                stats.min = latency
+
+            if stats.max is None or latency > stats.max:
+                stats.max = latency
+
+            if response[1] != 0x00:
+                stats.errors += 1
+
+    def Stats(self) -> Dict[int, Dict[str, object]]:
+        """ Snapshot of counters by opcode """
+
+        with self._lock:
+            return {opcode: stats.ToDict()
+                    for opcode, stats in sorted(self._stats.items())}
+
+    def Reset(self):
+        """ Clear all counters """
+
+        with self._lock:
+            self._stats.clear()
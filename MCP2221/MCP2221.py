@@ -1,7 +1,24 @@
-import hid
-from time import sleep
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from time import monotonic, sleep
 from enum import Enum, unique, auto
-from typing import Dict, List, Union
+from typing import Dict, List, Set, Tuple, Union
+
+from .Transport import (SYSFS_HIDRAW, HidapiTransport, HidrawTransport,
+                        EnumerateHidraw, IsHidraw)
+
+# hidapi, imported on first use so importing the package stays cheap
+hid = None
+
+# default transport: "auto" uses hidraw nodes directly where possible and
+# hidapi otherwise, "hidapi" or "hidraw" force one
+TRANSPORT = "auto"
+
+# enumeration results by (VID, PID)
+_enumeration = dict()
 
 
 class TYPE(Enum):
@@ -55,22 +72,519 @@ class FLASH(Enum):
     CHIP_SERIAL_NUMBER = 0x05
 
 
+# requests without parameters, built once
+_ZERO = bytes(64)
+_GET_STATUS = bytes([0, 0x10]) + bytes(63)  # Status/Set Parameters
+_GET_GPIO = bytes([0, 0x51]) + bytes(63)  # Get GPIO Values
+_GET_SRAM = bytes([0, 0x61]) + bytes(63)  # get SRAM settings
+_RESET = bytes([0, 0x70, 0xAB, 0xCD, 0xEF]) + bytes(60)  # Reset
+_GET_I2C_DATA = bytes([0, 0x40]) + bytes(63)  # I2C Get Data
+
+# read-only requests to find the end of late responses
+_PROBES = (_GET_STATUS, _GET_GPIO, _GET_SRAM)
+
+# I2C engine
+I2C_CHUNK = 60  # max data bytes per report
+I2C_TIMEOUT = 1  # seconds without progress
+I2C_BACKOFF = 0.0005  # seconds between polls of a busy I2C engine
+RESET_DETACH = 0.5  # seconds for the device to drop off the bus on reset
+RESYNC_TIMEOUT = 0.05  # seconds of silence once stale responses are dropped
+_I2C_IDLE = 0x00
+_I2C_ADDR_NACK = 0x25
+_I2C_NOT_READY = 0x41
+_I2C_WRITING_NO_STOP = 0x45
+_I2C_READ_PARTIAL = 0x54
+_I2C_READ_COMPLETE = 0x55
+_I2C_READ_ERROR = 0x7F
+
+
+def _hid():
+    """ Get hid module, import it when needed """
+
+    global hid
+
+    if hid is None:
+        import hid
+
+    return hid
+
+
+def Enumerate(VID=0x04D8, PID=0x00DD, refresh: bool = False) -> List[Dict]:
+    """ List matching HID devices, cached until refreshed """
+
+    if TRANSPORT == "hidraw":
+        return EnumerateHidraw(VID, PID)
+
+    try:
+        module = _hid()
+    except ImportError:
+        if not os.path.isdir(SYSFS_HIDRAW):
+            raise
+
+        return EnumerateHidraw(VID, PID)  # hidapi is not installed
+    cached = _enumeration.get((VID, PID))
+
+    if refresh or cached is None or cached[0] is not module:
+        cached = (module, module.enumerate(VID, PID))
+        _enumeration[(VID, PID)] = cached
+
+    return cached[1]
+
+
+def InvalidateEnumeration():
+    """ Forget cached enumeration, e.g. after plugging a device """
+
+    _enumeration.clear()
+
+
+def _synchronized(method):
+    """ Hold device lock for the whole method """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _Waiter:
+    """ Result of a transaction shared by coalesced callers """
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def Wait(self) -> List[int]:
+        self.event.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+def _gpType(pin: int, setting: int) -> Union[TYPE, None]:
+    """ Decode GP setting byte """
+
+    fn = setting & 0b111
+
+    # shared functions
+    if setting & (1 << 3):
+        return TYPE.INPUT
+    elif (pin == 1 or pin == 2 or pin == 3) and fn == 2:
+        return TYPE.ADC
+    elif (pin == 2 or pin == 3) and fn == 3:
+        return TYPE.DAC
+
+    # GP0
+    elif pin == 0 and fn == 1:
+        return TYPE.SSPND
+    elif pin == 0 and fn == 2:
+        return TYPE.LED_RX
+
+    # GP1
+    elif pin == 1 and fn == 1:
+        return TYPE.CLOCK_OUT
+    elif pin == 1 and fn == 3:
+        return TYPE.LED_TX
+    elif pin == 1 and fn == 4:
+        return TYPE.INTERRUPT
+
+    # GP2
+    elif pin == 2 and fn == 1:
+        return TYPE.USBCFG
+
+    # GP3
+    elif pin == 3 and fn == 1:
+        return TYPE.LED_I2C
+
+    # check for output
+    elif setting & 0b1111 == 0:
+        return TYPE.OUTPUT
+
+
+def _gpSetting(pin: int, type: TYPE, value: bool = False) -> int:
+    """ Encode GP setting byte, inverse of _gpType """
+
+    if type == TYPE.INPUT:
+        return 1 << 3
+    elif type == TYPE.OUTPUT:
+        return (int(value) & 1) << 4
+    elif type == TYPE.SSPND and pin == 0:
+        return 1
+    elif type == TYPE.LED_RX and pin == 0:
+        return 2
+    elif type == TYPE.CLOCK_OUT and pin == 1:
+        return 1
+    elif type == TYPE.ADC and (pin == 1 or pin == 2 or pin == 3):
+        return 2
+    elif type == TYPE.LED_TX and pin == 1:
+        return 3
+    elif type == TYPE.INTERRUPT and pin == 1:
+        return 4
+    elif type == TYPE.USBCFG and pin == 2:
+        return 1
+    elif type == TYPE.DAC and (pin == 2 or pin == 3):
+        return 3
+    elif type == TYPE.LED_I2C and pin == 3:
+        return 1
+    else:
+        raise TypeError(f"Invalid type on pin GP{pin}")
+
+
+def _flashData(address: "FLASH", buf: List[int]) -> List[int]:
+    """ Data of Read Flash Data (0xB0) response, empty on failure """
+
+    if buf[0] == 0xB0 and buf[1] == 0x00:
+        if address == FLASH.GP_SETTING or \
+                address == FLASH.CHIP_SETTING or \
+                address == FLASH.CHIP_SERIAL_NUMBER:
+            return list(buf[4:(4+buf[2])])
+        elif buf[3] == 0x03:
+            return list(buf[4:(4+buf[2]-2)])
+        else:
+            return []
+    else:
+        return []
+
+
+def _vrm(value: int) -> VRM:
+    """ Decode 3 bit voltage reference, VRM value << 1 | VRM used """
+
+    if value & 1:
+        return VRM(value >> 1)
+    else:
+        return VRM.VDD
+
+
+def _vrmSetting(ref: VRM) -> int:
+    """ Encode 3 bit voltage reference, inverse of _vrm """
+
+    if ref == VRM.VDD:
+        return 0
+
+    return (ref.value << 1) | 1
+
+
+class Status:
+    """ Decoded response of Status/Set Parameters (0x10) """
+
+    __slots__ = ("adc", "i2c_cancel", "i2c_speed_set", "i2c_state",
+                 "i2c_requested_length", "i2c_transferred_length",
+                 "i2c_buffer_counter", "i2c_divider", "i2c_timeout",
+                 "i2c_address", "scl", "sda", "interrupt",
+                 "i2c_read_pending", "hardware_revision",
+                 "firmware_revision")
+
+    def __init__(self, buf: List[int]):
+        self.adc = (buf[50] | (buf[51] << 8),
+                    buf[52] | (buf[53] << 8),
+                    buf[54] | (buf[55] << 8))
+        self.i2c_cancel = buf[2]
+        self.i2c_speed_set = buf[3]
+        self.i2c_state = buf[8]
+        self.i2c_requested_length = buf[9] | (buf[10] << 8)
+        self.i2c_transferred_length = buf[11] | (buf[12] << 8)
+        self.i2c_buffer_counter = buf[13]
+        self.i2c_divider = buf[14]
+        self.i2c_timeout = buf[15]
+        self.i2c_address = buf[16] | (buf[17] << 8)
+        self.scl = buf[22]
+        self.sda = buf[23]
+        self.interrupt = bool(buf[24])
+        self.i2c_read_pending = buf[25]
+        self.hardware_revision = chr(buf[46]) + chr(buf[47])
+        self.firmware_revision = chr(buf[48]) + chr(buf[49])
+
+    @property
+    def i2c_speed(self) -> Union[int, None]:
+        """ Current I2C speed in Hz """
+
+        if self.i2c_divider == 0:
+            return None
+
+        return 12000000 // (self.i2c_divider + 3)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class GPIOState:
+    """ Decoded response of Get GPIO Values (0x51), None if not GPIO """
+
+    __slots__ = ("values", "directions")
+
+    def __init__(self, buf: List[int]):
+        self.values = tuple(
+            buf[2 + pin * 2] if buf[2 + pin * 2] <= 1 else None
+            for pin in range(4))
+        self.directions = tuple(
+            buf[3 + pin * 2] if buf[3 + pin * 2] <= 1 else None
+            for pin in range(4))
+
+    @property
+    def inputs(self) -> Tuple[bool, ...]:
+        """ Pins set as GPIO input """
+
+        return tuple(direction == 1 for direction in self.directions)
+
+    __repr__ = Status.__repr__
+
+
+class SRAMSettings:
+    """ Decoded response of Get SRAM Settings (0x61) """
+
+    __slots__ = ("clock_duty", "clock_divider", "dac_ref", "dac",
+                 "adc_ref", "interrupt_rising", "interrupt_falling",
+                 "VID", "PID", "gp")
+
+    def __init__(self, buf: List[int]):
+        self.clock_duty = DUTY((buf[5] >> 3) & 0b11)
+        self.clock_divider = CLOCK(buf[5] & 0b111) \
+            if buf[5] & 0b111 else None
+        self.dac_ref = _vrm(buf[6] >> 5)
+        self.dac = buf[6] & 0b11111
+        self.adc_ref = _vrm((buf[7] >> 2) & 0b111)
+        self.interrupt_rising = bool(buf[7] & (1 << 5))
+        self.interrupt_falling = bool(buf[7] & (1 << 6))
+        self.VID = buf[8] | (buf[9] << 8)
+        self.PID = buf[10] | (buf[11] << 8)
+        self.gp = tuple(buf[22:26])  # raw GP0-GP3 settings
+
+    @property
+    def types(self) -> Tuple[Union[TYPE, None], ...]:
+        """ Function of GP0-GP3 """
+
+        return tuple(_gpType(pin, self.gp[pin]) for pin in range(4))
+
+    @property
+    def values(self) -> Tuple[int, ...]:
+        """ Output value of GP0-GP3 """
+
+        return tuple((setting >> 4) & 1 for setting in self.gp)
+
+    __repr__ = Status.__repr__
+
+
 class MCP2221:
-    def __init__(self, VID=0x04D8, PID=0x00DD, dev=0):
-        self.mcp2221 = hid.device()
-        self.mcp2221.open_path(hid.enumerate(VID, PID)[dev]["path"])
+    def __init__(self, VID=0x04D8, PID=0x00DD, dev=0, cache=False,
+                 device=None, coalesce=False, path=None, serial=None,
+                 transport=None, timeout=None):
+        # how to open the device again after reset, None if given
+        self._reopen = None
+
+        if device is None:
+            device = self._open(VID, PID, dev, path, serial, transport,
+                                timeout)
+            self._reopen = (dev, path, serial, transport, timeout)
+
+        # Transport, opened hid.device or anything with the same interface,
+        # possibly wrapped by instrumentation or recording
+        self.mcp2221 = device
+        self._handle = device  # innermost, replaced on reconnect
         self.VID = VID
         self.PID = PID
 
+        # serializes transactions of all threads
+        self._lock = threading.RLock()
+
+        # concurrent identical reads share one transaction when enabled
+        self._coalesce = coalesce
+        self._inflight = dict()
+        self._inflight_lock = threading.Lock()
+
+        # shadow copy of the 0x61 response, only kept when cache is enabled
+        self._cache = cache
+        self._sram = None
+
+        # 0x60 buffer collecting setters while a transaction is open
+        self._pending = None
+
+        # ADC reference last set or read, None if unknown
+        self._adc_ref = None
+
+        # requests written but not yet answered while pipelining
+        self._pipeline = None
+        self._window = 0
+
+        # commands whose late responses may still arrive
+        self._lost = set()
+
+        # reusable output reports
+        self._buf = bytearray(65)
+        self._config = bytearray(65)
+
+        if cache:
+            self._readSRAM()
+
+    @staticmethod
+    def _open(VID: int, PID: int, dev: int, path, serial: Union[str, None],
+              transport: Union[str, None] = None,
+              timeout: Union[float, None] = None):
+        """ Open by serial or path directly, otherwise by index """
+
+        transport = transport or TRANSPORT
+
+        if transport not in ("auto", "hidapi", "hidraw"):
+            raise ValueError("Invalid transport")
+
+        def open_path(path):
+            if transport != "hidapi" and IsHidraw(path):
+                try:
+                    return HidrawTransport(path, timeout)
+                except OSError:
+                    if transport == "hidraw":
+                        raise
+
+            if transport == "hidraw":
+                raise IOError("Not a hidraw node")
+
+            device = _hid().device()
+            device.open_path(path)
+            return HidapiTransport(device, timeout, path)
+
+        if serial is not None:
+            if transport != "hidapi":
+                for info in EnumerateHidraw(VID, PID):
+                    if info["serial_number"] == serial:
+                        try:
+                            return HidrawTransport(info["path"], timeout)
+                        except OSError:
+                            if transport == "hidraw":
+                                raise
+
+            if transport == "hidraw":
+                raise IOError("open failed")
+
+            device = _hid().device()
+            device.open(VID, PID, serial)
+            return HidapiTransport(device, timeout)
+
+        if path is not None:
+            return open_path(path)
+
+        if transport == "hidraw":
+            return open_path(EnumerateHidraw(VID, PID)[dev]["path"])
+
+        try:
+            return open_path(Enumerate(VID, PID)[dev]["path"])
+        except (IndexError, IOError, OSError):
+            # cached list might be outdated
+            return open_path(Enumerate(VID, PID, refresh=True)[dev]["path"])
+
+    def _readSRAM(self) -> List[int]:
+        """ Get SRAM settings, served from shadow copy when cached """
+
+        if self._sram is not None:
+            return self._sram
+
+        return self._send(_GET_SRAM)
+
+    def _prepare(self, cmd: int, buf: Union[bytearray, None] = None
+                 ) -> bytearray:
+        """ Clear reusable output report & set command """
+
+        if buf is None:
+            buf = self._buf
+
+        buf[1:] = _ZERO
+        buf[0 + 1] = cmd
+
+        return buf
+
+    def _updateCache(self, request: List[int], response: List[int]):
+        """ Keep shadow copy of SRAM in sync with what was sent """
+
+        cmd = request[1]
+
+        if len(response) < 26 or response[0] != cmd or response[1] != 0x00:
+            return
+
+        if cmd == 0x61:  # get SRAM settings
+            self._sram = list(response)
+            return
+
+        self._applyCache(request)
+
+    def _applyCache(self, request: List[int]):
+        """ Apply set SRAM or GPIO request to shadow copy of SRAM """
+
+        cmd = request[1]
+        sram = self._sram
+
+        if sram is None:
+            return
+
+        if cmd == 0x60:  # set SRAM settings
+            # Clock Output Divider Value
+            if request[2 + 1] & 0b10000000:
+                sram[5] = (sram[5] & ~0b11111) | (request[2 + 1] & 0b11111)
+
+            # DAC Voltage Reference
+            if request[3 + 1] & 0b10000000:
+                sram[6] = (sram[6] & 0b11111) | \
+                    ((request[3 + 1] & 0b111) << 5)
+
+            # DAC value
+            if request[4 + 1] & 0b10000000:
+                sram[6] = (sram[6] & ~0b11111) | (request[4 + 1] & 0b11111)
+
+            # ADC Voltage Reference
+            if request[5 + 1] & 0b10000000:
+                sram[7] = (sram[7] & ~0b11100) | \
+                    ((request[5 + 1] & 0b111) << 2)
+
+            # Interrupt detection
+            if request[6 + 1] & 0b10000000:
+                if request[6 + 1] & (1 << 4):  # positive edge altered
+                    sram[7] &= ~(1 << 5)
+                    sram[7] |= ((request[6 + 1] >> 3) & 1) << 5
+
+                if request[6 + 1] & (1 << 2):  # negative edge altered
+                    sram[7] &= ~(1 << 6)
+                    sram[7] |= ((request[6 + 1] >> 1) & 1) << 6
+
+            # GP0-GP3 Settings
+            if request[7 + 1] & 0b10000000:
+                sram[22:26] = request[9:13]
+
+        elif cmd == 0x50:  # set GPIO values
+            for pin in range(4):
+                offset = pin * 4 + 1
+
+                if sram[22 + pin] & 0b111:  # not GPIO, ignored by chip
+                    continue
+
+                if request[2 + offset]:  # output value altered
+                    sram[22 + pin] &= ~(1 << 4)
+                    sram[22 + pin] |= (request[3 + offset] & 1) << 4
+
+                if request[4 + offset]:  # direction altered
+                    sram[22 + pin] &= ~(1 << 3)
+                    sram[22 + pin] |= (request[5 + offset] & 1) << 3
+
+    @_synchronized
+    def InvalidateCache(self):
+        """ Drop shadow copy of SRAM, next access reads it from device """
+
+        self._sram = None
+        self._adc_ref = None
+
     def _getConfig(self):
         """ Get current config & prepare for set """
 
-        buf = [0] * 65
-        buf[1] = 0x61  # get SRAM settings
-        rbuf = self._send(buf)
-        # print(rbuf)
+        if self._pending is not None:
+            return self._pending
+
+        rbuf = self._readSRAM()
 
-        buf[0 + 1] = 0x60  # set SRAM settings
+        buf = self._prepare(0x60, self._config)  # set SRAM settings
 
         # Clock Output Divider Value
         buf[2 + 1] |= (rbuf[5] & 0b11111)
@@ -81,8 +595,7 @@ class MCP2221:
         # ADC Voltage Reference
         buf[5 + 1] |= (rbuf[7] >> 2) & 0b111
 
-        # Interrupt detection
-        # TODO
+        # Interrupt detection, unaltered unless bit 7 is set
 
         # GP0 Settings
         buf[8 + 1] = rbuf[22]
@@ -98,12 +611,375 @@ class MCP2221:
 
         return buf
 
-    def _send(self, buffer: List[int]) -> List[int]:
+    def _emptyConfig(self) -> bytearray:
+        """ Prepare set without reading current config, fine for fields
+        whose bit 7 marks them as altered, others stay as they are """
+
+        if self._pending is not None:
+            return self._pending
+
+        return self._prepare(0x60, self._config)  # set SRAM settings
+
+    def _setConfig(self, buf: bytearray):
+        """ Set SRAM settings, deferred while a transaction is open """
+
+        if buf is not self._pending:
+            self._post(buf)
+
+    def _verifyConfig(self, buf: bytearray) -> bool:
+        """ Read SRAM back and compare with what was set """
+
+        rbuf = self._send(_GET_SRAM)
+
+        if rbuf[0] != 0x61 or rbuf[1] != 0x00:
+            return False
+
+        # Clock Output Divider Value
+        if buf[2 + 1] & 0b10000000 and \
+                rbuf[5] & 0b11111 != buf[2 + 1] & 0b11111:
+            return False
+
+        # DAC Voltage Reference
+        if buf[3 + 1] & 0b10000000 and rbuf[6] >> 5 != buf[3 + 1] & 0b111:
+            return False
+
+        # DAC value
+        if buf[4 + 1] & 0b10000000 and \
+                rbuf[6] & 0b11111 != buf[4 + 1] & 0b11111:
+            return False
+
+        # ADC Voltage Reference
+        if buf[5 + 1] & 0b10000000 and \
+                (rbuf[7] >> 2) & 0b111 != buf[5 + 1] & 0b111:
+            return False
+
+        # Interrupt detection
+        if buf[6 + 1] & 0b10000000:
+            if buf[6 + 1] & (1 << 4) and \
+                    (rbuf[7] >> 5) & 1 != (buf[6 + 1] >> 3) & 1:
+                return False
+
+            if buf[6 + 1] & (1 << 2) and \
+                    (rbuf[7] >> 6) & 1 != (buf[6 + 1] >> 1) & 1:
+                return False
+
+        # GP0-GP3 Settings
+        if buf[7 + 1] & 0b10000000:
+            for pin in range(4):
+                mask = 0b1111
+
+                if buf[9 + pin] & 0b1111 == 0:  # GPIO output
+                    mask = 0b11111
+
+                if rbuf[22 + pin] & mask != buf[9 + pin] & mask:
+                    return False
+
+        return True
+
+    @contextmanager
+    def Transaction(self, verify: bool = False):
+        """ Merge configuration changes into a single SRAM write """
+
+        with self._lock:
+            if self._pending is not None:  # nested, outer one will commit
+                yield self
+                return
+
+            self._pending = self._getConfig()
+
+            try:
+                yield self
+                buf = self._pending
+            except BaseException:
+                self._adc_ref = None  # setters were not applied
+                raise
+            finally:
+                self._pending = None
+
+            # nothing to alter
+            if not any(buf[i] & 0b10000000 for i in (3, 4, 5, 6, 7, 8)):
+                return
+
+            rbuf = self._send(buf)
+
+            if rbuf[0] != 0x60 or rbuf[1] != 0x00:
+                self._adc_ref = None
+                raise IOError("Failed to set SRAM settings")
+
+            if verify and not self._verifyConfig(buf):
+                raise IOError("SRAM settings verification failed")
+
+    def _send(self, buffer: Union[bytes, bytearray, List[int]]
+              ) -> List[int]:
         """ Send buffer """
 
+        if self._coalesce and (buffer is _GET_STATUS or
+                               buffer is _GET_GPIO or
+                               buffer is _GET_SRAM):
+            return self._sendCoalesced(buffer)
+
+        with self._lock:
+            return self._transfer(buffer)
+
+    def _sendCoalesced(self, buffer: bytes) -> List[int]:
+        """ Send read request, or wait for identical one in flight. Only
+        the lock holder registers as leader, so a waiter never waits for
+        a leader blocked on a lock held by the waiter """
+
+        with self._inflight_lock:
+            waiter = self._inflight.get(buffer)
+
+        if waiter is not None:
+            return waiter.Wait()
+
+        with self._lock:
+            waiter = _Waiter()
+
+            with self._inflight_lock:
+                self._inflight[buffer] = waiter
+
+            try:
+                waiter.result = self._transfer(buffer)
+            except BaseException as err:
+                waiter.error = err
+                raise
+            finally:
+                with self._inflight_lock:
+                    del self._inflight[buffer]
+
+                waiter.event.set()
+
+        return waiter.result
+
+    def _post(self, buffer: Union[bytes, bytearray, List[int]]
+              ) -> Union[List[int], None]:
+        """ Send buffer whose response is only checked for errors,
+        returns None when the response is deferred by a pipeline """
+
+        if self._pipeline is None:
+            return self._send(buffer)
+
+        with self._lock:
+            if self._pipeline is None:  # closed by another thread
+                return self._send(buffer)
+
+            if len(self._pipeline) >= self._window:
+                self._collect()
+
+            if self._lost:
+                self._sync()
+
+            self.mcp2221.write(buffer)
+            self._pipeline.append(bytes(buffer))
+
+            # later setters build on the shadow copy before responses
+            # arrive, a failed response drops it
+            if self._cache:
+                self._applyCache(buffer)
+
+        return None
+
+    def _collect(self):
+        """ Read & check response of the oldest pipelined request """
+
+        request = self._pipeline.popleft()
+
+        try:
+            rbuf = self.mcp2221.read(65)
+
+            if not rbuf:
+                raise IOError("No response")
+
+            if rbuf[0] != request[1]:
+                raise IOError(f"Unexpected response 0x{rbuf[0]:02X} "
+                              f"to command 0x{request[1]:02X}")
+        except IOError:
+            # later responses are out of step, drop all of them
+            commands = [request[1]] + [buf[1] for buf in self._pipeline]
+            self._pipeline.clear()
+            self._resync(commands)
+            raise
+
+        if rbuf[1] != 0x00:
+            self._discard()
+            raise IOError(f"Command 0x{request[1]:02X} failed "
+                          f"with status 0x{rbuf[1]:02X}")
+
+    def _discard(self):
+        """ Drop responses of pipelined requests after an error """
+
+        while self._pipeline:
+            self._pipeline.popleft()
+            self.mcp2221.read(65)
+
+        self.InvalidateCache()
+
+    def _resync(self, commands: List[int]):
+        """ Drop pending input after a missing or unexpected response, up
+        to the response of a single command. Commands whose responses may
+        still arrive are probed for by the next transfer. The shadow copy
+        is dropped too, as the outcome is unknown """
+
+        timeout = round(RESYNC_TIMEOUT * 1000)
+        self.InvalidateCache()
+
+        while True:
+            rbuf = self.mcp2221.read(65, timeout)
+
+            if not rbuf:
+                self._lost.update(commands)
+                return
+
+            if len(commands) == 1 and rbuf[0] == commands[0]:
+                return
+
+    def _sync(self):
+        """ Write a probe none of the lost commands could be answered like
+        & drop input up to its response, late ones arrive before it """
+
+        probe = next((buf for buf in _PROBES if buf[1] not in self._lost),
+                     _PROBES[0])
+        self.mcp2221.write(probe)
+
+        while True:
+            rbuf = self.mcp2221.read(65)
+
+            if not rbuf:
+                self._lost.add(probe[1])
+                raise IOError("No response")
+
+            if rbuf[0] == probe[1]:
+                break
+
+        self._lost.clear()
+
+    def _drain(self):
+        """ Collect all pipelined responses """
+
+        while self._pipeline:
+            self._collect()
+
+    @contextmanager
+    def Pipeline(self, window: int = 8):
+        """ Write commands without waiting for responses, up to window
+        of them in flight. Responses are checked in order, IOError is
+        raised on the first failed one. Reads wait for the pipeline """
+
+        if window < 1:
+            raise ValueError("Invalid window")
+
+        with self._lock:
+            if self._pipeline is not None:  # nested, outer one drains
+                yield self
+                return
+
+            self._pipeline = deque()
+            self._window = window
+
+            try:
+                yield self
+                self._drain()
+            finally:
+                try:
+                    if self._pipeline:
+                        self._discard()
+                finally:
+                    self._pipeline = None
+
+    def _transfer(self, buffer: Union[bytes, bytearray, List[int]]
+                  ) -> List[int]:
+        """ Write request & read its response, lock must be held """
+
+        if self._pipeline:
+            self._drain()
+
+        if self._lost:
+            self._sync()
+
         self.mcp2221.write(buffer)
-        return self.mcp2221.read(65)
+        rbuf = self.mcp2221.read(65)
+
+        if not rbuf:
+            self._resync([buffer[1]])  # late response
+            raise IOError("No response")
+
+        if rbuf[0] != buffer[1]:
+            self._resync([buffer[1]])
+            raise IOError(f"Unexpected response 0x{rbuf[0]:02X} "
+                          f"to command 0x{buffer[1]:02X}")
+
+        if self._cache:
+            self._updateCache(buffer, rbuf)
 
+        return rbuf
+
+    def _transferMany(self, buffers: List[bytes],
+                      window: Union[int, None] = None) -> List[List[int]]:
+        """ Write requests up to window (all if None) ahead of reading
+        their responses, which are returned in order. Lock must be held """
+
+        if self._pipeline:
+            self._drain()
+
+        if self._lost:
+            self._sync()
+
+        write = self.mcp2221.write
+        read = self.mcp2221.read
+        limit = len(buffers)  # requests to write
+        window = limit if window is None else window
+        written = 0
+        responses = []
+
+        for index in range(limit):
+            while written < limit and written - index < window:
+                write(buffers[written])
+                written += 1
+
+            rbuf = read(65)
+            buffer = buffers[index]
+
+            if not rbuf:
+                error = IOError("No response")
+            elif rbuf[0] != buffer[1]:
+                error = IOError(f"Unexpected response 0x{rbuf[0]:02X} "
+                                f"to command 0x{buffer[1]:02X}")
+            else:
+                if self._cache:
+                    self._updateCache(buffer, rbuf)
+
+                responses.append(rbuf)
+                continue
+
+            # responses of written requests are out of step, drop them
+            self._resync([buf[1] for buf in buffers[index:written]])
+            raise error
+
+        return responses
+
+    @_synchronized
+    def GetSRAMSettings(self) -> Union[SRAMSettings, None]:
+        """ Read current SRAM settings, from shadow copy when cached """
+
+        buf = self._readSRAM()
+
+        if buf[0] == 0x61 and buf[1] == 0x00:
+            settings = SRAMSettings(buf)
+            self._adc_ref = settings.adc_ref
+            return settings
+        else:
+            return None
+
+    @_synchronized
+    def GetADCVoltageReference(self) -> Union[VRM, None]:
+        """ ADC voltage reference, read from device only when unknown """
+
+        if self._adc_ref is None:
+            self.GetSRAMSettings()
+
+        return self._adc_ref
+
+    @_synchronized
     def SetClockOutput(self, duty: DUTY, clock: CLOCK):
         """ Set clock output """
 
@@ -112,59 +988,122 @@ class MCP2221:
         if not isinstance(clock, CLOCK):
             raise TypeError("Invalid clock divider value")
 
-        buf = self._getConfig()
+        buf = self._emptyConfig()
         buf[2 + 1] = 0b10000000  # set mode
         buf[2 + 1] |= clock.value
         buf[2 + 1] |= (duty.value << 3)
 
-        self._send(buf)
+        self._setConfig(buf)
 
+    @_synchronized
     def SetDACVoltageReference(self, ref: VRM):
         """ Set DAC voltage reference """
 
         if not isinstance(ref, VRM):
             raise TypeError("Invalid DAC voltage reference")
 
-        buf = self._getConfig()
+        buf = self._emptyConfig()
         buf[3 + 1] = 0b10000000  # set mode
 
         if ref != VRM.VDD:
             buf[3 + 1] |= ref.value << 1
             buf[3 + 1] |= 0b1
 
-        self._send(buf)
+        self._setConfig(buf)
 
+    @_synchronized
     def WriteDAC(self, value: int):
         """ Write DAC value (0-31) """
 
         if not 0 <= value <= 31:
             raise ValueError("Invalid value")
 
-        buf = self._getConfig()
-        buf[4 + 1] |= 0b10000000  # set mode
+        buf = self._emptyConfig()
+        buf[4 + 1] = 0b10000000  # set mode
         buf[4 + 1] |= value
 
-        self._send(buf)
+        self._setConfig(buf)
 
+    @_synchronized
     def SetADCVoltageReference(self, ref: VRM):
         """ Set ADC voltage reference """
 
         if not isinstance(ref, VRM):
             raise TypeError("Invalid ADC voltage reference")
 
-        buf = self._getConfig()
+        buf = self._emptyConfig()
         buf[5 + 1] = 0b10000000  # set mode
 
         if ref != VRM.VDD:
             buf[5 + 1] |= ref.value << 1
             buf[5 + 1] |= 0b1  # VRM is used
 
-        self._send(buf)
+        self._setConfig(buf)
+        self._adc_ref = ref
+
+    @_synchronized
+    def SetInterruptDetection(self, rising: bool, falling: bool):
+        """ Set GP1 interrupt edges & clear interrupt flag """
+
+        buf = self._emptyConfig()
+        buf[6 + 1] = 0b10000000  # alter interrupt detection
+        buf[6 + 1] |= 1 << 4  # alter positive edge
+        buf[6 + 1] |= int(bool(rising)) << 3
+        buf[6 + 1] |= 1 << 2  # alter negative edge
+        buf[6 + 1] |= int(bool(falling)) << 1
+        buf[6 + 1] |= 1  # clear interrupt flag
+
+        self._setConfig(buf)
+
+    def GetInterruptFlag(self) -> Union[bool, None]:
+        """ Read interrupt flag latched by the chip """
+
+        buf = self._send(_GET_STATUS)
+
+        if buf[0] == 0x10 and buf[1] == 0x00:
+            return bool(buf[24])
+        else:
+            return None
+
+    @_synchronized
+    def ClearInterruptFlag(self):
+        """ Clear interrupt flag """
+
+        if self._pending is not None:
+            self._pending[6 + 1] |= 0b10000001
+            return
+
+        buf = self._prepare(0x60)  # set SRAM settings
+        buf[6 + 1] = 0b10000001  # clear interrupt flag
+
+        self._post(buf)
+
+    def WaitForInterrupt(self, timeout: Union[float, None] = None,
+                         interval: float = 0.01, clear: bool = True) -> bool:
+        """ Wait for edge on GP1, False on timeout. The chip latches the
+        flag, so polling it every interval does not miss short pulses """
+
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+            if self.GetInterruptFlag():
+                if clear:
+                    self.ClearInterruptFlag()
+
+                return True
+
+            if deadline is None:
+                sleep(interval)
+                continue
+
+            remaining = deadline - monotonic()
 
-    def SetInterruptDetection(self):
-        # TODO
-        raise Exception("Not yet implemented")
+            if remaining <= 0:
+                return False
 
+            sleep(min(interval, remaining))
+
+    @_synchronized
     def InitGP(self, pin: int, type: TYPE, value: bool = False):
         """ Init GPIO """
 
@@ -181,36 +1120,11 @@ class MCP2221:
         if pin not in pin_index:
             raise ValueError("Invalid pin number")
 
-        buf_offset = pin_index[pin]
-        buf[buf_offset] = 0
-
-        if type == TYPE.INPUT:
-            buf[buf_offset] = 1 << 3
-        elif type == TYPE.OUTPUT:
-            buf[buf_offset] = (int(value) & 1) << 4
-        elif type == TYPE.SSPND and pin == 0:
-            buf[buf_offset] = 1
-        elif type == TYPE.LED_RX and pin == 0:
-            buf[buf_offset] = 2
-        elif type == TYPE.CLOCK_OUT and pin == 1:
-            buf[buf_offset] = 1
-        elif type == TYPE.ADC and (pin == 1 or pin == 2 or pin == 3):
-            buf[buf_offset] = 2
-        elif type == TYPE.LED_TX and pin == 1:
-            buf[buf_offset] = 3
-        elif type == TYPE.INTERRUPT and pin == 1:
-            buf[buf_offset] = 4
-        elif type == TYPE.USBCFG and pin == 2:
-            buf[buf_offset] = 1
-        elif type == TYPE.DAC and (pin == 2 or pin == 3):
-            buf[buf_offset] = 3
-        elif type == TYPE.LED_I2C and pin == 3:
-            buf[buf_offset] = 1
-        else:
-            raise TypeError(f"Invalid type on pin GP{pin}")
+        buf[pin_index[pin]] = _gpSetting(pin, type, value)
 
-        self._send(buf)
+        self._setConfig(buf)
 
+    @_synchronized
     def GetGPType(self, pin: int) -> TYPE:
         pin_index = {
             0: 9,  # 8 + 1
@@ -224,52 +1138,33 @@ class MCP2221:
 
         buf = self._getConfig()
 
-        buf_offset = pin_index.get(pin)
-        fn = buf[buf_offset] & 0b111
-
-        # shared functions
-        if buf[buf_offset] & (1 << 3):
-            return TYPE.INPUT
-        elif (pin == 1 or pin == 2 or pin == 3) and fn == 2:
-            return TYPE.ADC
-        elif (pin == 2 or pin == 3) and fn == 3:
-            return TYPE.DAC
-
-        # GP0
-        elif pin == 0 and fn == 1:
-            return TYPE.SSPND
-        elif pin == 0 and fn == 2:
-            return TYPE.LED_RX
-
-        # GP1
-        elif pin == 1 and fn == 1:
-            return TYPE.CLOCK_OUT
-        elif pin == 1 and fn == 3:
-            return TYPE.LED_TX
-        elif pin == 1 and fn == 4:
-            return TYPE.INTERRUPT
-
-        # GP2
-        elif pin == 2 and fn == 1:
-            return TYPE.USBCFG
-
-        # GP3
-        elif pin == 3 and fn == 1:
-            return TYPE.LED_I2C
-
-        # check for output
-        elif buf[buf_offset] & 0b1111 == 0:
-            return TYPE.OUTPUT
-
-    def ReadAllGP(self):
-        """ Read GPIOs in bulk (when set as input or output) """
-
-        buf = [0] * 65
-        buf[1] = 0x51  # Get GPIO Values
-        buf = self._send(buf)
+        return _gpType(pin, buf[pin_index[pin]])
+
+    def ReadAllGP(self, out: Union[List[int], None] = None):
+        """ Read GPIOs in bulk (when set as input or output),
+        optionally into given list of 4 items """
+
+        buf = self._send(_GET_GPIO)
+
+        if buf[0] == 0x51 and buf[1] == 0x00:
+            if out is None:
+                return [buf[2], buf[4], buf[6], buf[8]]
+
+            out[0] = buf[2]
+            out[1] = buf[4]
+            out[2] = buf[6]
+            out[3] = buf[8]
+            return out
+        else:
+            return None
+
+    def GetGPIOState(self) -> Union[GPIOState, None]:
+        """ Read values & directions of GPIOs """
+
+        buf = self._send(_GET_GPIO)
 
         if buf[0] == 0x51 and buf[1] == 0x00:
-            return [buf[2], buf[4], buf[6], buf[8]]
+            return GPIOState(buf)
         else:
             return None
 
@@ -286,12 +1181,12 @@ class MCP2221:
         else:
             return None
 
+    @_synchronized
     def WriteAllGP(self, gp0: Union[int, None], gp1: Union[int, None],
                    gp2: Union[int, None], gp3: Union[int, None]):
         """ Write GPIO output """
 
-        buf = [0] * 65
-        buf[0 + 1] = 0x50  # Set GPIO Values
+        buf = self._prepare(0x50)  # Set GPIO Values
 
         if gp0 is not None:
             buf[2 + 1] = 1  # Alter GPIO output
@@ -309,33 +1204,46 @@ class MCP2221:
             buf[14 + 1] = 1  # Alter GPIO output
             buf[15 + 1] = gp3  # output value
 
-        self._send(buf)
+        self._post(buf)
 
+    @_synchronized
     def WriteGP(self, pin: int, value: int):
         """ Write GPIO output """
 
         if not 0 <= pin <= 3:
             raise ValueError("Invalid pin number")
 
-        buf = [0] * 65
-        buf[0 + 1] = 0x50  # Set GPIO Values
+        buf = self._prepare(0x50)  # Set GPIO Values
         buf[2 + pin * 4 + 1] = 1  # Alter GPIO output
         buf[3 + pin * 4 + 1] = value & 1  # output value
 
-        self._send(buf)
+        self._post(buf)
 
-    def ReadAllADC(self):
-        """ Read ADC in bulk """
+    def ReadAllADC(self, out: Union[List[int], None] = None):
+        """ Read ADC in bulk, optionally into given list of 3 items """
 
-        buf = [0] * 65
-        buf[0 + 1] = 0x10  # Status/Set Parameters
+        buf = self._send(_GET_STATUS)
 
-        buf = self._send(buf)
+        if buf[0] == 0x10 and buf[1] == 0x00:
+            if out is None:
+                return [buf[50] | (buf[51] << 8),
+                        buf[52] | (buf[53] << 8),
+                        buf[54] | (buf[55] << 8)]
+
+            out[0] = buf[50] | (buf[51] << 8)
+            out[1] = buf[52] | (buf[53] << 8)
+            out[2] = buf[54] | (buf[55] << 8)
+            return out
+        else:
+            return None
+
+    def GetStatus(self) -> Union[Status, None]:
+        """ Read ADC, I2C engine, interrupt & revision in one go """
+
+        buf = self._send(_GET_STATUS)
 
         if buf[0] == 0x10 and buf[1] == 0x00:
-            return [buf[50] | (buf[51] << 8),
-                    buf[52] | (buf[53] << 8),
-                    buf[54] | (buf[55] << 8)]
+            return Status(buf)
         else:
             return None
 
@@ -362,32 +1270,37 @@ class MCP2221:
 
         return output
 
+    @_synchronized
     def ReadFlash(self, address: FLASH):
         """ Read data from flash """
 
         if not isinstance(address, FLASH):
             raise TypeError("Invalid flash address")
 
-        buf = [0] * 65
-        buf[0 + 1] = 0xB0  # Read Flash Data
+        buf = self._prepare(0xB0)  # Read Flash Data
         buf[1 + 1] = address.value
 
-        buf = self._send(buf)
+        return _flashData(address, self._send(buf))
 
-        if buf[0] == 0xB0 and buf[1] == 0x00:
-            if address == FLASH.GP_SETTING or \
-                    address == FLASH.CHIP_SETTING or \
-                    address == FLASH.CHIP_SERIAL_NUMBER:
-                return buf[4:(4+buf[2])]
-            elif buf[3] == 0x03:
-                return buf[4:(4+buf[2]-2)]
-            else:
-                return []
-        else:
-            return []
+    @_synchronized
+    def ReadAllFlash(self) -> Dict[FLASH, List[int]]:
+        """ Read all flash sections, requests are sent back-to-back """
+
+        buffers = []
+
+        for address in FLASH:
+            buf = self._prepare(0xB0)  # Read Flash Data
+            buf[1 + 1] = address.value
+            buffers.append(bytes(buf))
+
+        responses = self._transferMany(buffers)
+
+        return {address: _flashData(address, buf)
+                for address, buf in zip(FLASH, responses)}
 
+    @_synchronized
     def WriteFlash(self, address: FLASH, data: List[int]) -> Union[int, None]:
-        """ Write data to flash """
+        """ Write data to flash, returns status (None if pipelined) """
 
         if not isinstance(address, FLASH) \
                 or address == FLASH.CHIP_SERIAL_NUMBER:
@@ -396,23 +1309,375 @@ class MCP2221:
         if len(data) == 0 or len(data) > 60:
             raise ValueError("Invalid data length")
 
-        buf = [0] * 3
-        buf[0 + 1] = 0xB1  # Write Flash Data
+        buf = self._prepare(0xB1)  # Write Flash Data
         buf[1 + 1] = address.value
+        buf[3:3 + len(data)] = data
 
-        fill = [0] * (65 - 3 - len(data))
+        buf = self._post(buf)
 
-        buf = self._send([*buf, *data, *fill])
+        if buf is None:  # pipelined, checked later
+            return None
 
         if buf[0] == 0xB1:
             return buf[1]
         else:
             return None
 
-    def Reset(self):
-        """ Reset the device """
+    @_synchronized
+    def I2CSetSpeed(self, speed: int = 100000):
+        """ Set I2C speed in Hz """
+
+        if not 47000 <= speed <= 400000:
+            raise ValueError("Invalid I2C speed")
+
+        buf = self._prepare(0x10)  # Status/Set Parameters
+        buf[3 + 1] = 0x20  # set I2C speed
+        buf[4 + 1] = 12000000 // speed - 3  # system clock divider
+
+        buf = self._send(buf)
+
+        if buf[0] != 0x10 or buf[3] != 0x20:
+            raise IOError("Failed to set I2C speed")
+
+    @_synchronized
+    def I2CCancel(self):
+        """ Cancel current I2C transfer & free the bus """
+
+        buf = self._prepare(0x10)  # Status/Set Parameters
+        buf[2 + 1] = 0x10  # cancel current I2C transfer
+
+        self._send(buf)
+
+    def _i2cWait(self):
+        """ Wait for I2C engine to finish the transfer, times out after
+        I2C_TIMEOUT without progress """
+
+        deadline = monotonic() + I2C_TIMEOUT
+        transferred = None
+
+        while True:
+            buf = self._send(_GET_STATUS)
+            state = buf[8]
+
+            if buf[11:13] != transferred:  # bytes on the bus advanced
+                transferred = buf[11:13]
+                deadline = monotonic() + I2C_TIMEOUT
+
+            if state in (_I2C_IDLE, _I2C_WRITING_NO_STOP):
+                return
+
+            if state == _I2C_ADDR_NACK:
+                self.I2CCancel()
+                raise IOError("I2C address not acknowledged")
+
+            if monotonic() > deadline:
+                self.I2CCancel()
+                raise IOError("I2C timeout")
+
+            sleep(I2C_BACKOFF)
+
+    def _i2cWrite(self, cmd: int, address: int, data: bytes):
+        """ Write data in chunks of I2C_CHUNK bytes """
+
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+
+        data = memoryview(data)
+        length = len(data)
+
+        if not 0 <= address <= 127:
+            raise ValueError("Invalid I2C address")
+
+        if not 0 < length <= 0xFFFF:
+            raise ValueError("Invalid data length")
+
+        deadline = monotonic() + I2C_TIMEOUT
+        start = 0
+
+        while start < length:
+            chunk = min(length - start, I2C_CHUNK)
+
+            buf = self._prepare(cmd)
+            buf[1 + 1] = length & 0xFF
+            buf[2 + 1] = length >> 8
+            buf[3 + 1] = address << 1
+            buf[4 + 1:4 + 1 + chunk] = data[start:start + chunk]
+
+            buf = self._send(buf)
+
+            if buf[0] == cmd and buf[1] == 0x00:
+                start += chunk
+                deadline = monotonic() + I2C_TIMEOUT
+            elif monotonic() > deadline:  # engine still busy
+                self.I2CCancel()
+                raise IOError("I2C timeout")
+            else:
+                sleep(I2C_BACKOFF)
+
+        # only now the status is needed, to catch NACK
+        self._i2cWait()
+
+    def _i2cRead(self, cmd: int, address: int, length: int,
+                 out: Union[bytearray, None]) -> bytearray:
+        """ Read data in chunks of I2C_CHUNK bytes """
+
+        if not 0 <= address <= 127:
+            raise ValueError("Invalid I2C address")
+
+        if not 0 < length <= 0xFFFF:
+            raise ValueError("Invalid data length")
+
+        if out is None:
+            out = bytearray(length)
+        elif len(out) < length:
+            raise ValueError("Buffer too small")
+
+        buf = self._prepare(cmd)
+        buf[1 + 1] = length & 0xFF
+        buf[2 + 1] = length >> 8
+        buf[3 + 1] = (address << 1) | 1
+
+        buf = self._send(buf)
+
+        if buf[0] != cmd or buf[1] != 0x00:
+            self.I2CCancel()
+            raise IOError("I2C read failed")
+
+        deadline = monotonic() + I2C_TIMEOUT
+        start = 0
 
-        buf = [0x00, 0x70, 0xAB, 0xCD, 0xEF]
-        fill = [0] * 60
-        self.mcp2221.write([*buf, *fill])
-        sleep(1)
+        while start < length:
+            buf = self._send(_GET_I2C_DATA)
+
+            if buf[2] == _I2C_ADDR_NACK:
+                self.I2CCancel()
+                raise IOError("I2C address not acknowledged")
+
+            if buf[1] == _I2C_NOT_READY or buf[3] == _I2C_READ_ERROR or \
+                    buf[3] == 0:
+                if monotonic() > deadline:
+                    self.I2CCancel()
+                    raise IOError("I2C timeout")
+
+                sleep(I2C_BACKOFF)
+                continue
+
+            chunk = min(length - start, buf[3])
+            out[start:start + chunk] = buf[4:4 + chunk]
+            start += chunk
+            deadline = monotonic() + I2C_TIMEOUT
+
+        return out
+
+    @_synchronized
+    def I2CWrite(self, address: int, data: bytes, stop: bool = True):
+        """ Write data to I2C device, without STOP if stop is False """
+
+        self._i2cWrite(0x90 if stop else 0x94, address, data)
+
+    @_synchronized
+    def I2CRead(self, address: int, length: int,
+                out: Union[bytearray, None] = None,
+                repeated_start: bool = False) -> bytearray:
+        """ Read data from I2C device, optionally into given buffer """
+
+        return self._i2cRead(0x93 if repeated_start else 0x91,
+                             address, length, out)
+
+    @_synchronized
+    def I2CWriteRead(self, address: int, data: bytes, length: int,
+                     out: Union[bytearray, None] = None) -> bytearray:
+        """ Write data and read back with repeated START """
+
+        self._i2cWrite(0x94, address, data)
+        return self._i2cRead(0x93, address, length, out)
+
+    @_synchronized
+    def Reset(self, timeout: float = 5):
+        """ Reset the device & reopen it as soon as it is back """
+
+        if self._pipeline:
+            self._drain()
+
+        serial = None
+        location = None
+        others = None
+
+        if self._reopen is not None:
+            try:
+                serial = self.mcp2221.get_serial_number_string() or None
+            except (IOError, OSError, ValueError):
+                pass
+
+            if serial is not None:
+                location, others = self._siblings(serial)
+
+        self.mcp2221.write(_RESET)
+        self.InvalidateCache()
+        self._lost.clear()  # responses are gone with the reset
+
+        deadline = monotonic() + timeout
+
+        if self._reopen is None:
+            self._waitReady(deadline)
+        else:
+            self._reconnect(serial, location, others, deadline)
+
+        if self._cache:
+            self._readSRAM()
+
+    def _waitReady(self, deadline: float):
+        """ Poll given device until it answers again """
+
+        delay = 0.005
+
+        while True:
+            try:
+                self._transfer(_GET_STATUS)
+                return
+            except (IOError, OSError):
+                if monotonic() >= deadline:
+                    raise IOError("Device not ready after reset")
+
+            sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _siblings(self, serial: str
+                  ) -> Tuple[Union[str, None], Union[Set[bytes], None]]:
+        """ How to find this device again after reset when its serial
+        number is shared: its USB port if known, otherwise paths of the
+        other devices. (None, None) if unique or own path is unknown, then
+        it is reopened by serial like it was opened """
+
+        devices = [info for info in Enumerate(self.VID, self.PID,
+                                              refresh=True)
+                   if info["serial_number"] == serial]
+
+        if len(devices) <= 1:
+            return None, None
+
+        path = self._reopen[1] or getattr(self._handle, "path", None)
+
+        if path is None:
+            return None, None
+
+        if isinstance(path, str):
+            path = path.encode()
+
+        for info in devices:
+            if info["path"] == path and info.get("location"):
+                return info["location"], None
+
+        # hidapi has no port, the other devices keep their paths
+        return None, {info["path"] for info in devices
+                      if info["path"] != path}
+
+    def _replaceHandle(self, device):
+        """ Swap innermost handle, keeping wrappers installed on it """
+
+        wrapper = None
+        current = self.mcp2221
+
+        while current is not self._handle and current is not None:
+            wrapper, current = current, getattr(current, "device", None)
+
+        if wrapper is None or current is None:
+            self.mcp2221 = device
+        else:
+            wrapper.device = device
+
+        self._handle = device
+
+    def _unwrap(self, wrapper):
+        """ Remove wrapper from the chain ending at the handle, wherever
+        other wrappers were installed around it """
+
+        outer = None
+        current = self.mcp2221
+
+        while current is not wrapper:
+            if current is self._handle or current is None:
+                return  # not installed
+
+            outer, current = current, getattr(current, "device", None)
+
+        if outer is None:
+            self.mcp2221 = wrapper.device
+        else:
+            outer.device = wrapper.device
+
+    def _reconnect(self, serial: Union[str, None],
+                   location: Union[str, None],
+                   others: Union[Set[bytes], None], deadline: float):
+        """ Wait until device re-enumerated & open it again, by USB port
+        when location is given, or as the only device with the serial
+        not among paths of others """
+
+        dev, path, opened_by, transport, timeout = self._reopen
+        serial = serial or opened_by
+
+        try:
+            self._handle.close()
+        except (IOError, OSError, ValueError):
+            pass
+
+        def present() -> bool:
+            nonlocal path
+            devices = Enumerate(self.VID, self.PID, refresh=True)
+
+            if location is not None:
+                for info in devices:
+                    if info.get("location") == location:
+                        path = info["path"]  # node may be renumbered
+                        return True
+
+                return False
+            elif others is not None:
+                paths = [info["path"] for info in devices
+                         if info["serial_number"] == serial and
+                         info["path"] not in others]
+
+                if len(paths) == 1:
+                    path = paths[0]  # may differ after re-enumeration
+                    return True
+
+                return False
+            elif serial is not None:
+                return any(info["serial_number"] == serial
+                           for info in devices)
+            elif path is not None:
+                return any(info["path"] == path for info in devices)
+            else:
+                return len(devices) > dev
+
+        detach = monotonic() + RESET_DETACH
+        detached = False
+        delay = 0.005
+
+        while monotonic() < deadline:
+            if not present():
+                detached = True
+            elif detached or monotonic() >= detach:
+                try:
+                    by_path = location is not None or others is not None
+                    device = self._open(
+                        self.VID, self.PID, dev, path,
+                        None if by_path else serial, transport, timeout)
+                except (IndexError, IOError, OSError):
+                    device = None
+
+                if device is not None:
+                    self._replaceHandle(device)
+
+                    try:
+                        self._transfer(_GET_STATUS)
+                        return
+                    except (IOError, OSError):
+                        device.close()
+
+            sleep(delay)
+
+            if detached:  # waiting for enumeration, back off
+                delay = min(delay * 2, 0.1)
+
+        raise IOError("Device did not come back after reset")
@@ -0,0 +1,355 @@
+"""
+Declarative SRAM configuration: GP functions & output values, clock output,
+DAC & ADC. Applied with a single SRAM read & at most one SRAM (0x60) plus
+one GPIO (0x50) write, or stored as power-up defaults in flash
+"""
+import json
+from enum import Enum
+from typing import Dict, List, Sequence, Union
+
+from .FlashImage import FlashImage
+from .MCP2221 import (MCP2221, CLOCK, DUTY, FLASH, TYPE, VRM, SRAMSettings,
+                      _gpSetting, _vrmSetting)
+
+# field: enum of its values, None if plain
+FIELDS = {
+    "gp": TYPE,
+    "values": None,
+    "clock_duty": DUTY,
+    "clock_divider": CLOCK,
+    "dac_ref": VRM,
+    "dac": None,
+    "adc_ref": VRM,
+    "interrupt_rising": None,
+    "interrupt_falling": None,
+}
+
+
+def _settings(chip: List[int], gp: List[int]) -> SRAMSettings:
+    """ Decode flash chip & GP settings, which share the SRAM layout """
+
+    buf = [0] * 64
+    buf[0] = 0x61
+    buf[4:8] = chip[0:4]
+    buf[22:26] = gp[0:4]
+
+    return SRAMSettings(buf)
+
+
+class Profile:
+    """ Complete SRAM state of a device, fields left None are not changed
+    when applied. Values only matter on pins set as GPIO output """
+
+    def __init__(self, gp: Sequence[Union[TYPE, None]] = (None,) * 4,
+                 values: Sequence[Union[int, None]] = (None,) * 4,
+                 clock_duty: Union[DUTY, None] = None,
+                 clock_divider: Union[CLOCK, None] = None,
+                 dac_ref: Union[VRM, None] = None,
+                 dac: Union[int, None] = None,
+                 adc_ref: Union[VRM, None] = None,
+                 interrupt_rising: Union[bool, None] = None,
+                 interrupt_falling: Union[bool, None] = None):
+        if len(gp) != 4 or len(values) != 4:
+            raise ValueError("Profile needs 4 pins")
+
+        for pin, type in enumerate(gp):
+            if type is not None:
+                _gpSetting(pin, type)  # raises TypeError if not possible
+
+        for value in values:
+            if value not in (None, 0, 1):
+                raise ValueError("Invalid value")
+
+        for name, value in (("clock_duty", clock_duty),
+                            ("clock_divider", clock_divider),
+                            ("dac_ref", dac_ref), ("adc_ref", adc_ref)):
+            if value is not None and not isinstance(value, FIELDS[name]):
+                raise TypeError(f"Invalid {name.replace('_', ' ')}")
+
+        if dac is not None and not 0 <= dac <= 31:
+            raise ValueError("Invalid DAC value")
+
+        self.gp = tuple(gp)
+        self.values = tuple(None if value is None else int(value)
+                            for value in values)
+        self.clock_duty = clock_duty
+        self.clock_divider = clock_divider
+        self.dac_ref = dac_ref
+        self.dac = dac
+        self.adc_ref = adc_ref
+        self.interrupt_rising = None if interrupt_rising is None \
+            else bool(interrupt_rising)
+        self.interrupt_falling = None if interrupt_falling is None \
+            else bool(interrupt_falling)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Profile):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in FIELDS)
+        return f"Profile({fields})"
+
+    @classmethod
+    def FromSettings(cls, settings: SRAMSettings) -> "Profile":
+        """ Profile of decoded SRAM settings """
+
+        types = settings.types
+
+        return cls(gp=types,
+                   values=[value if type == TYPE.OUTPUT else None
+                           for type, value in zip(types, settings.values)],
+                   clock_duty=settings.clock_duty,
+                   clock_divider=settings.clock_divider,
+                   dac_ref=settings.dac_ref,
+                   dac=settings.dac,
+                   adc_ref=settings.adc_ref,
+                   interrupt_rising=settings.interrupt_rising,
+                   interrupt_falling=settings.interrupt_falling)
+
+    @classmethod
+    def Read(cls, mcp2221: MCP2221) -> "Profile":
+        """ Current state of device, one SRAM read (none when cached) """
+
+        settings = mcp2221.GetSRAMSettings()
+
+        if settings is None:
+            raise IOError("Failed to read SRAM settings")
+
+        return cls.FromSettings(settings)
+
+    def Merge(self, current: "Profile") -> "Profile":
+        """ Current profile overridden by fields of this one """
+
+        def pick(mine, theirs):
+            return theirs if mine is None else mine
+
+        return Profile(
+            gp=[pick(*pins) for pins in zip(self.gp, current.gp)],
+            values=[pick(*pins) for pins in zip(self.values, current.values)],
+            **{name: pick(getattr(self, name), getattr(current, name))
+               for name in FIELDS if name not in ("gp", "values")})
+
+    def Diff(self, current: "Profile") -> List[str]:
+        """ Fields of this profile that differ from current """
+
+        changed = []
+
+        for name in FIELDS:
+            mine, theirs = getattr(self, name), getattr(current, name)
+
+            if name == "gp":
+                differs = any(type is not None and type != other
+                              for type, other in zip(mine, theirs))
+            elif name == "values":
+                types = self.Merge(current).gp
+                differs = any(types[pin] == TYPE.OUTPUT and
+                              mine[pin] is not None and
+                              mine[pin] != theirs[pin]
+                              for pin in range(4))
+            else:
+                differs = mine is not None and mine != theirs
+
+            if differs:
+                changed.append(name)
+
+        return changed
+
+    def _gpSettings(self, current: Sequence[int]) -> List[int]:
+        """ GP0-GP3 setting bytes, current raw ones kept if type unknown """
+
+        return [setting if type is None else
+                _gpSetting(pin, type, value or 0)
+                for pin, (type, value, setting) in
+                enumerate(zip(self.gp, self.values, current))]
+
+    def _requests(self, settings: SRAMSettings, changed: List[str]
+                  ) -> List[bytes]:
+        """ Set SRAM & GPIO requests for changed fields """
+
+        target = self.Merge(Profile.FromSettings(settings))
+        requests = []
+
+        buf = bytearray(65)
+        buf[0 + 1] = 0x60  # set SRAM settings
+
+        if "clock_duty" in changed or "clock_divider" in changed:
+            buf[2 + 1] = 0b10000000  # set mode
+            buf[2 + 1] |= target.clock_duty.value << 3
+
+            if target.clock_divider is not None:
+                buf[2 + 1] |= target.clock_divider.value
+
+        if "dac_ref" in changed:
+            buf[3 + 1] = 0b10000000 | _vrmSetting(target.dac_ref)
+
+        if "dac" in changed:
+            buf[4 + 1] = 0b10000000 | target.dac
+
+        if "adc_ref" in changed:
+            buf[5 + 1] = 0b10000000 | _vrmSetting(target.adc_ref)
+
+        if "interrupt_rising" in changed or "interrupt_falling" in changed:
+            buf[6 + 1] = 0b10000000  # alter interrupt detection
+            buf[6 + 1] |= 1 << 4  # alter positive edge
+            buf[6 + 1] |= int(target.interrupt_rising) << 3
+            buf[6 + 1] |= 1 << 2  # alter negative edge
+            buf[6 + 1] |= int(target.interrupt_falling) << 1
+
+        if "gp" in changed:  # output values are part of GP settings
+            buf[7 + 1] = 0b10000000  # alter GPIO
+            buf[9:13] = target._gpSettings(settings.gp)
+
+        if any(buf[i] & 0b10000000 for i in (3, 4, 5, 6, 7, 8)):
+            requests.append(bytes(buf))
+
+        if "values" in changed and "gp" not in changed:
+            buf = bytearray(65)
+            buf[0 + 1] = 0x50  # Set GPIO Values
+
+            for pin in range(4):
+                if self.values[pin] is not None and \
+                        target.gp[pin] == TYPE.OUTPUT:
+                    buf[2 + pin * 4 + 1] = 1  # Alter GPIO output
+                    buf[3 + pin * 4 + 1] = self.values[pin]
+
+            requests.append(bytes(buf))
+
+        return requests
+
+    def Apply(self, mcp2221: MCP2221) -> List[str]:
+        """ Write fields differing from device, nothing is written when
+        equal. Returns changed fields """
+
+        with mcp2221._lock:
+            settings = mcp2221.GetSRAMSettings()
+
+            if settings is None:
+                raise IOError("Failed to read SRAM settings")
+
+            changed = self.Diff(Profile.FromSettings(settings))
+
+            if not changed:
+                return changed
+
+            try:
+                responses = mcp2221._transferMany(
+                    self._requests(settings, changed))
+
+                for buf in responses:
+                    if buf[1] != 0x00:
+                        raise IOError(f"Command 0x{buf[0]:02X} failed "
+                                      f"with status 0x{buf[1]:02X}")
+            except IOError:
+                mcp2221.InvalidateCache()
+                raise
+
+            if self.adc_ref is not None:
+                mcp2221._adc_ref = self.adc_ref
+
+        return changed
+
+    @classmethod
+    def ReadDefaults(cls, mcp2221: MCP2221) -> "Profile":
+        """ Power-up state stored in flash """
+
+        chip = mcp2221.ReadFlash(FLASH.CHIP_SETTING)
+        gp = mcp2221.ReadFlash(FLASH.GP_SETTING)
+
+        if len(chip) < 4 or len(gp) < 4:
+            raise IOError("Failed to read flash settings")
+
+        return cls.FromSettings(_settings(chip, gp))
+
+    def WriteDefaults(self, mcp2221: MCP2221) -> List[FLASH]:
+        """ Store as power-up state, writing only flash sections that
+        differ. Returns written sections """
+
+        chip = mcp2221.ReadFlash(FLASH.CHIP_SETTING)
+        gp = mcp2221.ReadFlash(FLASH.GP_SETTING)
+
+        if len(chip) < 4 or len(gp) < 4:
+            raise IOError("Failed to read flash settings")
+
+        current = FlashImage({FLASH.CHIP_SETTING: chip,
+                              FLASH.GP_SETTING: gp})
+        target = self.Merge(Profile.FromSettings(_settings(chip, gp)))
+
+        chip = list(chip)
+
+        # Clock Output Divider Value
+        chip[1] = (chip[1] & ~0b11111) | (target.clock_duty.value << 3)
+
+        if target.clock_divider is not None:
+            chip[1] |= target.clock_divider.value
+
+        # DAC Voltage Reference & power-up value
+        chip[2] = (_vrmSetting(target.dac_ref) << 5) | target.dac
+
+        # ADC Voltage Reference & interrupt detection
+        chip[3] &= ~0b1111100
+        chip[3] |= int(target.interrupt_falling) << 6
+        chip[3] |= int(target.interrupt_rising) << 5
+        chip[3] |= _vrmSetting(target.adc_ref) << 2
+
+        image = FlashImage({FLASH.CHIP_SETTING: chip,
+                            FLASH.GP_SETTING: target._gpSettings(gp) + gp[4:]})
+
+        return image.Write(mcp2221, current)
+
+    def ToDict(self) -> Dict[str, object]:
+        """ Serializable form, enums by name & None fields left out """
+
+        def name(value):
+            return value.name if isinstance(value, Enum) else value
+
+        output = dict()
+
+        for field in FIELDS:
+            value = getattr(self, field)
+
+            if field in ("gp", "values"):
+                if any(pin is not None for pin in value):
+                    output[field] = [name(pin) for pin in value]
+            elif value is not None:
+                output[field] = name(value)
+
+        return output
+
+    @classmethod
+    def FromDict(cls, data: Dict[str, object]) -> "Profile":
+        """ Inverse of ToDict, accepts JSON or YAML loaded data """
+
+        kwargs = dict()
+
+        for field, value in data.items():
+            if field not in FIELDS:
+                raise ValueError(f"Unknown profile field {field}")
+
+            enum = FIELDS[field]
+
+            try:
+                if field == "gp":
+                    value = [None if pin is None else enum[pin]
+                             for pin in value]
+                elif enum is not None and value is not None:
+                    value = enum[value]
+            except KeyError as err:
+                raise ValueError(f"Invalid {field} {err}")
+
+            kwargs[field] = value
+
+        return cls(**kwargs)
+
+    def Save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.ToDict(), f, indent=4)
+
+    @classmethod
+    def Load(cls, path: str) -> "Profile":
+        with open(path) as f:
+            return cls.FromDict(json.load(f))
@@ -0,0 +1,501 @@
+from collections import deque
+from time import monotonic, sleep
+from typing import Dict, List, Union
+
+
+class I2CMemory:
+    """ I2C EEPROM-like target, first bytes of a write set the pointer """
+
+    def __init__(self, size: int = 65536, address_bytes: int = 2):
+        self.data = bytearray(size)
+        self.address_bytes = address_bytes
+        self.pointer = 0
+
+    def write(self, data: bytes):
+        if len(data) >= self.address_bytes:
+            self.pointer = int.from_bytes(
+                data[:self.address_bytes], "big") % len(self.data)
+            data = data[self.address_bytes:]
+
+        for value in data:
+            self.data[self.pointer] = value
+            self.pointer = (self.pointer + 1) % len(self.data)
+
+    def read(self, length: int) -> bytes:
+        out = bytearray()
+
+        while len(out) < length:
+            chunk = self.data[self.pointer:self.pointer + length - len(out)]
+            out += chunk
+            self.pointer = (self.pointer + len(chunk)) % len(self.data)
+
+        return bytes(out)
+
+
+class Simulator:
+    """ Software model of MCP2221A behaving like an opened hid.device """
+
+    def __init__(self, latency: float = 0, VID=0x04D8, PID=0x00DD,
+                 serial: str = "0001234567", path: bytes = b"sim:0",
+                 interval: float = 0, reset_time: float = 0.05,
+                 location: Union[str, None] = None):
+        self.latency = latency  # seconds from request to its response
+        self.interval = interval  # min. seconds between responses
+        self.reset_time = reset_time  # seconds disconnected by reset
+        self.VID = VID
+        self.PID = PID
+        self.path = path
+        self.location = location  # USB port, kept across reset
+        self.vdd = 3.3
+
+        # pin level of GP0-GP3 when set as input
+        self.inputs = [0, 0, 0, 0]
+
+        # voltage on GP1-GP3 when set as ADC
+        self.voltages = [1.0, 1.0, 1.0]
+
+        # I2C targets by 7-bit address, with write(data) & read(length)
+        self.i2c = dict()
+        self.i2c_state = 0x00
+        self.i2c_divider = 117  # 100 kHz
+        self._i2c_tx = None
+        self._i2c_rx = None
+
+        self.flash = {
+            0x00: [
+                0x00,  # chip settings 0
+                0x12,  # clock output 50 %, 12 MHz
+                0x00,  # DAC reference & value
+                0x00,  # ADC reference & interrupt
+                VID & 0xFF, VID >> 8,
+                PID & 0xFF, PID >> 8,
+                0x80,  # USB power attributes
+                0x32,  # USB requested current / 2
+            ],
+            0x01: [0b1000, 0b1000, 0b1000, 0b1000],  # GP0-GP3 as input
+            0x02: self._encode("Microchip Technology Inc."),
+            0x03: self._encode("MCP2221 USB-I2C/UART Combo"),
+            0x04: self._encode(serial),
+            0x05: [0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37],
+        }
+
+        self._responses = deque()
+        self._ready = 0.0
+
+        # incremented by reset, handles opened before become stale
+        self.generation = 0
+        self._detached_until = 0.0
+        self._powerUp()
+
+    @staticmethod
+    def _encode(text: str) -> List[int]:
+        return list(text.encode("utf-16-le"))
+
+    @staticmethod
+    def _decode(data: List[int]) -> str:
+        return bytes(data).decode("utf-16-le")
+
+    def _powerUp(self):
+        """ Load SRAM from flash """
+
+        chip = self.flash[0x00]
+        self.clock = chip[1] & 0b11111
+        self.dac_ref = chip[2] >> 5
+        self.dac = chip[2] & 0b11111
+        self.adc_ref = (chip[3] >> 2) & 0b111
+        self.int_pos = (chip[3] >> 5) & 1
+        self.int_neg = (chip[3] >> 6) & 1
+        self.int_flag = 0
+        self.gp = list(self.flash[0x01])
+
+    @property
+    def connected(self) -> bool:
+        """ False while re-enumerating after reset """
+
+        return monotonic() >= self._detached_until
+
+    def SetInput(self, pin: int, value: int):
+        """ Drive input pin, edges on GP1 latch the interrupt flag """
+
+        previous = self.inputs[pin]
+        self.inputs[pin] = value & 1
+
+        if pin != 1 or self.gp[1] & 0b111 != 4:  # not interrupt
+            return
+
+        if (not previous and value and self.int_pos) or \
+                (previous and not value and self.int_neg):
+            self.int_flag = 1
+
+    # hid.device interface
+
+    def open(self, vendor_id=0, product_id=0, serial_number=None):
+        pass
+
+    def open_path(self, path):
+        pass
+
+    def close(self):
+        pass
+
+    def set_nonblocking(self, v):
+        pass
+
+    def get_manufacturer_string(self) -> str:
+        return self._decode(self.flash[0x02])
+
+    def get_product_string(self) -> str:
+        return self._decode(self.flash[0x03])
+
+    def get_serial_number_string(self) -> str:
+        return self._decode(self.flash[0x04])
+
+    def write(self, buff) -> int:
+        """ Process one output report, first byte is report ID """
+
+        if not self.connected:
+            raise IOError("Device disconnected")
+
+        request = list(buff[1:65])
+        request += [0] * (64 - len(request))
+
+        response = self._process(request)
+
+        if response is not None:
+            response += [0] * (64 - len(response))
+            self._ready = max(monotonic() + self.latency,
+                              self._ready + self.interval)
+            self._responses.append((self._ready, response))
+
+        return len(buff)
+
+    def read(self, max_length: int, timeout_ms: int = 0) -> List[int]:
+        """ Return next input report, empty when nothing is pending or it
+        is not ready within timeout_ms (0 waits for it, like hidapi) """
+
+        if not self.connected:
+            raise IOError("Device disconnected")
+
+        if not self._responses:
+            return []
+
+        ready, response = self._responses[0]
+        delay = ready - monotonic()
+
+        if 0 < timeout_ms < delay * 1000:
+            sleep(timeout_ms / 1000)
+            return []
+
+        if delay > 0:
+            sleep(delay)
+
+        self._responses.popleft()
+
+        return response[:max_length]
+
+    # commands
+
+    def _process(self, request: List[int]) -> Union[List[int], None]:
+        handler = self._commands.get(request[0])
+
+        if handler is None:
+            return [request[0], 0x01]  # command not supported
+
+        return handler(self, request)
+
+    def _status(self, request: List[int]) -> List[int]:
+        response = [0] * 64
+        response[0] = 0x10
+
+        if request[2] == 0x10:  # cancel I2C transfer
+            busy = self.i2c_state != 0x00 or self._i2c_tx or self._i2c_rx
+            response[2] = 0x10 if busy else 0x11
+            self.i2c_state = 0x00
+            self._i2c_tx = None
+            self._i2c_rx = None
+
+        if request[3] == 0x20:  # set I2C speed
+            self.i2c_divider = request[4]
+            response[3] = 0x20
+            response[4] = request[4]
+
+        response[8] = self.i2c_state
+        response[14] = self.i2c_divider
+        response[22] = 1  # SCL
+        response[23] = 1  # SDA
+        response[24] = self.int_flag
+        response[46:50] = b"A612"  # hardware & firmware revision
+
+        for channel in range(3):
+            value = 0
+
+            if self.gp[channel + 1] & 0b111 == 2:  # ADC
+                value = self._adc(self.voltages[channel])
+
+            response[50 + channel * 2] = value & 0xFF
+            response[51 + channel * 2] = value >> 8
+
+        return response
+
+    def _adc(self, voltage: float) -> int:
+        ref = self.vdd
+
+        if self.adc_ref & 1:
+            ref = {0: self.vdd, 1: 1.024, 2: 2.048, 3: 4.096}[
+                self.adc_ref >> 1]
+
+        return max(0, min(1023, int(voltage / ref * 1024)))
+
+    def _setGPIO(self, request: List[int]) -> List[int]:
+        response = list(request[:18])
+        response[1] = 0x00
+
+        for pin in range(4):
+            offset = pin * 4
+            is_gpio = self.gp[pin] & 0b111 == 0
+
+            if request[2 + offset]:
+                if is_gpio:
+                    self.gp[pin] &= ~(1 << 4)
+                    self.gp[pin] |= (request[3 + offset] & 1) << 4
+                else:
+                    response[3 + offset] = 0xEE
+
+            if request[4 + offset]:
+                if is_gpio:
+                    self.gp[pin] &= ~(1 << 3)
+                    self.gp[pin] |= (request[5 + offset] & 1) << 3
+                else:
+                    response[5 + offset] = 0xEE
+
+        return response
+
+    def _getGPIO(self, request: List[int]) -> List[int]:
+        response = [0x51, 0x00]
+
+        for pin in range(4):
+            setting = self.gp[pin]
+
+            if setting & 0b111:  # not GPIO
+                response += [0xEE, 0xEF]
+            elif setting & (1 << 3):  # input
+                response += [self.inputs[pin] & 1, 1]
+            else:
+                response += [(setting >> 4) & 1, 0]
+
+        return response
+
+    def _setSRAM(self, request: List[int]) -> List[int]:
+        if request[2] & 0b10000000:
+            self.clock = request[2] & 0b11111
+
+        if request[3] & 0b10000000:
+            self.dac_ref = request[3] & 0b111
+
+        if request[4] & 0b10000000:
+            self.dac = request[4] & 0b11111
+
+        if request[5] & 0b10000000:
+            self.adc_ref = request[5] & 0b111
+
+        if request[6] & 0b10000000:
+            if request[6] & (1 << 4):
+                self.int_pos = (request[6] >> 3) & 1
+
+            if request[6] & (1 << 2):
+                self.int_neg = (request[6] >> 1) & 1
+
+            if request[6] & 1:
+                self.int_flag = 0
+
+        if request[7] & 0b10000000:
+            self.gp = list(request[8:12])
+
+        return [0x60, 0x00]
+
+    def _getSRAM(self, request: List[int]) -> List[int]:
+        chip = self.flash[0x00]
+
+        response = [0] * 64
+        response[0] = 0x61
+        response[2] = 18  # chip settings length
+        response[3] = 4  # GP settings length
+        response[4] = chip[0]
+        response[5] = self.clock
+        response[6] = (self.dac_ref << 5) | self.dac
+        response[7] = (self.int_neg << 6) | (self.int_pos << 5) | \
+            (self.adc_ref << 2)
+        response[8:14] = chip[4:10]
+        response[22:26] = self.gp
+
+        return response
+
+    def _readFlash(self, request: List[int]) -> List[int]:
+        data = self.flash.get(request[1])
+
+        if data is None:
+            return [0xB0, 0x01]
+
+        if request[1] in (0x02, 0x03, 0x04):  # USB strings
+            return [0xB0, 0x00, len(data) + 2, 0x03, *data]
+
+        return [0xB0, 0x00, len(data), 0x00, *data]
+
+    def _writeFlash(self, request: List[int]) -> List[int]:
+        address = request[1]
+
+        if address == 0x00:
+            self.flash[0x00] = list(request[2:12])
+        elif address == 0x01:
+            self.flash[0x01] = list(request[2:6])
+        elif address in (0x02, 0x03, 0x04):
+            length = max(0, min(request[2], 62) - 2)
+            self.flash[address] = list(request[4:4 + length])
+        else:
+            return [0xB1, 0x01]
+
+        return [0xB1, 0x00]
+
+    def _i2cWrite(self, request: List[int]) -> List[int]:
+        length = request[1] | (request[2] << 8)
+        address = request[3] >> 1
+
+        if self._i2c_tx is None or self._i2c_tx[0] != address:
+            self._i2c_tx = (address, length, bytearray())
+
+        _, length, data = self._i2c_tx
+        data += bytes(request[4:4 + min(60, length - len(data))])
+
+        if len(data) >= length:
+            self._i2c_tx = None
+            target = self.i2c.get(address)
+
+            if target is None:
+                self.i2c_state = 0x25  # address NACK
+            else:
+                target.write(bytes(data))
+                self.i2c_state = 0x45 if request[0] == 0x94 else 0x00
+
+        return [request[0], 0x00]
+
+    def _i2cRead(self, request: List[int]) -> List[int]:
+        length = request[1] | (request[2] << 8)
+        target = self.i2c.get(request[3] >> 1)
+
+        if target is None:
+            self.i2c_state = 0x25  # address NACK
+            self._i2c_rx = None
+        else:
+            self.i2c_state = 0x00
+            self._i2c_rx = bytearray(target.read(length))
+
+        return [request[0], 0x00]
+
+    def _i2cGetData(self, request: List[int]) -> List[int]:
+        if self.i2c_state == 0x25:
+            return [0x40, 0x00, 0x25, 0x00]
+
+        if self._i2c_rx is None:
+            return [0x40, 0x41]  # no data
+
+        chunk = self._i2c_rx[:60]
+        del self._i2c_rx[:60]
+        state = 0x54  # partial
+
+        if not self._i2c_rx:
+            self._i2c_rx = None
+            state = 0x55  # complete
+
+        return [0x40, 0x00, state, len(chunk), *chunk]
+
+    def _reset(self, request: List[int]) -> None:
+        if request[1:4] == [0xAB, 0xCD, 0xEF]:
+            self._responses.clear()
+            self._powerUp()
+            self.generation += 1
+            self._detached_until = monotonic() + self.reset_time
+
+        return None
+
+    _commands = {
+        0x10: _status,
+        0x40: _i2cGetData,
+        0x50: _setGPIO,
+        0x51: _getGPIO,
+        0x60: _setSRAM,
+        0x61: _getSRAM,
+        0x70: _reset,
+        0x90: _i2cWrite,
+        0x91: _i2cRead,
+        0x92: _i2cWrite,
+        0x93: _i2cRead,
+        0x94: _i2cWrite,
+        0xB0: _readFlash,
+        0xB1: _writeFlash,
+    }
+
+
+class SimulatedHID:
+    """ Drop-in replacement of the hid module serving simulators """
+
+    def __init__(self, *devices: Simulator):
+        self.devices = list(devices)
+
+    def enumerate(self, vendor_id=0, product_id=0) -> List[Dict]:
+        return [{
+            "path": device.path,
+            "vendor_id": device.VID,
+            "product_id": device.PID,
+            "serial_number": device.get_serial_number_string(),
+            "manufacturer_string": device.get_manufacturer_string(),
+            "product_string": device.get_product_string(),
+            "location": device.location,
+        } for device in self.devices
+            if device.connected and vendor_id in (0, device.VID) and
+            product_id in (0, device.PID)]
+
+    def device(self) -> "SimulatedHandle":
+        return SimulatedHandle(self)
+
+
+class SimulatedHandle:
+    """ hid.device counterpart opening one of the simulators """
+
+    def __init__(self, hid: SimulatedHID):
+        self._hid = hid
+        self._device = None
+        self._generation = None
+
+    def open(self, vendor_id=0, product_id=0, serial_number=None):
+        for device in self._hid.devices:
+            if device.connected and \
+                    vendor_id in (0, device.VID) and \
+                    product_id in (0, device.PID) and \
+                    serial_number in (
+                        None, device.get_serial_number_string()):
+                self._device = device
+                self._generation = device.generation
+                return
+
+        raise IOError("open failed")
+
+    def open_path(self, path):
+        for device in self._hid.devices:
+            if device.connected and device.path == path:
+                self._device = device
+                self._generation = device.generation
+                return
+
+        raise IOError("open failed")
+
+    def close(self):
+        self._device = None
+
+    def __getattr__(self, name):
+        if self._device is None:
+            raise ValueError("not open")
+
+        if self._device.generation != self._generation:
+            raise IOError("Device disconnected")  # reset since opened
+
+        return getattr(self._device, name)
@@ -0,0 +1,219 @@
+"""
+Record HID traffic of a device to a binary trace & replay it
+
+Trace file: MAGIC, uint16 length & JSON of device strings, then records of
+uint64 nanoseconds since start, uint8 kind (WRITE/READ), uint8 length &
+the report with trailing zeros stripped, empty read means no response
+"""
+import json
+import struct
+from collections import deque
+from time import monotonic, sleep
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Union
+
+from .MCP2221 import MCP2221
+from .Transport import Transport
+
+MAGIC = b"MCP2221T\x01"
+WRITE = 0
+READ = 1
+
+_RECORD = struct.Struct("<QBB")
+_LENGTH = struct.Struct("<H")
+
+# (seconds since start, kind, report)
+Record = Tuple[float, int, bytes]
+
+
+class _RecordingDevice:
+    """ Wrap an opened hid.device, appending all reports to a trace """
+
+    def __init__(self, device, file: BinaryIO):
+        self.device = device
+        self.file = file
+        self.records = 0
+        self._start = monotonic()
+
+    def _append(self, kind: int, report):
+        data = bytes(report).rstrip(b"\x00")
+        elapsed = int((monotonic() - self._start) * 1e9)
+        self.file.write(_RECORD.pack(elapsed, kind, len(data)) + data)
+        self.records += 1
+
+    def write(self, buff):
+        self._append(WRITE, buff)
+        return self.device.write(buff)
+
+    def read(self, *args, **kwargs):
+        response = self.device.read(*args, **kwargs)
+        self._append(READ, response)
+        self.file.flush()  # complete transaction survives a crash
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+
+class Recorder:
+    """ Record every request & response of a device to a trace file """
+
+    def __init__(self, mcp2221: MCP2221, path: str):
+        self.mcp2221 = mcp2221
+        self.path = path
+        self._device = None
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    @property
+    def running(self) -> bool:
+        return self._device is not None
+
+    @property
+    def records(self) -> int:
+        """ Number of reports recorded """
+
+        return self._device.records if self._device is not None else 0
+
+    def Start(self):
+        """ Start recording, overwrites the file """
+
+        with self.mcp2221._lock:
+            if self._device is not None:
+                return
+
+            device = self.mcp2221.mcp2221
+            info = dict()
+
+            for key, getter in (("manufacturer", "get_manufacturer_string"),
+                                ("product", "get_product_string"),
+                                ("serial", "get_serial_number_string")):
+                try:
+                    info[key] = getattr(device, getter)()
+                except (AttributeError, IOError, OSError, ValueError):
+                    info[key] = None
+
+            header = json.dumps(info).encode()
+            file = open(self.path, "wb")
+            file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+
+            self._device = _RecordingDevice(device, file)
+            self.mcp2221.mcp2221 = self._device
+
+    def Stop(self):
+        """ Stop recording & close the file """
+
+        with self.mcp2221._lock:
+            if self._device is None:
+                return
+
+            self.mcp2221._unwrap(self._device)
+
+            self._device.file.close()
+            self._device = None
+
+
+def ReadTrace(path: str) -> Tuple[Dict[str, Union[str, None]], List[Record]]:
+    """ Load trace file, returns device strings & records """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a trace file")
+
+    offset = len(MAGIC)
+    length, = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    info = json.loads(data[offset:offset + length])
+    offset += length
+
+    return info, list(_records(data, offset))
+
+
+def _records(data: bytes, offset: int) -> Iterator[Record]:
+    while offset < len(data):
+        if offset + _RECORD.size > len(data):
+            raise ValueError("Truncated trace file")
+
+        elapsed, kind, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        report = data[offset:offset + length]
+        offset += length
+
+        if len(report) != length or kind not in (WRITE, READ):
+            raise ValueError("Corrupt trace file")
+
+        yield elapsed / 1e9, kind, report
+
+
+class ReplayTransport(Transport):
+    """ Play back a trace as if it were the device. Requests must match
+    the recorded ones when strict, responses keep their recorded latency
+    when timing is True """
+
+    def __init__(self, path: str, timing: bool = False, strict: bool = True):
+        super().__init__()
+        self.info, self.records = ReadTrace(path)
+        self.timing = timing
+        self.strict = strict
+        self.position = 0  # next record
+        self._written = deque()  # (recorded, actual) time of requests
+
+    @property
+    def done(self) -> bool:
+        """ Whole trace replayed """
+
+        return self.position >= len(self.records)
+
+    def write(self, buff) -> int:
+        if self.done or self.records[self.position][1] != WRITE:
+            raise IOError(f"Unexpected request at record {self.position}")
+
+        recorded, _, request = self.records[self.position]
+
+        if self.strict and bytes(buff).rstrip(b"\x00") != request:
+            raise IOError(f"Request differs from trace at record "
+                          f"{self.position}")
+
+        self.position += 1
+
+        if request[1:2] != b"\x70":  # reset is not answered
+            self._written.append((recorded, monotonic()))
+
+        return len(buff)
+
+    def read(self, max_length: int, timeout_ms: Union[int, None] = None
+             ) -> bytes:
+        if self.done or self.records[self.position][1] != READ:
+            return b""  # no response in trace either
+
+        recorded, _, response = self.records[self.position]
+        self.position += 1
+
+        if self._written:
+            request_time, written = self._written.popleft()
+
+            if self.timing:
+                delay = written + (recorded - request_time) - monotonic()
+
+                if delay > 0:
+                    sleep(delay)
+
+        if not response:
+            return b""
+
+        return response.ljust(64, b"\x00")[:max_length]
+
+    def get_manufacturer_string(self) -> Union[str, None]:
+        return self.info.get("manufacturer")
+
+    def get_product_string(self) -> Union[str, None]:
+        return self.info.get("product")
+
+    def get_serial_number_string(self) -> Union[str, None]:
+        return self.info.get("serial")
@@ -0,0 +1,245 @@
+import os
+import select
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, Sequence, Union
+
+# Linux sysfs directory listing hidraw nodes
+SYSFS_HIDRAW = "/sys/class/hidraw"
+
+
+class Transport(ABC):
+    """ Connection to one device, same interface as an opened hid.device.
+    read returns an empty report when timeout (in seconds, None waits
+    forever) elapses. Backends implement write & read """
+
+    def __init__(self, timeout: Union[float, None] = None):
+        self.timeout = timeout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _timeout(self, timeout_ms: Union[int, None]) -> Union[float, None]:
+        """ Read timeout in seconds, per call or default """
+
+        if timeout_ms is not None and timeout_ms > 0:
+            return timeout_ms / 1000
+
+        return self.timeout
+
+    @abstractmethod
+    def write(self, buff: Union[bytes, bytearray, List[int]]) -> int:
+        """ Write output report, first byte is report ID """
+
+    @abstractmethod
+    def read(self, max_length: int, timeout_ms: Union[int, None] = None
+             ) -> Sequence[int]:
+        """ Read input report """
+
+    def close(self):
+        pass
+
+    def get_manufacturer_string(self) -> Union[str, None]:
+        return None
+
+    def get_product_string(self) -> Union[str, None]:
+        return None
+
+    def get_serial_number_string(self) -> Union[str, None]:
+        return None
+
+
+class HidapiTransport(Transport):
+    """ Opened hid.device of hidapi, path is the enumerated one if known """
+
+    def __init__(self, device, timeout: Union[float, None] = None,
+                 path: Union[bytes, None] = None):
+        super().__init__(timeout)
+        self.device = device
+        self.path = path
+
+    def write(self, buff: Union[bytes, bytearray, List[int]]) -> int:
+        return self.device.write(buff)
+
+    def read(self, max_length: int, timeout_ms: Union[int, None] = None
+             ) -> List[int]:
+        timeout = self._timeout(timeout_ms)
+
+        if timeout is None:
+            return self.device.read(max_length)
+
+        # hidapi blocks on 0 ms
+        return self.device.read(max_length, max(1, round(timeout * 1000)))
+
+    def close(self):
+        self.device.close()
+
+    def get_manufacturer_string(self) -> Union[str, None]:
+        return self.device.get_manufacturer_string()
+
+    def get_product_string(self) -> Union[str, None]:
+        return self.device.get_product_string()
+
+    def get_serial_number_string(self) -> Union[str, None]:
+        return self.device.get_serial_number_string()
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+
+class HidrawTransport(Transport):
+    """ Linux /dev/hidraw* node used directly, without hidapi """
+
+    def __init__(self, path: Union[str, bytes],
+                 timeout: Union[float, None] = None):
+        super().__init__(timeout)
+
+        if isinstance(path, bytes):
+            path = path.decode()
+
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR)
+
+        # reusable output report
+        self._out = bytearray(65)
+        self._view = memoryview(self._out)
+
+    def write(self, buff: Union[bytes, bytearray, List[int]]) -> int:
+        if not isinstance(buff, (bytes, bytearray)):
+            length = len(buff)
+            self._out[:length] = buff
+            buff = self._view[:length]
+
+        return os.write(self.fd, buff)
+
+    def read(self, max_length: int, timeout_ms: Union[int, None] = None
+             ) -> bytes:
+        timeout = self._timeout(timeout_ms)
+
+        if timeout is not None:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+
+            if not ready:
+                return b""
+
+        return os.read(self.fd, max_length)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _info(self) -> Dict:
+        name = os.path.basename(self.path)
+
+        for info in EnumerateHidraw():
+            if os.path.basename(info["path"].decode()) == name:
+                return info
+
+        return dict()
+
+    def get_manufacturer_string(self) -> Union[str, None]:
+        return self._info().get("manufacturer_string")
+
+    def get_product_string(self) -> Union[str, None]:
+        return self._info().get("product_string")
+
+    def get_serial_number_string(self) -> Union[str, None]:
+        return self._info().get("serial_number")
+
+
+class MemoryTransport(Transport):
+    """ In-memory device, responder gets the 64 byte request without
+    report ID & returns the response or None when there is none """
+
+    def __init__(self, responder: Callable[[bytes], Union[Sequence[int],
+                                                          None]],
+                 timeout: Union[float, None] = None):
+        super().__init__(timeout)
+        self.responder = responder
+        self._responses = deque()
+
+    def write(self, buff: Union[bytes, bytearray, List[int]]) -> int:
+        request = bytes(buff[1:65]).ljust(64, b"\x00")
+        response = self.responder(request)
+
+        if response is not None:
+            self._responses.append(bytes(response).ljust(64, b"\x00"))
+
+        return len(buff)
+
+    def read(self, max_length: int, timeout_ms: Union[int, None] = None
+             ) -> bytes:
+        if not self._responses:
+            return b""
+
+        return self._responses.popleft()[:max_length]
+
+
+def _readText(path: str) -> Union[str, None]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def EnumerateHidraw(VID: int = 0, PID: int = 0) -> List[Dict]:
+    """ List hidraw nodes like hid.enumerate, empty if not on Linux """
+
+    if not sys.platform.startswith("linux") or \
+            not os.path.isdir(SYSFS_HIDRAW):
+        return []
+
+    devices = []
+
+    for name in sorted(os.listdir(SYSFS_HIDRAW)):
+        hid_dir = os.path.realpath(os.path.join(SYSFS_HIDRAW, name,
+                                                "device"))
+        uevent = dict()
+
+        for line in (_readText(os.path.join(hid_dir, "uevent")) or
+                     "").splitlines():
+            key, _, value = line.partition("=")
+            uevent[key] = value
+
+        try:  # HID_ID=bus:vendor:product
+            _, vendor, product = uevent["HID_ID"].split(":")
+            vendor, product = int(vendor, 16), int(product, 16)
+        except (KeyError, ValueError):
+            continue
+
+        if VID not in (0, vendor) or PID not in (0, product):
+            continue
+
+        interface_dir = os.path.dirname(hid_dir)
+        usb_dir = os.path.dirname(interface_dir)
+        interface = _readText(os.path.join(interface_dir,
+                                           "bInterfaceNumber"))
+
+        devices.append({
+            "path": f"/dev/{name}".encode(),
+            "vendor_id": vendor,
+            "product_id": product,
+            "serial_number": uevent.get("HID_UNIQ", ""),
+            "manufacturer_string": _readText(
+                os.path.join(usb_dir, "manufacturer")),
+            "product_string": _readText(os.path.join(usb_dir, "product")),
+            "interface_number": int(interface, 16) if interface else -1,
+            "location": os.path.basename(usb_dir),  # USB port, e.g. 1-1.4
+        })
+
+    return devices
+
+
+def IsHidraw(path: Union[str, bytes, None]) -> bool:
+    """ Whether path is a hidraw node """
+
+    if isinstance(path, bytes):
+        path = path.decode(errors="replace")
+
+    return path is not None and path.startswith("/dev/hidraw")
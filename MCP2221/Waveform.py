@@ -0,0 +1,205 @@
+import math
+import threading
+from time import monotonic
+from typing import Dict, Iterable, List, Union
+
+from .MCP2221 import MCP2221
+
+
+def Sine(length: int, cycles: int = 1) -> List[float]:
+    """ Sine table, 0.0 - 1.0 """
+
+    return [0.5 + 0.5 * math.sin(2 * math.pi * cycles * i / length)
+            for i in range(length)]
+
+
+def Ramp(length: int) -> List[float]:
+    """ Sawtooth table, 0.0 - 1.0 """
+
+    return [i / (length - 1) if length > 1 else 0.0 for i in range(length)]
+
+
+def Triangle(length: int) -> List[float]:
+    """ Triangle table, 0.0 - 1.0 """
+
+    half = length / 2
+    return [1 - abs(i - half) / half for i in range(length)]
+
+
+def Quantize(samples: Iterable[float]) -> List[int]:
+    """ Scale 0.0 - 1.0 samples to DAC values 0 - 31 """
+
+    values = []
+
+    for sample in samples:
+        if not 0 <= sample <= 1:
+            raise ValueError("Sample out of range 0.0 - 1.0")
+
+        values.append(int(round(float(sample) * 31)))
+
+    return values
+
+
+class WaveformPlayer:
+    """ Play sample table on DAC at fixed rate, one prebuilt SRAM write
+    per sample """
+
+    def __init__(self, mcp2221: MCP2221, samples: Iterable[float],
+                 rate: float, loop: bool = True):
+        if rate <= 0:
+            raise ValueError("Invalid rate")
+
+        values = Quantize(samples)
+
+        if not values:
+            raise ValueError("Empty sample table")
+
+        self.mcp2221 = mcp2221
+        self.rate = rate
+        self.loop = loop
+        self.values = values
+
+        # set SRAM settings, only DAC value altered
+        self._reports = [
+            bytes([0, 0x60, 0, 0, 0, 0b10000000 | value]) + bytes(59)
+            for value in values]
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.samples = 0  # samples written
+        self.late = 0  # samples skipped to keep timing
+        self.errors = 0
+        self.max_lateness = 0.0
+        self._mean = 0.0  # of lateness
+        self._m2 = 0.0
+        self._first = None
+        self._last = None
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def Start(self):
+        """ Start playback from the first sample """
+
+        if self.running:
+            return
+
+        self._reset()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def Stop(self):
+        """ Stop playback, DAC keeps the last value """
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def Wait(self, timeout: Union[float, None] = None) -> bool:
+        """ Wait for one-shot playback to finish, False on timeout """
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+        return not self.running
+
+    def _run(self):
+        period = 1 / self.rate
+        reports = self._reports
+        count = len(reports)
+        start = monotonic()
+        tick = 0
+
+        while self.loop or tick < count:
+            scheduled = start + tick * period
+            delay = scheduled - monotonic()
+
+            if delay > 0:
+                if self._stop.wait(delay):
+                    return
+            elif self._stop.is_set():
+                return
+            elif delay < -period:
+                # skip samples to stay in phase
+                missed = int(-delay / period)
+
+                if not self.loop:
+                    missed = min(missed, count - 1 - tick)
+
+                self.late += missed
+                tick += missed
+                scheduled = start + tick * period
+
+            now = monotonic()
+
+            try:
+                buf = self.mcp2221._send(reports[tick % count])
+                ok = buf[1] == 0x00
+            except IOError:
+                ok = False
+
+            if not ok:
+                self.errors += 1
+
+            tick += 1
+            self._record(now, now - scheduled)
+
+    def _record(self, now: float, lateness: float):
+        """ Running mean & variance of lateness (Welford) """
+
+        self.samples += 1
+        delta = lateness - self._mean
+        self._mean += delta / self.samples
+        self._m2 += delta * (lateness - self._mean)
+        self.max_lateness = max(self.max_lateness, lateness)
+
+        if self._first is None:
+            self._first = now
+
+        self._last = now
+
+    @property
+    def achieved_rate(self) -> float:
+        """ Measured update rate in Hz """
+
+        if self._first is None or self._last == self._first:
+            return 0.0
+
+        return (self.samples - 1) / (self._last - self._first)
+
+    @property
+    def jitter(self) -> float:
+        """ Standard deviation of update timing in seconds """
+
+        if self.samples < 2:
+            return 0.0
+
+        return math.sqrt(self._m2 / (self.samples - 1))
+
+    def Stats(self) -> Dict[str, Union[int, float]]:
+        """ Get playback statistics """
+
+        return {
+            "rate": self.rate,
+            "achieved_rate": self.achieved_rate,
+            "samples": self.samples,
+            "late": self.late,
+            "errors": self.errors,
+            "jitter": self.jitter,
+            "max_lateness": self.max_lateness,
+        }
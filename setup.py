@@ -18,6 +18,12 @@ setuptools.setup(
     },
     packages=setuptools.find_packages(exclude=["tests"]),
     install_requires=['hidapi'],
+    extras_require={
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': ['mcp2221=MCP2221.CLI:main'],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Programming Language :: Python :: 3",
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import os
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+@pytest.fixture(autouse=True)
+def simulator(monkeypatch):
+    """ Run against simulator instead of hardware if MCP2221_SIMULATOR=1 """
+
+    if os.environ.get("MCP2221_SIMULATOR", "0") == "0":
+        yield None
+        return
+
+    latency = float(os.environ.get("MCP2221_SIMULATOR_LATENCY", 0))
+    device = Simulator(latency=latency)
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(device))
+    monkeypatch.setattr(MCP2221, "TRANSPORT", "hidapi")
+
+    yield device
@@ -88,3 +88,16 @@ def testInvalidMinADC():
 
     with pytest.raises(ValueError):
         mcp2221.ReadADC(0)
+
+
+def testReadAllADCInto():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+    mcp2221.InitGP(3, MCP2221.TYPE.ADC)
+
+    out = [None] * 3
+    adc = mcp2221.ReadAllADC(out)
+
+    assert adc is out
+    assert None not in out
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.ADCConverter import ADCConverter, Calibration, CalibrationTable
+from MCP2221.Instrumentation import Instrumentation
+from MCP2221.Simulator import Simulator
+
+
+@pytest.fixture
+def device():
+    device = Simulator()
+    device.voltages = [0.5, 1.0, 2.0]
+
+    return device
+
+
+@pytest.fixture
+def mcp2221(device):
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(1, 4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.ADC)
+
+    mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_4_096V)
+
+    return mcp2221
+
+
+def testVolts(mcp2221):
+    converter = ADCConverter(mcp2221)
+
+    assert converter.reference == 4.096
+    assert np.allclose(converter.Volts(mcp2221.ReadAllADC()),
+                       [0.5, 1.0, 2.0], atol=0.004)
+    assert converter.Volts([1024, 0], channel=1).tolist() == [4.096, 0]
+
+
+def testVectorized(mcp2221):
+    converter = ADCConverter(mcp2221)
+    counts = np.array([[0, 256, 512], [1023, 1023, 1023]] * 50,
+                      dtype=np.uint16)
+    volts = converter.Volts(counts)
+
+    assert volts.shape == (100, 3)
+    assert volts.dtype == np.float64
+    assert volts[0].tolist() == [0, 1.024, 2.048]
+
+    with pytest.raises(ValueError):
+        converter.Volts([1, 2])
+
+
+def testReferenceTracked(mcp2221):
+    converter = ADCConverter(mcp2221, vdd=5.0)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        assert converter.reference == 4.096
+        mcp2221.SetADCVoltageReference(MCP2221.VRM.VDD)
+        assert converter.reference == 5.0
+        mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_1_024V)
+        assert converter.reference == 1.024
+
+    # only the 2 writes setting it, no reads
+    assert list(instrumentation.Stats()) == [0x60]
+    assert instrumentation.Stats()[0x60]["count"] == 2
+
+
+def testReferenceUnknown(device):
+    mcp2221 = MCP2221.MCP2221(device=device)
+    device.adc_ref = 0b011  # 1.024 V, changed behind our back
+
+    assert ADCConverter(mcp2221).reference == 1.024
+
+    device.adc_ref = 0b111
+    mcp2221.InvalidateCache()
+
+    assert ADCConverter(mcp2221).reference == 4.096
+
+
+def testOversample():
+    counts = np.array([[10, 20, 30], [11, 21, 31],
+                       [12, 22, 32], [13, 23, 33], [99, 99, 99]])
+    averaged = ADCConverter.Oversample(counts, 2)
+
+    assert averaged.tolist() == [[10.5, 20.5, 30.5], [12.5, 22.5, 32.5]]
+    assert ADCConverter.Oversample(counts, 8).shape == (0, 3)
+
+    with pytest.raises(ValueError):
+        ADCConverter.Oversample(counts, 0)
+
+
+def testRead(mcp2221, device):
+    converter = ADCConverter(mcp2221)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        volts = converter.Read(oversample=16)
+
+    assert np.allclose(volts, device.voltages, atol=0.004)
+    assert list(instrumentation.Stats()) == [0x10]
+    assert instrumentation.Stats()[0x10]["count"] == 16
+
+    with pytest.raises(ValueError):
+        converter.Read(oversample=0)
+
+
+def testCalibration(mcp2221):
+    calibration = Calibration()
+    calibration.Fit(0, [0.1, 1.1, 2.1], [0.0, 2.0, 4.0])
+
+    assert calibration.gain[0] == pytest.approx(2.0)
+    assert calibration.offset[0] == pytest.approx(-0.2)
+
+    converter = ADCConverter(mcp2221, calibration=calibration)
+    volts = converter.Volts([[250, 250, 250]])[0]
+
+    assert volts[0] == pytest.approx(250 * 4.096 / 1024 * 2 - 0.2)
+    assert volts[1:].tolist() == [1.0, 1.0]
+    assert converter.Volts([250], channel=0)[0] == pytest.approx(volts[0])
+
+    with pytest.raises(ValueError):
+        calibration.Fit(0, [1.0], [1.0])
+
+    with pytest.raises(ValueError):
+        Calibration(gain=(1, 1))
+
+
+def testCalibrationTable(mcp2221, tmp_path):
+    path = str(tmp_path / "calibration.json")
+    calibration = Calibration(gain=(1.01, 0.99, 1.0), offset=(0.01, 0, 0))
+
+    table = CalibrationTable()
+    table.Set("0001234567", calibration)
+    table.Save(path)
+
+    table = CalibrationTable.Load(path)
+
+    assert table.Get("0001234567") == calibration
+    assert table.Get("other") == Calibration()
+    assert ADCConverter(mcp2221, calibration=table).calibration == calibration
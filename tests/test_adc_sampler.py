@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import sleep
+from MCP2221 import MCP2221
+from MCP2221.ADCSampler import ADCSampler
+from MCP2221.Simulator import Simulator
+
+
+@pytest.fixture
+def mcp2221():
+    device = Simulator()
+    device.voltages = [0.5, 1.0, 2.0]
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(1, 4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.ADC)
+
+    return mcp2221
+
+
+def testRead(mcp2221):
+    with ADCSampler(mcp2221, rate=500) as sampler:
+        times, values = sampler.Read(10, numpy=False)
+
+    assert len(times) == 10
+    assert list(values[:3]) == mcp2221.ReadAllADC()
+    assert list(times) == sorted(times)
+
+
+def testNumPy(mcp2221):
+    np = pytest.importorskip("numpy")
+
+    with ADCSampler(mcp2221, rate=500) as sampler:
+        times, values = sampler.Read(10)
+
+    assert values.shape == (10, 3)
+    assert np.all(values == mcp2221.ReadAllADC())
+    assert np.all(np.diff(times) > 0)
+
+
+def testRate(mcp2221):
+    with ADCSampler(mcp2221, rate=200) as sampler:
+        sleep(0.25)
+
+    assert 150 < sampler.achieved_rate < 250
+
+
+def testOverrun(mcp2221):
+    with ADCSampler(mcp2221, rate=1000, capacity=4) as sampler:
+        sleep(0.05)
+
+    assert sampler.available == 4
+    assert sampler.overruns > 0
+
+
+def testBlocks(mcp2221):
+    sampler = ADCSampler(mcp2221, rate=1000)
+    sampler.Start()
+    blocks = 0
+
+    for times, values in sampler.Blocks(5, numpy=False):
+        blocks += 1
+
+        if blocks == 3:
+            sampler.Stop()
+
+    assert blocks >= 3
+
+
+def testInvalidRate(mcp2221):
+    with pytest.raises(ValueError):
+        ADCSampler(mcp2221, rate=0)
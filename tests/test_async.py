@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import asyncio
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221.AsyncMCP2221 import AsyncMCP2221
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+def testOrdered():
+    async def run():
+        device = AsyncMCP2221(MCP2221.MCP2221(device=Simulator()))
+
+        async with device:
+            await device.InitGP(0, MCP2221.TYPE.OUTPUT)
+            return await asyncio.gather(
+                device.WriteGP(0, 1), device.ReadGP(0),
+                device.WriteGP(0, 0), device.ReadGP(0))
+
+    assert asyncio.run(run()) == [None, 1, None, 0]
+
+
+def testConcurrentDevices():
+    async def run():
+        devices = [AsyncMCP2221(MCP2221.MCP2221(
+            device=Simulator(latency=0.02))) for _ in range(5)]
+
+        start = monotonic()
+        await asyncio.gather(*[device.ReadAllGP() for device in devices])
+        elapsed = monotonic() - start
+
+        for device in devices:
+            await device.Close()
+
+        return elapsed
+
+    assert asyncio.run(run()) < 0.08
+
+
+def testOpen(monkeypatch):
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(Simulator()))
+
+    async def run():
+        async with await AsyncMCP2221.Open() as device:
+            return await device.GetDeviceInfo()
+
+    assert asyncio.run(run())["serial"] == "0001234567"
+
+
+def testRun():
+    async def run():
+        device = AsyncMCP2221(MCP2221.MCP2221(device=Simulator()))
+
+        def configure(mcp2221):
+            with mcp2221.Transaction():
+                mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+                mcp2221.WriteDAC(5)
+
+            return mcp2221.GetGPType(2)
+
+        async with device:
+            return await device.Run(configure)
+
+    assert asyncio.run(run()) == MCP2221.TYPE.DAC
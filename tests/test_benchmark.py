@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import json
+from MCP2221 import MCP2221
+from MCP2221 import Benchmark
+from MCP2221.Profile import Profile
+from MCP2221.Simulator import Simulator
+
+# max HID transactions per call
+BUDGET = {
+    "SetClockOutput": 1,
+    "SetDACVoltageReference": 1,
+    "WriteDAC": 1,
+    "SetADCVoltageReference": 1,
+    "InitGP": 2,
+    "GetGPType": 1,
+    "ReadAllGP": 1,
+    "ReadGP": 1,
+    "WriteAllGP": 1,
+    "WriteGP": 1,
+    "ReadAllADC": 1,
+    "ReadADC": 1,
+    "GetDeviceInfo": 0,
+    "ReadFlash": 1,
+}
+
+CACHED_BUDGET = {
+    "SetClockOutput": 1,
+    "SetDACVoltageReference": 1,
+    "WriteDAC": 1,
+    "SetADCVoltageReference": 1,
+    "InitGP": 1,
+    "GetGPType": 0,
+}
+
+
+def testTransactionBudget():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    results = Benchmark.Run(mcp2221, iterations=5)
+
+    assert Benchmark.Check(results, BUDGET) == []
+
+
+def testCachedTransactionBudget():
+    mcp2221 = MCP2221.MCP2221(device=Simulator(), cache=True)
+    results = Benchmark.Run(mcp2221, 5, list(CACHED_BUDGET))
+
+    assert Benchmark.Check(results, CACHED_BUDGET) == []
+
+
+def testOverBudget():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    results = Benchmark.Run(mcp2221, 1, ["InitGP"])
+
+    assert len(Benchmark.Check(results, {"InitGP": 1})) == 1
+
+
+def testMain(tmp_path, capsys):
+    budget = tmp_path / "budget.json"
+    budget.write_text(json.dumps({"ReadAllGP": 0}))
+
+    ret = Benchmark.main(["--target", "simulator", "--latency", "0",
+                          "--iterations", "2", "--call", "ReadAllGP",
+                          "--budget", str(budget)])
+    output = json.loads(capsys.readouterr().out)
+
+    assert ret == 1
+    assert output["simulator"]["ReadAllGP"]["write"] == 1
+
+
+def testRestoresSettings():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, 1)
+    mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+    mcp2221.SetClockOutput(MCP2221.DUTY.CYCLE_25, MCP2221.CLOCK.DIV_3MHZ)
+    before = Profile.Read(mcp2221)
+
+    Benchmark.Run(mcp2221, iterations=1)
+    Benchmark.BitBang(mcp2221, count=1)
+
+    assert Profile.Read(mcp2221) == before
+    assert mcp2221.ReadGP(0) == 1
+
+
+def testHardwareOptIn(capsys):
+    ret = Benchmark.main(["--latency", "0", "--iterations", "1",
+                          "--call", "ReadAllGP"])
+    output = json.loads(capsys.readouterr().out)
+
+    assert ret == 0
+    assert list(output) == ["simulator"]
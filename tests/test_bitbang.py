@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221 import Benchmark
+from MCP2221.BitBang import Sequence, SPI
+from MCP2221.Simulator import Simulator
+
+
+class Slave(Simulator):
+    """ SPI mode 0 device on GP0 (SCK), GP1 (MOSI), GP2 (MISO) & GP3 (CS),
+    records received bytes & answers with reply """
+
+    def __init__(self, reply=b"", **kwargs):
+        super().__init__(**kwargs)
+        self.reply = [(byte >> bit) & 1
+                      for byte in reply for bit in range(7, -1, -1)]
+        self.bits = []
+        self._index = 0
+
+    @property
+    def received(self):
+        return bytes(int("".join(map(str, self.bits[i:i + 8])), 2)
+                     for i in range(0, len(self.bits) - 7, 8))
+
+    def _level(self, pin):
+        return (self.gp[pin] >> 4) & 1
+
+    def _present(self):
+        bits = self.reply
+        self.inputs[2] = bits[self._index] if self._index < len(bits) else 0
+
+    def _setGPIO(self, request):
+        sck, cs = self._level(0), self._level(3)
+        response = super()._setGPIO(request)
+
+        if cs and not self._level(3):  # selected
+            self._index = 0
+            self._present()
+        elif not self._level(3):
+            if not sck and self._level(0):  # leading edge, sample
+                self.bits.append(self._level(1))
+            elif sck and not self._level(0):  # trailing edge, shift
+                self._index += 1
+                self._present()
+
+        return response
+
+    _commands = {**Simulator._commands, 0x50: _setGPIO}
+
+
+def setup(device, **kwargs):
+    mcp2221 = MCP2221.MCP2221(device=device)
+    spi = SPI(sck=0, mosi=1, miso=2, cs=3, **kwargs)
+    spi.Setup(mcp2221)
+
+    return mcp2221, spi
+
+
+def testTransfer():
+    device = Slave(reply=b"\xA5\x3C")
+    mcp2221, spi = setup(device)
+
+    assert spi.Transfer(mcp2221, b"\x12\xF0") == b"\xA5\x3C"
+    assert device.received == b"\x12\xF0"
+    assert mcp2221.ReadGP(3) == 1  # released
+
+
+def testWrite():
+    device = Slave()
+    mcp2221, spi = setup(device)
+
+    spi.Write(mcp2221, b"\x81\x7E\x00")
+
+    assert device.received == b"\x81\x7E\x00"
+
+
+def testReportsPerBit():
+    spi = SPI(sck=0, mosi=1, miso=2, cs=3)
+
+    # CS + first bit, 2 edges per bit, release
+    assert len(spi.Compile(b"\x55", read=False)) == 1 + 2 * 8 + 1
+    assert len(spi.Compile(b"\x55")) == 1 + 3 * 8 + 1
+    assert len(spi.Compile(b"\x00")) == 1 + 3 * 8 + 1
+
+
+@pytest.mark.parametrize("mode", [1, 2, 3])
+def testModes(mode):
+    sequence = SPI(sck=0, mosi=1, cs=3, mode=mode).Compile(b"\xFF\x00")
+    idle = mode >> 1
+    sck = [report[4] for report in sequence.reports if report[3]]
+
+    # clock toggles 32 times & ends idle
+    assert len(sck) == 32
+    assert sck[-1] == idle
+    assert sck[0] != idle
+
+
+def testSequence():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.InitGP(1, MCP2221.TYPE.INPUT)
+
+    sequence = Sequence()
+    sequence.Set({0: 1}).Set({0: 1}).Set({0: 0})
+    index = sequence.Sample(0)
+
+    assert len(sequence) == 3  # unchanged level skipped
+    assert index == 0
+    assert sequence.Run(mcp2221) == [0]
+
+
+def testNotGPIO():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+
+    with pytest.raises(IOError):
+        Sequence().Set({2: 1}).Run(mcp2221)
+
+    with pytest.raises(IOError):
+        sequence = Sequence()
+        sequence.Sample(2)
+        sequence.Run(mcp2221)
+
+
+def testInvalid():
+    with pytest.raises(ValueError):
+        SPI(sck=0, mosi=0)
+
+    with pytest.raises(ValueError):
+        SPI(sck=4)
+
+    with pytest.raises(ValueError):
+        SPI(sck=0, mode=4)
+
+    with pytest.raises(ValueError):
+        Sequence().Set({5: 1})
+
+    with pytest.raises(ValueError):
+        SPI(sck=0, mosi=1).Transfer(None, b"\x00")
+
+
+def testWindowThroughput():
+    device = Slave(latency=0.005, interval=0.0002)
+    mcp2221, spi = setup(device)
+    sequence = spi.Compile(b"\x00\x00")
+
+    start = monotonic()
+    sequence.Run(mcp2221, window=1)
+    sequential = monotonic() - start
+
+    start = monotonic()
+    sequence.Run(mcp2221, window=16)
+    pipelined = monotonic() - start
+
+    assert pipelined < sequential / 3
+
+
+def testBenchmark():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    results = Benchmark.BitBang(mcp2221, count=4)
+
+    assert set(results) == {"window_1", "window_16"}
+    assert results["window_16"]["bits"] == 32
+    assert results["window_16"]["bits_per_second"] > 0
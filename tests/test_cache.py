@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+
+
+def readSRAM(mcp2221):
+    buf = [0] * 65
+    buf[1] = 0x61  # get SRAM settings
+    mcp2221.mcp2221.write(buf)
+    return mcp2221.mcp2221.read(65)
+
+
+def testCacheFilledOnOpen():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+
+    assert mcp2221._sram is not None
+
+
+def testCacheDisabled():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+
+    assert mcp2221._sram is None
+
+
+def testCacheFollowsWrites():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.InitGP(1, MCP2221.TYPE.CLOCK_OUT)
+    mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+    mcp2221.InitGP(3, MCP2221.TYPE.ADC)
+    mcp2221.SetClockOutput(MCP2221.DUTY.CYCLE_25, MCP2221.CLOCK.DIV_6MHZ)
+    mcp2221.SetDACVoltageReference(MCP2221.VRM.REF_1_024V)
+    mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_4_096V)
+    mcp2221.WriteDAC(7)
+    mcp2221.WriteGP(0, 1)
+
+    buf = readSRAM(mcp2221)
+
+    assert mcp2221._sram[5:8] == buf[5:8]
+    assert mcp2221._sram[22:26] == buf[22:26]
+
+
+def testCacheIgnoresNonGPIOWrite():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    mcp2221.WriteAllGP(None, 1, None, None)  # ignored by device
+
+    assert mcp2221._sram[22:26] == readSRAM(mcp2221)[22:26]
+
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+
+    assert readSRAM(mcp2221)[23] == 0b10
+    assert mcp2221.GetGPType(1) == MCP2221.TYPE.ADC
+
+
+@pytest.mark.parametrize("pin", [0, 1, 2, 3])
+def testCachedType(pin):
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.InitGP(pin, MCP2221.TYPE.INPUT)
+
+    assert mcp2221.GetGPType(pin) == MCP2221.TYPE.INPUT
+
+
+def testInvalidateCache():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.InvalidateCache()
+
+    assert mcp2221._sram is None
+
+    mcp2221.GetGPType(0)
+
+    assert mcp2221._sram is not None
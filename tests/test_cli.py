@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import json
+import pytest
+from MCP2221 import MCP2221
+from MCP2221 import Benchmark
+from MCP2221 import CLI
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+@pytest.fixture
+def hid(monkeypatch):
+    hid = SimulatedHID(Simulator(serial="A", path=b"sim:0"),
+                       Simulator(serial="B", path=b"sim:1"))
+    monkeypatch.setattr(MCP2221, "hid", hid)
+    monkeypatch.setattr(MCP2221, "TRANSPORT", "hidapi")
+    MCP2221.InvalidateEnumeration()
+
+    yield hid
+
+    MCP2221.InvalidateEnumeration()
+
+
+def run(capsys, *argv):
+    ret = CLI.main(list(argv))
+    lines = capsys.readouterr().out.splitlines()
+
+    return ret, [json.loads(line) for line in lines]
+
+
+def testList(hid, capsys):
+    ret, lines = run(capsys, "list")
+
+    assert ret == 0
+    assert [line["serial"] for line in lines] == ["A", "B"]
+    assert lines[1]["path"] == "sim:1"
+
+
+def testMonitor(hid, capsys):
+    hid.devices[1].voltages = [1.0, 2.0, 3.0]
+    ret, lines = run(capsys, "monitor", "--serial", "B", "--rate", "200",
+                     "--count", "3")
+
+    assert ret == 0
+    assert len(lines) == 3
+    assert lines[0]["gpio"] == [0, 0, 0, 0]
+    assert len(lines[0]["adc"]) == 3
+    assert lines[0]["time"] <= lines[2]["time"]
+
+
+def testMonitorByPath(hid, capsys):
+    ret, lines = run(capsys, "monitor", "--path", "sim:1", "--count", "1",
+                     "--rate", "100")
+
+    assert ret == 0
+    assert len(lines) == 1
+
+
+def testMonitorAdcOnly(capsys):
+    ret, lines = run(capsys, "monitor", "--simulator", "--count", "1",
+                     "--rate", "100", "--no-gpio")
+
+    assert ret == 0
+    assert list(lines[0]) == ["time", "adc"]
+
+
+def testDumpRestore(hid, tmp_path, capsys):
+    path = str(tmp_path / "image.json")
+    assert run(capsys, "dump", "--dev", "0", "--output", path)[0] == 0
+
+    image = json.loads(open(path).read())
+    assert "CHIP_SERIAL_NUMBER" not in image
+
+    ret, lines = run(capsys, "restore", "--dev", "1", path, "--dry-run")
+    assert ret == 0
+    assert lines == [{"changed": ["USB_SERIAL_NUMBER"], "written": False}]
+
+    ret, lines = run(capsys, "restore", "--dev", "1", path)
+    assert lines[0]["written"]
+    assert hid.devices[1].get_serial_number_string() == "A"
+
+
+def testDumpStdout(capsys):
+    ret, lines = run(capsys, "dump", "--simulator")
+
+    assert ret == 0
+    assert lines[0]["USB_SERIAL_NUMBER"] == "0001234567"
+
+
+def testBench(tmp_path, capsys):
+    budget = tmp_path / "budget.json"
+    budget.write_text(json.dumps({"ReadAllGP": 0}))
+
+    ret, lines = run(capsys, "bench", "--simulator", "--latency", "0",
+                     "--iterations", "2", "--call", "ReadAllGP",
+                     "--call", "ReadAllADC", "--budget", str(budget))
+
+    assert ret == 1
+    assert [line["call"] for line in lines] == ["ReadAllGP", "ReadAllADC"]
+    assert lines[0]["over_budget"]
+    assert lines[1]["write"] == 1
+
+
+def testBenchRestores(hid, capsys, monkeypatch):
+    device = hid.devices[0]
+    gp = list(device.gp)
+    configured = []
+    configure = Benchmark._configure
+    monkeypatch.setattr(Benchmark, "_configure",
+                        lambda m: configured.append(configure(m)))
+
+    ret, lines = run(capsys, "bench", "--serial", "A", "--iterations", "1")
+
+    assert ret == 0
+    assert len(lines) == len(Benchmark.CALLS)
+    assert len(configured) == 1
+    assert device.gp == gp
+
+
+def testInvalidRate(capsys):
+    with pytest.raises(SystemExit) as err:
+        CLI.main(["monitor", "--simulator", "--rate", "0"])
+
+    assert err.value.code == 2
+    assert "--rate" in capsys.readouterr().err
+
+
+def testNoDevice(hid, capsys):
+    assert CLI.main(["monitor", "--dev", "5", "--count", "1"]) == 1
+    assert "mcp2221:" in capsys.readouterr().err
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import subprocess
+import sys
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+class CountingHID(SimulatedHID):
+    def __init__(self, *devices):
+        super().__init__(*devices)
+        self.scans = 0
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        self.scans += 1
+        return super().enumerate(vendor_id, product_id)
+
+
+@pytest.fixture
+def hid(monkeypatch):
+    hid = CountingHID(Simulator(serial="A", path=b"sim:0"),
+                      Simulator(serial="B", path=b"sim:1"))
+    monkeypatch.setattr(MCP2221, "hid", hid)
+    MCP2221.InvalidateEnumeration()
+
+    yield hid
+
+    MCP2221.InvalidateEnumeration()
+
+
+def testEnumerationCached(hid):
+    for dev in (0, 1, 0):
+        MCP2221.MCP2221(dev=dev)
+
+    assert hid.scans == 1
+
+
+def testRefresh(hid):
+    MCP2221.Enumerate()
+    hid.devices.append(Simulator(serial="C", path=b"sim:2"))
+
+    assert len(MCP2221.Enumerate()) == 2
+    assert len(MCP2221.Enumerate(refresh=True)) == 3
+
+
+def testInvalidate(hid):
+    MCP2221.Enumerate()
+    MCP2221.InvalidateEnumeration()
+    MCP2221.Enumerate()
+
+    assert hid.scans == 2
+
+
+def testOutdatedCache(hid):
+    MCP2221.Enumerate()
+    hid.devices.append(Simulator(serial="C", path=b"sim:2"))
+    info = MCP2221.MCP2221(dev=2).GetDeviceInfo()
+
+    assert info["serial"] == "C"
+
+
+def testOpenBySerial(hid):
+    info = MCP2221.MCP2221(serial="B").GetDeviceInfo()
+
+    assert (info["serial"], hid.scans) == ("B", 0)
+
+
+def testOpenByPath(hid):
+    info = MCP2221.MCP2221(path=b"sim:1").GetDeviceInfo()
+
+    assert (info["serial"], hid.scans) == ("B", 0)
+
+
+def testUnknownSerial(hid):
+    with pytest.raises(IOError):
+        MCP2221.MCP2221(serial="X")
+
+
+def testLazyImport():
+    code = "import sys; from MCP2221 import MCP2221; " \
+        "print('hid' in sys.modules)"
+    out = subprocess.check_output([sys.executable, "-c", code], text=True)
+
+    assert out.strip() == "False"
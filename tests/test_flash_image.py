@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.FlashImage import FlashImage
+from MCP2221.Simulator import Simulator
+
+
+class Counting(Simulator):
+    """ Count flash writes per section """
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def _writeFlash(self, request):
+        self.writes.append(request[1])
+        return super()._writeFlash(request)
+
+    _commands = {**Simulator._commands, 0xB1: _writeFlash}
+
+
+@pytest.fixture
+def device():
+    return Counting()
+
+
+@pytest.fixture
+def mcp2221(device):
+    return MCP2221.MCP2221(device=device)
+
+
+def testReadAllFlash(mcp2221):
+    sections = mcp2221.ReadAllFlash()
+
+    assert list(sections) == list(MCP2221.FLASH)
+
+    for address in MCP2221.FLASH:
+        assert sections[address] == mcp2221.ReadFlash(address)
+
+
+def testReadImage(mcp2221):
+    image = FlashImage.Read(mcp2221)
+
+    assert image.GetString(MCP2221.FLASH.USB_MANUFACTURER) == \
+        mcp2221.GetDeviceInfo()["manufacturer"]
+    assert image[MCP2221.FLASH.GP_SETTING] == \
+        mcp2221.ReadFlash(MCP2221.FLASH.GP_SETTING)
+
+
+def testWriteOnlyDiffering(device, mcp2221):
+    current = FlashImage.Read(mcp2221)
+    desired = FlashImage(current.sections)
+    desired.SetString(MCP2221.FLASH.USB_PRODUCT_DESCRIPTOR, "Test board")
+
+    assert desired.Write(mcp2221, current) == \
+        [MCP2221.FLASH.USB_PRODUCT_DESCRIPTOR]
+    assert device.writes == [MCP2221.FLASH.USB_PRODUCT_DESCRIPTOR.value]
+    assert current == desired
+
+    # already provisioned, nothing to write
+    device.writes.clear()
+    assert desired.Write(mcp2221) == []
+    assert device.writes == []
+
+    assert FlashImage.Read(mcp2221) == desired
+
+
+def testWriteSettings(device, mcp2221):
+    desired = FlashImage()
+    desired[MCP2221.FLASH.GP_SETTING] = [0, 0, 0b1000, 0b1000]
+
+    assert desired.Write(mcp2221) == [MCP2221.FLASH.GP_SETTING]
+    assert mcp2221.ReadFlash(MCP2221.FLASH.GP_SETTING) == \
+        [0, 0, 0b1000, 0b1000]
+
+
+def testChipSerialNotWritten(device, mcp2221):
+    desired = FlashImage.Read(mcp2221)
+    desired[MCP2221.FLASH.CHIP_SERIAL_NUMBER] = [0] * 8
+
+    assert desired.Write(mcp2221) == []
+    assert device.writes == []
+
+
+def testSaveLoad(tmp_path, mcp2221):
+    image = FlashImage.Read(mcp2221)
+    path = str(tmp_path / "image.json")
+
+    image.Save(path)
+    loaded = FlashImage.Load(path)
+
+    assert MCP2221.FLASH.CHIP_SERIAL_NUMBER not in loaded
+    assert loaded.Diff(image) == []
+
+    image.Save(path, serial=True)
+    assert FlashImage.Load(path) == image
+
+
+def testLoadUnknownSection(tmp_path):
+    path = tmp_path / "image.json"
+    path.write_text('{"NOT_A_SECTION": "00"}')
+
+    with pytest.raises(ValueError):
+        FlashImage.Load(str(path))
+
+
+def testInvalidSection():
+    image = FlashImage()
+
+    with pytest.raises(TypeError):
+        image[0x01] = [0]
+
+    with pytest.raises(TypeError):
+        image.SetString(MCP2221.FLASH.GP_SETTING, "text")
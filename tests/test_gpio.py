@@ -148,3 +148,16 @@ def testCombinated():
 
     assert (gp0, gp0_dir, gp1, gp1_dir, gp2, gp3) == (
         0b000, 1, 0b000, 0, 0b010, 0b011)
+
+
+def testReadAllInto():
+    mcp2221 = MCP2221.MCP2221()
+    for i in range(4):
+        mcp2221.InitGP(i, MCP2221.TYPE.OUTPUT)
+
+    mcp2221.WriteAllGP(1, 0, 1, 0)
+    out = [None] * 4
+    state = mcp2221.ReadAllGP(out)
+
+    assert state is out
+    assert out == [1, 0, 1, 0]
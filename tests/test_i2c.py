@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.Simulator import Simulator, I2CMemory
+
+
+class Slow(Simulator):
+    """ I2C engine busy on every other request, or always when stuck """
+
+    def __init__(self, stuck=False, **kwargs):
+        super().__init__(**kwargs)
+        self.stuck = stuck
+        self.polls = 0
+
+    def _busy(self):
+        self.polls += 1
+        return self.stuck or self.polls % 2 == 0
+
+    def _i2cWrite(self, request):
+        if self._busy():
+            return [request[0], 0x01]  # engine busy, chunk not accepted
+
+        return super()._i2cWrite(request)
+
+    def _i2cGetData(self, request):
+        if self._busy():
+            return [0x40, 0x41]  # not ready
+
+        return super()._i2cGetData(request)
+
+    _commands = {**Simulator._commands, 0x40: _i2cGetData,
+                 0x90: _i2cWrite, 0x94: _i2cWrite}
+
+
+@pytest.fixture
+def mcp2221():
+    device = Simulator()
+    device.i2c[0x50] = I2CMemory()
+    return MCP2221.MCP2221(device=device)
+
+
+def testSpeed(mcp2221):
+    mcp2221.I2CSetSpeed(400000)
+
+    assert mcp2221.mcp2221.i2c_divider == 27
+
+
+@pytest.mark.parametrize("speed", [10000, 1000000])
+def testInvalidSpeed(mcp2221, speed):
+    with pytest.raises(ValueError):
+        mcp2221.I2CSetSpeed(speed)
+
+
+@pytest.mark.parametrize("length", [1, 60, 61, 1000])
+def testWriteRead(mcp2221, length):
+    data = bytes(i & 0xFF for i in range(length))
+    mcp2221.I2CWrite(0x50, b"\x01\x00" + data)
+
+    assert mcp2221.I2CWriteRead(0x50, b"\x01\x00", length) == data
+
+
+def testReadInto(mcp2221):
+    mcp2221.I2CWrite(0x50, [0, 0, 1, 2, 3])
+    mcp2221.I2CWrite(0x50, [0, 0])
+    out = bytearray(3)
+
+    assert mcp2221.I2CRead(0x50, 3, out) is out
+    assert out == b"\x01\x02\x03"
+
+
+def testTransactions(mcp2221):
+    sent = []
+    send = mcp2221._send
+
+    def count(buf):
+        sent.append(buf[1])
+        return send(buf)
+
+    mcp2221._send = count
+    mcp2221.I2CWrite(0x50, bytes(2 + 120))
+
+    assert sent == [0x90, 0x90, 0x90, 0x10]
+
+
+def testWriteNack(mcp2221):
+    with pytest.raises(IOError):
+        mcp2221.I2CWrite(0x51, b"\x00")
+
+
+def testReadNack(mcp2221):
+    with pytest.raises(IOError):
+        mcp2221.I2CRead(0x51, 1)
+
+
+def testInvalidAddress(mcp2221):
+    with pytest.raises(ValueError):
+        mcp2221.I2CWrite(0x80, b"\x00")
+
+
+def testInvalidLength(mcp2221):
+    with pytest.raises(ValueError):
+        mcp2221.I2CRead(0x50, 0)
+
+
+def testTimeoutWithoutProgress(monkeypatch):
+    monkeypatch.setattr(MCP2221, "I2C_TIMEOUT", 0.05)
+    device = Slow(latency=0.001)
+    device.i2c[0x50] = I2CMemory()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    data = bytes(i & 0xFF for i in range(3000))
+
+    # whole transfers take far longer than I2C_TIMEOUT, but progress
+    mcp2221.I2CWrite(0x50, b"\x00\x00" + data)
+
+    assert mcp2221.I2CWriteRead(0x50, b"\x00\x00", len(data)) == data
+
+
+def testTimeoutStuck(monkeypatch):
+    monkeypatch.setattr(MCP2221, "I2C_TIMEOUT", 0.05)
+    device = Slow(stuck=True)
+    device.i2c[0x50] = I2CMemory()
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    with pytest.raises(IOError):
+        mcp2221.I2CWrite(0x50, b"\x00")
+
+    # busy engine is polled with back-off, not in a tight loop
+    assert device.polls <= 0.05 / MCP2221.I2C_BACKOFF + 2
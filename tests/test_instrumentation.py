@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.Instrumentation import Instrumentation, BUCKETS
+from MCP2221.Simulator import Simulator
+
+
+class Silent(Simulator):
+    """ Never answer GPIO reads """
+
+    def _getGPIO(self, request):
+        return None
+
+    _commands = {**Simulator._commands, 0x51: _getGPIO}
+
+
+class Busy(Simulator):
+    """ Reject flash writes """
+
+    def _writeFlash(self, request):
+        return [0xB1, 0x01]
+
+    _commands = {**Simulator._commands, 0xB1: _writeFlash}
+
+
+@pytest.fixture
+def mcp2221():
+    return MCP2221.MCP2221(device=Simulator())
+
+
+def testCounters(mcp2221):
+    with Instrumentation(mcp2221) as instrumentation:
+        mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+        mcp2221.WriteGP(0, 1)
+        mcp2221.ReadAllGP()
+        mcp2221.ReadAllGP()
+
+    stats = instrumentation.Stats()
+
+    assert stats[0x61]["count"] == 1
+    assert stats[0x60]["count"] == 1
+    assert stats[0x50]["count"] == 1
+    assert stats[0x51]["count"] == 2
+    assert stats[0x51]["errors"] == 0
+    assert stats[0x51]["bytes_out"] == 2 * 65
+    assert stats[0x51]["bytes_in"] == 2 * 64
+    assert sum(stats[0x51]["histogram"]) == 2
+    assert len(stats[0x51]["histogram"]) == len(BUCKETS) + 1
+    assert stats[0x51]["min"] <= stats[0x51]["mean"] <= stats[0x51]["max"]
+
+
+def testStopRestoresDevice(mcp2221):
+    device = mcp2221.mcp2221
+    instrumentation = Instrumentation(mcp2221)
+
+    instrumentation.Start()
+    assert mcp2221.mcp2221 is not device
+    assert instrumentation.running
+
+    instrumentation.Stop()
+    assert mcp2221.mcp2221 is device
+
+    mcp2221.ReadAllGP()
+    assert instrumentation.Stats() == {}
+
+
+def testStopUnderOtherWrapper(mcp2221):
+    device = mcp2221.mcp2221
+    instrumentation = Instrumentation(mcp2221)
+    outer = Instrumentation(mcp2221)
+
+    instrumentation.Start()
+    outer.Start()
+    instrumentation.Stop()
+
+    assert mcp2221.mcp2221 is outer._device
+    assert outer._device.device is device
+
+    mcp2221.ReadAllGP()
+    assert instrumentation.Stats() == {}
+    assert outer.Stats()[0x51]["count"] == 1
+
+
+def testReset(mcp2221):
+    with Instrumentation(mcp2221) as instrumentation:
+        mcp2221.ReadAllADC()
+        assert 0x10 in instrumentation.Stats()
+
+        instrumentation.Reset()
+        assert instrumentation.Stats() == {}
+
+        mcp2221.ReadAllADC()
+        assert instrumentation.Stats()[0x10]["count"] == 1
+
+
+def testFailedStatus():
+    mcp2221 = MCP2221.MCP2221(device=Busy())
+
+    with Instrumentation(mcp2221) as instrumentation:
+        mcp2221.WriteFlash(MCP2221.FLASH.GP_SETTING, [0, 0, 0, 0])
+
+    stats = instrumentation.Stats()[0xB1]
+    assert (stats["count"], stats["errors"]) == (1, 1)
+
+
+def testNoResponse():
+    mcp2221 = MCP2221.MCP2221(device=Silent())
+
+    with Instrumentation(mcp2221) as instrumentation:
+        with pytest.raises(IOError):
+            mcp2221.ReadAllGP()
+
+    stats = instrumentation.Stats()[0x51]
+    assert (stats["no_response"], stats["errors"]) == (1, 1)
+
+
+def testUnexpectedResponse():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    device.write(bytes([0, 0x51]) + bytes(63))  # stale response
+
+    with Instrumentation(mcp2221) as instrumentation:
+        with pytest.raises(IOError):
+            mcp2221.ReadAllADC()
+
+        mcp2221.ReadAllGP()
+
+    # stale response is not taken for the one of the request
+    stats = instrumentation.Stats()
+    assert (stats[0x10]["count"], stats[0x10]["errors"]) == (1, 1)
+    assert (stats[0x51]["count"], stats[0x51]["errors"]) == (1, 0)
+
+
+def testHooks(mcp2221):
+    trace = []
+
+    def pre(opcode, request):
+        trace.append(("pre", opcode, len(request)))
+
+    def post(opcode, request, response, latency):
+        trace.append(("post", opcode, response[0], latency >= 0))
+
+    with Instrumentation(mcp2221, pre, post):
+        mcp2221.ReadAllADC()
+
+    assert trace == [("pre", 0x10, 65), ("post", 0x10, 0x10, True)]
+
+
+def testPipelined(mcp2221):
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        with mcp2221.Pipeline(window=4):
+            for i in range(10):
+                mcp2221.WriteGP(0, i & 1)
+
+    assert instrumentation.Stats()[0x50]["count"] == 10
@@ -1,25 +1,92 @@
 #!/usr/bin/env python3
 
 import pytest
+import threading
 from MCP2221 import MCP2221
 
 
-def testInitInterrupt():
+def readSRAM(mcp2221):
+    buf = [0] * 65
+    buf[1] = 0x61  # get SRAM settings
+    return mcp2221._send(buf)
+
+
+@pytest.mark.parametrize("rising,falling", [
+    (False, False), (True, False), (False, True), (True, True)])
+def testInitInterrupt(rising, falling):
     mcp2221 = MCP2221.MCP2221()
     mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
+    mcp2221.SetInterruptDetection(rising, falling)
+
+    buf = readSRAM(mcp2221)
 
-    with pytest.raises(Exception):
-        mcp2221.SetInterruptDetection()
+    pos = (buf[7] >> 5) & 1
+    neg = (buf[7] >> 6) & 1
+
+    assert (pos, neg) == (rising, falling)
 
 
 def testInterruptPin():
     mcp2221 = MCP2221.MCP2221()
     mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
 
-    buf = [0] * 65
-    buf[1] = 0x61  # get SRAM settings
-    buf = mcp2221._send(buf)
+    buf = readSRAM(mcp2221)
 
     gp_type = buf[23] & 0b111
 
     assert gp_type == 0b100
+
+
+def testClearFlag():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
+    mcp2221.SetInterruptDetection(True, True)
+    mcp2221.ClearInterruptFlag()
+
+    assert mcp2221.GetInterruptFlag() is False
+
+
+def testWaitTimeout():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
+    mcp2221.SetInterruptDetection(True, True)
+
+    assert mcp2221.WaitForInterrupt(timeout=0.05) is False
+
+
+def testWaitEdge(simulator):
+    if simulator is None:
+        pytest.skip("needs simulator to drive GP1")
+
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
+    mcp2221.SetInterruptDetection(rising=True, falling=False)
+
+    simulator.SetInput(1, 1)
+    simulator.SetInput(1, 0)  # short pulse, latched
+
+    assert mcp2221.WaitForInterrupt(timeout=1) is True
+    assert mcp2221.GetInterruptFlag() is False
+
+    timer = threading.Timer(0.05, simulator.SetInput, (1, 1))
+    timer.start()
+
+    assert mcp2221.WaitForInterrupt(timeout=1) is True
+
+
+def testCachedInterrupt():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.SetInterruptDetection(False, True)
+    cached = mcp2221._sram[7]
+
+    assert cached & 0b1100000 == readSRAM(mcp2221)[7] & 0b1100000
+
+
+def testTransactionInterrupt():
+    mcp2221 = MCP2221.MCP2221()
+
+    with mcp2221.Transaction(verify=True):
+        mcp2221.InitGP(1, MCP2221.TYPE.INTERRUPT)
+        mcp2221.SetInterruptDetection(True, False)
+
+    assert (readSRAM(mcp2221)[7] >> 5) & 0b11 == 0b01
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221.Simulator import Simulator
+
+
+class Failing(Simulator):
+    """ Reject the n-th GPIO write """
+
+    def __init__(self, fail, **kwargs):
+        super().__init__(**kwargs)
+        self.fail = fail
+        self.writes = 0
+
+    def _setGPIO(self, request):
+        self.writes += 1
+
+        if self.writes == self.fail:
+            return [0x50, 0x01]
+
+        return super()._setGPIO(request)
+
+    _commands = {**Simulator._commands, 0x50: _setGPIO}
+
+
+def init(device):
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.OUTPUT)
+
+    return mcp2221
+
+
+def testPipelineWrites():
+    device = Simulator()
+    mcp2221 = init(device)
+
+    with mcp2221.Pipeline(window=4):
+        for i in range(16):
+            mcp2221.WriteAllGP(i & 1, (i >> 1) & 1, (i >> 2) & 1, i >> 3)
+
+        mcp2221.WriteGP(0, 0)
+
+    assert mcp2221._pipeline is None
+    assert not device._responses
+    assert mcp2221.ReadAllGP() == [0, 1, 1, 1]
+
+
+def testPipelineWindow():
+    device = Simulator()
+    mcp2221 = init(device)
+
+    with mcp2221.Pipeline(window=3):
+        for i in range(10):
+            mcp2221.WriteGP(0, i & 1)
+            assert len(device._responses) <= 3
+
+
+def testPipelineReadDrains():
+    device = Simulator()
+    mcp2221 = init(device)
+
+    with mcp2221.Pipeline():
+        mcp2221.WriteGP(1, 1)
+        mcp2221.WriteGP(2, 1)
+
+        assert mcp2221.ReadGP(2) == 1
+        assert len(mcp2221._pipeline) == 0
+
+
+def testPipelineNested():
+    mcp2221 = init(Simulator())
+
+    with mcp2221.Pipeline():
+        mcp2221.WriteGP(0, 1)
+
+        with mcp2221.Pipeline():
+            mcp2221.WriteGP(1, 1)
+
+        assert len(mcp2221._pipeline) == 2
+
+    assert mcp2221.ReadAllGP()[:2] == [1, 1]
+
+
+def testPipelineFlash():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+
+    with mcp2221.Pipeline():
+        assert mcp2221.WriteFlash(
+            MCP2221.FLASH.GP_SETTING, [0b1000, 0, 0b1000, 0]) is None
+
+    buf = mcp2221.ReadFlash(MCP2221.FLASH.GP_SETTING)
+    assert [value & 0b1111 for value in buf] == [0b1000, 0, 0b1000, 0]
+
+
+def testPipelineFailure():
+    device = Failing(fail=3)
+    mcp2221 = init(device)
+    device.writes = 0
+
+    with pytest.raises(IOError):
+        with mcp2221.Pipeline(window=8):
+            for i in range(6):
+                mcp2221.WriteGP(0, i & 1)
+
+    # responses after the failed one are discarded
+    assert mcp2221._pipeline is None
+    assert not device._responses
+    assert mcp2221.ReadGP(0) == 1
+
+
+def testPipelineException():
+    device = Simulator()
+    mcp2221 = init(device)
+
+    with pytest.raises(KeyError):
+        with mcp2221.Pipeline():
+            mcp2221.WriteGP(0, 1)
+            raise KeyError()
+
+    assert not device._responses
+    assert mcp2221.ReadGP(0) == 1
+
+
+def testPipelineCached():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(device=device, cache=True)
+
+    with mcp2221.Pipeline():
+        mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, 1)
+        mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+        mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_2_048V)
+
+    # each setter built on the previous one, not on a stale copy
+    assert device.gp == [0b10000, 2, 0b1000, 0b1000]
+    assert device.adc_ref == 0b101
+    assert mcp2221._sram[22:26] == device.gp
+
+
+def testPipelineCachedFailure():
+    device = Failing(fail=2)
+    mcp2221 = MCP2221.MCP2221(device=device, cache=True)
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    device.writes = 0
+
+    with pytest.raises(IOError):
+        with mcp2221.Pipeline():
+            mcp2221.WriteGP(0, 1)
+            mcp2221.WriteGP(0, 0)
+
+    assert mcp2221._sram is None  # not trusted after failure
+    assert mcp2221.ReadGP(0) == 1
+
+
+def testPipelineWindowInvalid():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+
+    with pytest.raises(ValueError):
+        with mcp2221.Pipeline(window=0):
+            pass
+
+
+def testPipelineThroughput():
+    device = Simulator(latency=0.01, interval=0.001)
+    mcp2221 = init(device)
+
+    start = monotonic()
+
+    for i in range(20):
+        mcp2221.WriteGP(0, i & 1)
+
+    sequential = monotonic() - start
+    start = monotonic()
+
+    with mcp2221.Pipeline(window=16):
+        for i in range(20):
+            mcp2221.WriteGP(0, i & 1)
+
+    pipelined = monotonic() - start
+
+    assert pipelined < sequential / 3
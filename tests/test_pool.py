@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221.DevicePool import DevicePool
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+@pytest.fixture
+def devices(monkeypatch):
+    devices = [Simulator(latency=0.02, serial=f"SN{i}", path=f"sim:{i}")
+               for i in range(10)]
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(*devices))
+
+    return devices
+
+
+def testKeyedBySerial(devices):
+    with DevicePool() as pool:
+        info = pool.GetDeviceInfo()
+
+    assert len(info) == 10
+    assert all(info[serial]["serial"] == serial for serial in info)
+
+
+def testParallel(devices):
+    with DevicePool() as pool:
+        start = monotonic()
+        adc = pool.ReadAllADC()
+        elapsed = monotonic() - start
+
+    assert len(adc) == 10
+    assert elapsed < 0.1
+
+
+def testMap(devices):
+    devices[3].inputs = [1, 1, 1, 1]
+
+    with DevicePool() as pool:
+        pool.Map(lambda device: device.InitGP(0, MCP2221.TYPE.INPUT))
+        gpio = pool.ReadGP(0)
+
+    assert [serial for serial in gpio if gpio[serial]] == ["SN3"]
+
+
+def testExceptions(devices):
+    with DevicePool() as pool:
+        result = pool.Map(lambda device: device.ReadADC(4),
+                          return_exceptions=True)
+
+        with pytest.raises(ValueError):
+            pool.ReadADC(4)
+
+    assert all(isinstance(err, ValueError) for err in result.values())
+
+
+def testDuplicateSerial(monkeypatch):
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(
+        Simulator(path=b"sim:0"), Simulator(path=b"sim:1")))
+
+    with DevicePool() as pool:
+        assert sorted(pool.devices) == ["sim:0", "sim:1"]
+
+
+def testInvalidMethod(devices):
+    with DevicePool() as pool:
+        with pytest.raises(AttributeError):
+            pool.Unknown()
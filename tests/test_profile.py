@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+from MCP2221.Instrumentation import Instrumentation
+from MCP2221.Profile import Profile
+from MCP2221.Simulator import Simulator
+
+BOARD = Profile(
+    gp=[MCP2221.TYPE.OUTPUT, MCP2221.TYPE.ADC,
+        MCP2221.TYPE.ADC, MCP2221.TYPE.DAC],
+    values=[1, None, None, None],
+    clock_duty=MCP2221.DUTY.CYCLE_25,
+    clock_divider=MCP2221.CLOCK.DIV_3MHZ,
+    dac_ref=MCP2221.VRM.REF_2_048V,
+    dac=16,
+    adc_ref=MCP2221.VRM.REF_4_096V,
+    interrupt_rising=True,
+    interrupt_falling=False)
+
+
+class Busy(Simulator):
+    """ Reject SRAM writes """
+
+    def _setSRAM(self, request):
+        return [0x60, 0x01]
+
+    _commands = {**Simulator._commands, 0x60: _setSRAM}
+
+
+@pytest.fixture
+def device():
+    return Simulator()
+
+
+@pytest.fixture
+def mcp2221(device):
+    return MCP2221.MCP2221(device=device)
+
+
+def counts(instrumentation):
+    return {opcode: stats["count"]
+            for opcode, stats in instrumentation.Stats().items()}
+
+
+def testRead(mcp2221):
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, 1)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_1_024V)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        profile = Profile.Read(mcp2221)
+
+    assert counts(instrumentation) == {0x61: 1}
+    assert profile.gp == (MCP2221.TYPE.OUTPUT, MCP2221.TYPE.ADC,
+                          MCP2221.TYPE.INPUT, MCP2221.TYPE.INPUT)
+    assert profile.values == (1, None, None, None)
+    assert profile.adc_ref == MCP2221.VRM.REF_1_024V
+    assert profile.clock_divider == MCP2221.CLOCK.DIV_12MHZ
+
+
+def testApply(mcp2221, device):
+    with Instrumentation(mcp2221) as instrumentation:
+        changed = BOARD.Apply(mcp2221)
+
+    assert counts(instrumentation) == {0x61: 1, 0x60: 1}
+    assert changed == ["gp", "values", "clock_duty", "clock_divider",
+                       "dac_ref", "dac", "adc_ref", "interrupt_rising"]
+    assert Profile.Read(mcp2221) == BOARD
+    assert mcp2221.ReadGP(0) == 1
+    assert device.dac == 16
+
+
+def testApplyUnchanged(mcp2221):
+    BOARD.Apply(mcp2221)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        assert BOARD.Apply(mcp2221) == []
+
+    assert counts(instrumentation) == {0x61: 1}
+
+
+def testApplyCached(device):
+    mcp2221 = MCP2221.MCP2221(device=device, cache=True)
+    BOARD.Apply(mcp2221)
+
+    with Instrumentation(mcp2221) as instrumentation:
+        assert BOARD.Apply(mcp2221) == []
+        assert mcp2221.GetADCVoltageReference() == MCP2221.VRM.REF_4_096V
+
+    assert counts(instrumentation) == {}
+
+
+def testApplyValues(mcp2221):
+    BOARD.Apply(mcp2221)
+    profile = Profile(values=[0, 1, 1, 1])  # GP1-GP3 are not GPIO
+
+    with Instrumentation(mcp2221) as instrumentation:
+        assert profile.Apply(mcp2221) == ["values"]
+
+    assert counts(instrumentation) == {0x61: 1, 0x50: 1}
+    assert mcp2221.ReadGP(0) == 0
+    assert Profile.Read(mcp2221) == \
+        Profile(values=[0, None, None, None]).Merge(BOARD)
+
+
+def testApplyPartial(mcp2221):
+    BOARD.Apply(mcp2221)
+    profile = Profile(gp=[None, MCP2221.TYPE.INPUT, None, None], dac=3)
+
+    assert profile.Apply(mcp2221) == ["gp", "dac"]
+
+    current = Profile.Read(mcp2221)
+
+    assert current.gp == (MCP2221.TYPE.OUTPUT, MCP2221.TYPE.INPUT,
+                          MCP2221.TYPE.ADC, MCP2221.TYPE.DAC)
+    assert current.values[0] == 1  # kept by GP settings write
+    assert current.dac == 3
+    assert current.adc_ref == MCP2221.VRM.REF_4_096V
+
+
+def testApplyFailed():
+    mcp2221 = MCP2221.MCP2221(device=Busy(), cache=True)
+
+    with pytest.raises(IOError):
+        BOARD.Apply(mcp2221)
+
+    assert mcp2221._sram is None
+
+
+def testDefaults(mcp2221, device):
+    assert BOARD.WriteDefaults(mcp2221) == [MCP2221.FLASH.CHIP_SETTING,
+                                            MCP2221.FLASH.GP_SETTING]
+    assert Profile.ReadDefaults(mcp2221) == BOARD
+    assert BOARD.WriteDefaults(mcp2221) == []
+
+    # other chip settings are kept
+    assert device.flash[0x00][4:] == Simulator().flash[0x00][4:]
+
+    device._powerUp()
+    mcp2221.InvalidateCache()
+
+    assert Profile.Read(mcp2221) == BOARD
+
+
+def testDict(tmp_path):
+    data = BOARD.ToDict()
+
+    assert data["gp"] == ["OUTPUT", "ADC", "ADC", "DAC"]
+    assert data["adc_ref"] == "REF_4_096V"
+    assert Profile.FromDict(data) == BOARD
+    assert Profile(dac=1).ToDict() == {"dac": 1}
+
+    path = str(tmp_path / "board.json")
+    BOARD.Save(path)
+
+    assert Profile.Load(path) == BOARD
+
+
+def testInvalid():
+    with pytest.raises(TypeError):
+        Profile(gp=[MCP2221.TYPE.ADC, None, None, None])
+
+    with pytest.raises(TypeError):
+        Profile(adc_ref=2)
+
+    with pytest.raises(ValueError):
+        Profile(dac=32)
+
+    with pytest.raises(ValueError):
+        Profile(values=[2, None, None, None])
+
+    with pytest.raises(ValueError):
+        Profile(gp=[None])
+
+    with pytest.raises(ValueError):
+        Profile.FromDict({"adc": "VDD"})
+
+    with pytest.raises(ValueError):
+        Profile.FromDict({"adc_ref": "5V"})
@@ -1,7 +1,48 @@
 #!/usr/bin/env python3
 
 import pytest
+from time import monotonic
 from MCP2221 import MCP2221
+from MCP2221.Instrumentation import Instrumentation
+from MCP2221.Simulator import Simulator, SimulatedHID
+from MCP2221.Trace import Recorder, ReadTrace
+
+
+class Renumbered(Simulator):
+    """ New path after reset, like hidapi's libusb backend """
+
+    def _reset(self, request):
+        self.path += b"'"
+        return super()._reset(request)
+
+    _commands = {**Simulator._commands, 0x70: _reset}
+
+
+@pytest.fixture
+def simulated(monkeypatch):
+    device = Simulator(serial="A", reset_time=0.1)
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(device))
+    monkeypatch.setattr(MCP2221, "TRANSPORT", "hidapi")
+    MCP2221.InvalidateEnumeration()
+
+    yield device
+
+    MCP2221.InvalidateEnumeration()
+
+
+@pytest.fixture
+def rack(monkeypatch):
+    """ Two boards sharing the factory serial number """
+
+    devices = [Simulator(path=b"sim:0", location="1-1", reset_time=0.1),
+               Simulator(path=b"sim:1", location="1-2", reset_time=0.1)]
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(*devices))
+    monkeypatch.setattr(MCP2221, "TRANSPORT", "hidapi")
+    MCP2221.InvalidateEnumeration()
+
+    yield devices
+
+    MCP2221.InvalidateEnumeration()
 
 
 def testReset():
@@ -11,3 +52,134 @@ def testReset():
         mcp2221.Reset()
     except Exception as err:
         pytest.fail(err)
+
+
+def testResetReconnects(simulated):
+    mcp2221 = MCP2221.MCP2221(serial="A")
+    handle = mcp2221.mcp2221
+
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    start = monotonic()
+    mcp2221.Reset()
+    elapsed = monotonic() - start
+
+    assert mcp2221.mcp2221 is not handle
+    assert 0.1 <= elapsed < MCP2221.RESET_DETACH
+    assert mcp2221.GetGPType(0) == MCP2221.TYPE.INPUT  # from flash
+
+
+def testResetByIndex(simulated):
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.Reset()
+
+    assert len(mcp2221.ReadAllADC()) == 3
+
+
+def testResetRestoresCache(simulated):
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+    mcp2221.Reset()
+
+    assert mcp2221._sram is not None
+    assert mcp2221.GetGPType(2) == MCP2221.TYPE.INPUT
+
+
+def testResetGivenDevice():
+    device = Simulator(reset_time=0.1)
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    start = monotonic()
+    mcp2221.Reset()
+
+    assert monotonic() - start >= 0.1
+    assert len(mcp2221.ReadAllGP()) == 4
+
+
+def testResetTimeout(simulated):
+    simulated.reset_time = 10
+    mcp2221 = MCP2221.MCP2221()
+
+    with pytest.raises(IOError):
+        mcp2221.Reset(timeout=0.2)
+
+
+def testStaleHandle(simulated):
+    handle = MCP2221.hid.device()
+    handle.open_path(b"sim:0")
+    handle.write(bytes([0, 0x70, 0xAB, 0xCD, 0xEF]) + bytes(60))
+
+    with pytest.raises(IOError):
+        handle.write(bytes(65))
+
+
+def testResetKeepsInstrumentation(simulated):
+    mcp2221 = MCP2221.MCP2221(serial="A")
+
+    with Instrumentation(mcp2221) as instrumentation:
+        mcp2221.ReadAllGP()
+        mcp2221.Reset()
+        mcp2221.ReadAllGP()
+
+        assert instrumentation.Stats()[0x51]["count"] == 2
+
+    assert mcp2221.mcp2221 is mcp2221._handle  # unwrapped by Stop
+
+
+def testResetKeepsRecorder(simulated, tmp_path):
+    path = str(tmp_path / "reset.trace")
+    mcp2221 = MCP2221.MCP2221(serial="A")
+
+    with Recorder(mcp2221, path), Instrumentation(mcp2221):
+        mcp2221.Reset()
+        mcp2221.ReadAllADC()
+
+    _, records = ReadTrace(path)
+
+    assert records[-2][2][1] == 0x10
+    assert records[-1][2][0] == 0x10
+
+
+def testResetSharedSerial(rack):
+    mcp2221 = MCP2221.MCP2221(path=b"sim:1")
+    rack[1].inputs = [1, 1, 1, 1]
+    generation = rack[0].generation
+
+    mcp2221.Reset()
+
+    assert mcp2221.ReadAllGP() == [1, 1, 1, 1]  # same board again
+    assert rack[0].generation == generation
+
+
+def testResetSharedSerialUnknownPort(rack):
+    for device in rack:
+        device.location = None
+
+    mcp2221 = MCP2221.MCP2221(dev=1)
+    rack[1].inputs = [1, 1, 1, 1]
+    generation = rack[0].generation
+
+    mcp2221.Reset()
+
+    assert mcp2221.ReadAllGP() == [1, 1, 1, 1]  # found by path
+    assert rack[0].generation == generation
+
+
+def testResetSharedSerialRenumbered(monkeypatch):
+    rack = [Renumbered(path=b"usb:1", reset_time=0.1),
+            Renumbered(path=b"usb:2", reset_time=0.1),
+            Renumbered(path=b"usb:3", reset_time=0.1)]
+    monkeypatch.setattr(MCP2221, "hid", SimulatedHID(*rack))
+    monkeypatch.setattr(MCP2221, "TRANSPORT", "hidapi")
+    MCP2221.InvalidateEnumeration()
+
+    mcp2221 = MCP2221.MCP2221(dev=1)
+    rack[1].inputs = [1, 1, 1, 1]
+
+    mcp2221.Reset()
+
+    # the only path with the serial not belonging to another board
+    assert rack[1].path == b"usb:2'"
+    assert mcp2221.ReadAllGP() == [1, 1, 1, 1]
+    assert rack[0].path == b"usb:1"
+
+    MCP2221.InvalidateEnumeration()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221.Simulator import Simulator, SimulatedHID
+
+
+def testInjectDevice():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.WriteGP(0, 1)
+
+    assert (device.gp[0], mcp2221.ReadGP(0)) == (0b10000, 1)
+
+
+def testInputs():
+    device = Simulator()
+    device.inputs = [1, 0, 1, 0]
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.INPUT)
+
+    assert mcp2221.ReadAllGP() == [1, 0, 1, 0]
+
+
+def testADCReference():
+    device = Simulator()
+    device.voltages = [0.512, 1.024, 2.0]
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(1, 4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.ADC)
+
+    mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_2_048V)
+
+    assert mcp2221.ReadAllADC() == [256, 512, 1000]
+
+
+def testResetLoadsFlash():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    mcp2221.WriteFlash(MCP2221.FLASH.GP_SETTING, [0, 0, 0b010, 0b011])
+    mcp2221.Reset()
+
+    assert [mcp2221.GetGPType(pin) for pin in range(4)] == [
+        MCP2221.TYPE.OUTPUT, MCP2221.TYPE.OUTPUT,
+        MCP2221.TYPE.ADC, MCP2221.TYPE.DAC]
+
+
+def testLatency():
+    mcp2221 = MCP2221.MCP2221(device=Simulator(latency=0.01))
+    start = monotonic()
+
+    for _ in range(5):
+        mcp2221.ReadAllGP()
+
+    assert monotonic() - start >= 0.05
+
+
+def testEnumerate():
+    hid = SimulatedHID(
+        Simulator(serial="A", path=b"sim:0"),
+        Simulator(serial="B", path=b"sim:1"))
+
+    handle = hid.device()
+    handle.open_path(hid.enumerate(0x04D8, 0x00DD)[1]["path"])
+
+    assert handle.get_serial_number_string() == "B"
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+from MCP2221 import MCP2221
+
+
+def testStatus():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+    mcp2221.InitGP(3, MCP2221.TYPE.ADC)
+    mcp2221.I2CSetSpeed(100000)
+
+    status = mcp2221.GetStatus()
+
+    assert list(status.adc) == mcp2221.ReadAllADC()
+    assert status.i2c_speed == 100000
+    assert status.interrupt is False
+    assert status.hardware_revision[0] == "A"
+
+
+def testStatusRepr():
+    mcp2221 = MCP2221.MCP2221()
+
+    assert repr(mcp2221.GetStatus()).startswith("Status(adc=")
+
+
+def testGPIOState():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, True)
+    mcp2221.InitGP(1, MCP2221.TYPE.INPUT)
+    mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+    mcp2221.InitGP(3, MCP2221.TYPE.OUTPUT, False)
+
+    state = mcp2221.GetGPIOState()
+
+    assert state.values[0] == 1
+    assert state.values[2:] == (None, 0)
+    assert state.directions == (0, 1, None, 0)
+    assert state.inputs == (False, True, False, False)
+
+
+def testSRAMSettings():
+    mcp2221 = MCP2221.MCP2221()
+
+    with mcp2221.Transaction():
+        mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, True)
+        mcp2221.InitGP(1, MCP2221.TYPE.CLOCK_OUT)
+        mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+        mcp2221.InitGP(3, MCP2221.TYPE.ADC)
+        mcp2221.SetClockOutput(MCP2221.DUTY.CYCLE_25, MCP2221.CLOCK.DIV_6MHZ)
+        mcp2221.SetDACVoltageReference(MCP2221.VRM.REF_4_096V)
+        mcp2221.SetADCVoltageReference(MCP2221.VRM.VDD)
+        mcp2221.SetInterruptDetection(True, False)
+        mcp2221.WriteDAC(21)
+
+    sram = mcp2221.GetSRAMSettings()
+
+    assert sram.types == (MCP2221.TYPE.OUTPUT, MCP2221.TYPE.CLOCK_OUT,
+                          MCP2221.TYPE.DAC, MCP2221.TYPE.ADC)
+    assert sram.values[0] == 1
+    assert (sram.clock_duty, sram.clock_divider) == (
+        MCP2221.DUTY.CYCLE_25, MCP2221.CLOCK.DIV_6MHZ)
+    assert (sram.dac_ref, sram.dac, sram.adc_ref) == (
+        MCP2221.VRM.REF_4_096V, 21, MCP2221.VRM.VDD)
+    assert (sram.interrupt_rising, sram.interrupt_falling) == (True, False)
+    assert (sram.VID, sram.PID) == (mcp2221.VID, mcp2221.PID)
+
+
+def testSRAMSettingsCached():
+    mcp2221 = MCP2221.MCP2221(cache=True)
+    mcp2221.WriteDAC(9)
+    sent = []
+    mcp2221._send = sent.append
+
+    assert mcp2221.GetSRAMSettings().dac == 9
+    assert sent == []
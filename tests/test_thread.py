@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import pytest
+import threading
+from MCP2221 import MCP2221
+from MCP2221.Benchmark import CountingDevice
+from MCP2221.Simulator import Simulator, I2CMemory
+
+
+class Dropping(Simulator):
+    """ Lose the drop-th next read, its response stays pending """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.drop = 0
+
+    def read(self, max_length, timeout_ms=0):
+        self.drop -= 1
+
+        if self.drop == 0:
+            return []
+
+        return super().read(max_length, timeout_ms)
+
+
+def run(threads):
+    threads = [threading.Thread(target=fn) for fn in threads]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+
+def testSharedInstance():
+    mcp2221 = MCP2221.MCP2221(device=Simulator(latency=0.0005))
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    results = []
+
+    def adc():
+        for _ in range(20):
+            results.append(mcp2221.ReadAllADC())
+
+    def gpio():
+        for i in range(20):
+            mcp2221.WriteGP(0, i & 1)
+            results.append(mcp2221.ReadAllGP())
+
+    def config():
+        for i in range(20):
+            with mcp2221.Transaction():
+                mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+                mcp2221.WriteDAC(i)
+
+    run([adc, gpio, config, adc, gpio])
+
+    assert len(results) == 80
+    assert None not in results
+
+
+def testUnexpectedResponse():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    device.write(bytes([0, 0x51]) + bytes(63))  # stale response
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllADC()
+
+    # stale & late responses are dropped, next command gets its own
+    assert not device._responses
+    assert mcp2221.ReadAllGP() == [0, 0, 0, 0]
+
+
+def adcDevice():
+    device = Dropping()
+    mcp2221 = MCP2221.MCP2221(device=device)
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT, 1)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+
+    return device, mcp2221
+
+
+def testDroppedResponse():
+    device, mcp2221 = adcDevice()
+    device.drop = 1
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllADC()
+
+    device.voltages[0] = 2.0
+
+    assert mcp2221.ReadAllADC() == [620, 0, 0]
+    assert mcp2221.ReadAllGP() == [1, 0xEE, 0, 0]
+    assert not device._responses
+
+
+def testDroppedPipelineResponse():
+    device, mcp2221 = adcDevice()
+    device.drop = 2
+
+    with pytest.raises(IOError):
+        with mcp2221.Pipeline():
+            for i in range(4):
+                mcp2221.WriteGP(0, i & 1)
+
+    assert mcp2221._pipeline is None
+    assert not device._responses
+    assert mcp2221.ReadAllGP() == [1, 0xEE, 0, 0]
+
+
+def testDroppedBatchResponse():
+    device, mcp2221 = adcDevice()
+    device.drop = 2
+
+    with pytest.raises(IOError):
+        with mcp2221._lock:
+            mcp2221._transferMany([MCP2221._GET_STATUS] * 4, window=2)
+
+    device.voltages[0] = 2.0
+
+    assert not device._responses
+    assert mcp2221.ReadAllADC() == [620, 0, 0]
+
+
+def testNoResponse():
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    mcp2221.mcp2221.read = lambda *args: []
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllGP()
+
+
+def testCoalesce():
+    device = CountingDevice(Simulator(latency=0.02))
+    mcp2221 = MCP2221.MCP2221(device=device, coalesce=True)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    device.writes = 0
+    results = []
+
+    def adc():
+        results.append(mcp2221.ReadAllADC())
+
+    run([adc] * 8)
+
+    assert len(results) == 8
+    assert results.count(results[0]) == 8
+    assert device.writes < 8
+
+
+def testCoalesceDisabled():
+    device = CountingDevice(Simulator(latency=0.005))
+    mcp2221 = MCP2221.MCP2221(device=device)
+    device.writes = 0
+
+    run([mcp2221.ReadAllADC] * 8)
+
+    assert device.writes == 8
+
+
+def testCoalesceWhileLocked():
+    device = Simulator(latency=0.0005)
+    device.i2c[0x50] = I2CMemory()
+    mcp2221 = MCP2221.MCP2221(device=device, coalesce=True)
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    done = threading.Event()
+    results = []
+
+    def adc():
+        while not done.is_set():
+            results.append(mcp2221.ReadAllADC())
+
+    def i2c():
+        for _ in range(10):
+            mcp2221.I2CWrite(0x50, b"\x00\x00" + bytes(100))
+
+        done.set()
+
+    threads = [threading.Thread(target=fn, daemon=True)
+               for fn in (adc, adc, i2c)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join(timeout=10)
+
+    done.set()
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert results and None not in results
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import monotonic
+from MCP2221 import MCP2221
+from MCP2221.Instrumentation import Instrumentation
+from MCP2221.Simulator import Simulator
+from MCP2221.Trace import Recorder, ReplayTransport, ReadTrace, READ, WRITE
+
+
+def session(mcp2221):
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.WriteGP(0, 1)
+
+    return [mcp2221.ReadAllGP(), mcp2221.ReadAllADC(),
+            mcp2221.ReadFlash(MCP2221.FLASH.GP_SETTING)]
+
+
+@pytest.fixture
+def trace(tmp_path):
+    path = str(tmp_path / "session.trace")
+    mcp2221 = MCP2221.MCP2221(device=Simulator(latency=0.01))
+
+    with Recorder(mcp2221, path) as recorder:
+        results = session(mcp2221)
+        assert recorder.records == 12
+
+    assert not recorder.running
+
+    return path, results
+
+
+def testRecord(trace):
+    path, _ = trace
+    info, records = ReadTrace(path)
+
+    assert info["serial"] == "0001234567"
+    assert [kind for _, kind, _ in records] == [WRITE, READ] * 6
+    assert records[0][2][1] == 0x61
+    assert all(b - a >= 0 for (a, _, _), (b, _, _) in
+               zip(records, records[1:]))
+
+
+def testFlushed(tmp_path):
+    path = str(tmp_path / "session.trace")
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+
+    with Recorder(mcp2221, path):
+        mcp2221.ReadAllGP()
+
+        # readable while still recording
+        _, records = ReadTrace(path)
+        assert [kind for _, kind, _ in records] == [WRITE, READ]
+
+
+def testStopUnderOtherWrapper(tmp_path):
+    mcp2221 = MCP2221.MCP2221(device=Simulator())
+    device = mcp2221.mcp2221
+    recorder = Recorder(mcp2221, str(tmp_path / "session.trace"))
+    instrumentation = Instrumentation(mcp2221)
+
+    recorder.Start()
+    instrumentation.Start()
+    recorder.Stop()  # not outermost, unlinked below instrumentation
+
+    mcp2221.ReadAllGP()
+    assert instrumentation.Stats()[0x51]["count"] == 1
+
+    instrumentation.Stop()
+    assert mcp2221.mcp2221 is device
+    assert mcp2221.ReadAllGP() == [0, 0, 0, 0]
+
+
+def testReplay(trace):
+    path, results = trace
+    transport = ReplayTransport(path)
+    mcp2221 = MCP2221.MCP2221(device=transport)
+
+    start = monotonic()
+    assert session(mcp2221) == results
+    assert monotonic() - start < 0.03  # full speed
+    assert transport.done
+    assert mcp2221.GetDeviceInfo()["serial"] == "0001234567"
+
+
+def testReplayTiming(trace):
+    path, results = trace
+    mcp2221 = MCP2221.MCP2221(device=ReplayTransport(path, timing=True))
+
+    start = monotonic()
+    assert session(mcp2221) == results
+    assert monotonic() - start >= 0.06  # 6 transactions, 10 ms each
+
+
+def testReplayMismatch(trace):
+    path, _ = trace
+    mcp2221 = MCP2221.MCP2221(device=ReplayTransport(path))
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllADC()
+
+
+def testReplayNotStrict(trace):
+    path, _ = trace
+    mcp2221 = MCP2221.MCP2221(device=ReplayTransport(path, strict=False))
+
+    # responses come back in recorded order regardless of requests
+    assert mcp2221.GetGPType(0) == MCP2221.TYPE.INPUT
+
+
+def testReplayExhausted(trace):
+    path, _ = trace
+    mcp2221 = MCP2221.MCP2221(device=ReplayTransport(path))
+    session(mcp2221)
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllGP()
+
+
+def testNotTrace(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a trace")
+
+    with pytest.raises(ValueError):
+        ReadTrace(str(path))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import pytest
+from MCP2221 import MCP2221
+
+
+def testTransaction():
+    mcp2221 = MCP2221.MCP2221()
+
+    with mcp2221.Transaction(verify=True):
+        mcp2221.InitGP(0, MCP2221.TYPE.INPUT)
+        mcp2221.InitGP(1, MCP2221.TYPE.CLOCK_OUT)
+        mcp2221.InitGP(2, MCP2221.TYPE.ADC)
+        mcp2221.InitGP(3, MCP2221.TYPE.DAC)
+        mcp2221.SetClockOutput(MCP2221.DUTY.CYCLE_50, MCP2221.CLOCK.DIV_3MHZ)
+        mcp2221.SetADCVoltageReference(MCP2221.VRM.REF_2_048V)
+        mcp2221.SetDACVoltageReference(MCP2221.VRM.REF_1_024V)
+        mcp2221.WriteDAC(12)
+
+    buf = [0] * 65
+    buf[1] = 0x61  # get SRAM settings
+    buf = mcp2221._send(buf)
+
+    gp = [buf[22 + pin] & 0b1111 for pin in range(4)]
+    clock = buf[5] & 0b11111
+    adc = (buf[7] >> 2) & 0b111
+    dac = buf[6] >> 5
+    value = buf[6] & 0b11111
+
+    assert gp == [0b1000, 0b001, 0b010, 0b011]
+    assert clock == (MCP2221.DUTY.CYCLE_50.value << 3) | \
+        MCP2221.CLOCK.DIV_3MHZ.value
+    assert (adc, dac, value) == (
+        (MCP2221.VRM.REF_2_048V.value << 1) | 1,
+        (MCP2221.VRM.REF_1_024V.value << 1) | 1,
+        12)
+
+
+def testTransactionSingleWrite():
+    mcp2221 = MCP2221.MCP2221()
+    sent = []
+    send = mcp2221._send
+
+    def count(buf):
+        sent.append(buf[1])
+        return send(buf)
+
+    mcp2221._send = count
+
+    with mcp2221.Transaction():
+        for pin in range(4):
+            mcp2221.InitGP(pin, MCP2221.TYPE.OUTPUT)
+
+        mcp2221.WriteDAC(3)
+        mcp2221.WriteDAC(5)
+
+    assert sent == [0x61, 0x60]
+
+
+def testTransactionAborted():
+    mcp2221 = MCP2221.MCP2221()
+    mcp2221.InitGP(0, MCP2221.TYPE.INPUT)
+
+    with pytest.raises(ValueError):
+        with mcp2221.Transaction():
+            mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+            mcp2221.InitGP(4, MCP2221.TYPE.OUTPUT)
+
+    assert mcp2221.GetGPType(0) == MCP2221.TYPE.INPUT
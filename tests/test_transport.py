@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import os
+import pytest
+from time import monotonic, sleep
+from MCP2221 import MCP2221
+from MCP2221 import Transport
+from MCP2221.Simulator import Simulator
+
+
+def testMemoryTransport():
+    simulator = Simulator()
+    transport = Transport.MemoryTransport(
+        lambda request: simulator._process(list(request)))
+    mcp2221 = MCP2221.MCP2221(device=transport)
+
+    mcp2221.InitGP(0, MCP2221.TYPE.OUTPUT)
+    mcp2221.WriteGP(0, 1)
+
+    assert mcp2221.ReadGP(0) == 1
+    assert mcp2221.ReadFlash(MCP2221.FLASH.GP_SETTING) == simulator.flash[1]
+    assert transport.read(65) == b""
+
+
+def testMemoryTransportNoResponse():
+    transport = Transport.MemoryTransport(lambda request: None)
+    mcp2221 = MCP2221.MCP2221(device=transport)
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllGP()
+
+
+def testHidapiTransport():
+    simulator = Simulator()
+    transport = Transport.HidapiTransport(simulator, timeout=0.5)
+    mcp2221 = MCP2221.MCP2221(device=transport)
+
+    assert mcp2221.GetDeviceInfo()["serial"] == "0001234567"
+    assert len(mcp2221.ReadAllADC()) == 3
+
+
+def testLateResponse():
+    device = Simulator()
+    mcp2221 = MCP2221.MCP2221(
+        device=Transport.HidapiTransport(device, timeout=0.05))
+    mcp2221.InitGP(1, MCP2221.TYPE.ADC)
+    device.latency = 0.3  # answered after timeout & resync
+
+    with pytest.raises(IOError):
+        mcp2221.ReadAllADC()
+
+    sleep(0.3)
+    device.latency = 0
+    device.voltages[0] = 2.0
+
+    # late response to the failed read is dropped, not returned
+    assert mcp2221.ReadAllADC() == [620, 0, 0]
+    assert mcp2221.ReadAllADC() == [620, 0, 0]
+    assert not device._responses
+
+
+def testHidrawTransport(tmp_path):
+    # FIFO opened read-write loops reports back
+    path = str(tmp_path / "hidraw0")
+    os.mkfifo(path)
+
+    with Transport.HidrawTransport(path, timeout=0.05) as transport:
+        assert transport.write([0, 0x51] + [0] * 63) == 65
+        assert transport.read(65) == bytes([0, 0x51] + [0] * 63)
+
+        assert transport.write(bytes(65)) == 65
+        assert transport.read(65) == bytes(65)
+
+        start = monotonic()
+        assert transport.read(65) == b""
+        assert monotonic() - start >= 0.04
+
+    assert transport.fd is None
+
+
+def testEnumerateHidraw(tmp_path, monkeypatch):
+    usb = tmp_path / "usb1" / "1-1"
+    interface = usb / "1-1:1.2"
+    hid = interface / "0003:04D8:00DD.0001"
+    sysfs = tmp_path / "hidraw"
+
+    hid.mkdir(parents=True)
+    sysfs.mkdir()
+    (sysfs / "hidraw3").mkdir()
+    (sysfs / "hidraw3" / "device").symlink_to(hid)
+    (hid / "uevent").write_text(
+        "HID_ID=0003:000004D8:000000DD\nHID_UNIQ=0001234567\n")
+    (interface / "bInterfaceNumber").write_text("02\n")
+    (usb / "manufacturer").write_text("Microchip Technology Inc.\n")
+    (usb / "product").write_text("MCP2221 USB-I2C/UART Combo\n")
+
+    monkeypatch.setattr(Transport, "SYSFS_HIDRAW", str(sysfs))
+
+    assert Transport.EnumerateHidraw(0x04D8, 0x00DD) == [{
+        "path": b"/dev/hidraw3",
+        "vendor_id": 0x04D8,
+        "product_id": 0x00DD,
+        "serial_number": "0001234567",
+        "manufacturer_string": "Microchip Technology Inc.",
+        "product_string": "MCP2221 USB-I2C/UART Combo",
+        "interface_number": 2,
+        "location": "1-1",
+    }]
+    assert Transport.EnumerateHidraw(0x04D8, 0x1234) == []
+
+
+def testIsHidraw():
+    assert Transport.IsHidraw(b"/dev/hidraw0")
+    assert Transport.IsHidraw("/dev/hidraw12")
+    assert not Transport.IsHidraw(b"1-1:1.2")
+    assert not Transport.IsHidraw(None)
+
+
+def testInvalidTransport():
+    with pytest.raises(ValueError):
+        MCP2221.MCP2221(transport="serial")
+
+
+def testIncompleteTransport():
+    class WriteOnly(Transport.Transport):
+        def write(self, buff):
+            return len(buff)
+
+    with pytest.raises(TypeError):
+        WriteOnly()
+
+    with pytest.raises(TypeError):
+        Transport.Transport()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import sleep
+from MCP2221 import MCP2221
+from MCP2221.GPIOWatcher import GPIOWatcher
+from MCP2221.Simulator import Simulator
+
+
+@pytest.fixture
+def device():
+    return Simulator()
+
+
+@pytest.fixture
+def mcp2221(device):
+    mcp2221 = MCP2221.MCP2221(device=device)
+
+    for pin in range(4):
+        mcp2221.InitGP(pin, MCP2221.TYPE.INPUT)
+
+    return mcp2221
+
+
+def testEvents(device, mcp2221):
+    with GPIOWatcher(mcp2221, debounce=0) as watcher:
+        sleep(0.01)
+        device.SetInput(2, 1)
+        event = watcher.Get(timeout=1)
+        device.SetInput(2, 0)
+        event2 = watcher.Get(timeout=1)
+
+    assert (event.pin, event.value) == (2, 1)
+    assert (event2.pin, event2.value) == (2, 0)
+    assert event2.time > event.time
+
+
+def testCallback(device, mcp2221):
+    events = []
+
+    with GPIOWatcher(mcp2221, events.append, pins=[1], debounce=0):
+        sleep(0.01)
+        device.SetInput(0, 1)
+        device.SetInput(1, 1)
+        sleep(0.05)
+
+    assert [(e.pin, e.value) for e in events] == [(1, 1)]
+
+
+def testCallbackError(device, mcp2221):
+    events = []
+
+    def callback(event):
+        events.append(event)
+        raise RuntimeError("callback failed")
+
+    with GPIOWatcher(mcp2221, callback, debounce=0) as watcher:
+        sleep(0.01)
+        device.SetInput(0, 1)
+        sleep(0.05)
+        device.SetInput(0, 0)
+        sleep(0.05)
+
+        assert watcher._thread.is_alive()
+
+    assert len(events) == 2  # still running after first failure
+    assert watcher.callback_errors == 2
+    assert isinstance(watcher.error, RuntimeError)
+
+
+def testReadError(device, mcp2221):
+    def fail(out=None):
+        raise ValueError("not open")
+
+    mcp2221.ReadAllGP = fail
+
+    with GPIOWatcher(mcp2221, max_interval=0.005) as watcher:
+        sleep(0.05)
+
+        assert watcher._thread.is_alive()
+
+    assert watcher.errors > 1
+    assert isinstance(watcher.error, ValueError)
+
+
+def testDebounce(device, mcp2221):
+    with GPIOWatcher(mcp2221, debounce=0.2, max_interval=0.005) as watcher:
+        sleep(0.01)
+        device.SetInput(0, 1)
+        sleep(0.02)
+        device.SetInput(0, 0)  # glitch shorter than debounce
+
+        assert watcher.Get(timeout=0.3) is None
+
+        device.SetInput(0, 1)
+
+        assert watcher.Get(timeout=1).value == 1
+
+
+def testBackoff(mcp2221):
+    with GPIOWatcher(mcp2221, min_interval=0.001,
+                     max_interval=0.05) as watcher:
+        sleep(0.3)
+
+    assert watcher.interval == 0.05
+    assert watcher.polls < 30
+
+
+def testInvalidPin(mcp2221):
+    with pytest.raises(ValueError):
+        GPIOWatcher(mcp2221, pins=[4])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import pytest
+from time import sleep
+from MCP2221 import MCP2221
+from MCP2221 import Waveform
+from MCP2221.Simulator import Simulator
+
+
+class History(Simulator):
+    """ Remember DAC values written """
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def _setSRAM(self, request):
+        response = super()._setSRAM(request)
+
+        if request[4] & 0b10000000:
+            self.history.append(self.dac)
+
+        return response
+
+    _commands = {**Simulator._commands, 0x60: _setSRAM}
+
+
+@pytest.fixture
+def device():
+    return History()
+
+
+@pytest.fixture
+def mcp2221(device):
+    mcp2221 = MCP2221.MCP2221(device=device)
+    mcp2221.InitGP(2, MCP2221.TYPE.DAC)
+
+    return mcp2221
+
+
+def testTables():
+    assert Waveform.Quantize(Waveform.Ramp(32)) == list(range(32))
+    assert Waveform.Quantize(Waveform.Sine(4)) == [16, 31, 16, 0]
+    assert Waveform.Quantize(Waveform.Triangle(4)) == [0, 16, 31, 16]
+
+
+def testInvalidSample():
+    with pytest.raises(ValueError):
+        Waveform.Quantize([1.5])
+
+
+def testOneShot(device, mcp2221):
+    player = Waveform.WaveformPlayer(
+        mcp2221, Waveform.Ramp(32), rate=1000, loop=False)
+    player.Start()
+
+    assert player.Wait(timeout=1)
+    assert device.history == sorted(set(device.history))
+    assert device.history[-1] == 31
+    assert player.samples + player.late == 32
+    assert player.samples == len(device.history)
+
+
+def testLoop(device, mcp2221):
+    with Waveform.WaveformPlayer(mcp2221, [0, 1], rate=500) as player:
+        sleep(0.1)
+
+    # late samples are skipped, schedule is kept
+    assert player.samples > 20
+    assert player.samples + player.late >= 40
+    assert device.history[0] == 0
+    assert set(device.history) == {0, 31}
+    assert player.Stats()["achieved_rate"] < 500 * 1.2
+    assert player.jitter < 0.01
+
+
+def testSingleWritePerSample(device, mcp2221):
+    device.history.clear()
+    sent = []
+    send = mcp2221._send
+
+    def count(buf):
+        sent.append(buf[1])
+        return send(buf)
+
+    mcp2221._send = count
+    player = Waveform.WaveformPlayer(
+        mcp2221, [0.5] * 10, rate=2000, loop=False)
+    player.Start()
+    player.Wait()
+
+    # late samples are skipped, never sent twice
+    assert player.samples + player.late == 10
+    assert sent == [0x60] * player.samples
+
+
+def testWriteDACSingleWrite(mcp2221):
+    sent = []
+    send = mcp2221._send
+
+    def count(buf):
+        sent.append(buf[1])
+        return send(buf)
+
+    mcp2221._send = count
+    mcp2221.WriteDAC(7)
+
+    assert sent == [0x60]
+    assert mcp2221.GetGPType(2) == MCP2221.TYPE.DAC